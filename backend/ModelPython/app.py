@@ -1,16 +1,27 @@
-from flask import Flask, Response, jsonify, send_file
+from flask import Flask, Response, jsonify, send_file, request, abort, url_for
 from flask_cors import CORS
 from flask import current_app
 from safety_detection import SafetyDetector, DetectionConfig
-from safety_detection.db import db
+from safety_detection.db import db, database_stats, init_database, read_session, upgrade_schema
 from safety_detection.models import Alert as DBAlert
-import cv2
+from safety_detection.cameras import CameraRegistry
+from safety_detection.queries import query_alerts_from_args
+from safety_detection.rollups import alert_stats_from_args, alert_totals, clear_rollups, ensure_rollups, forget_alerts
+from safety_detection.alert_writer import AlertWriter
+from safety_detection.location import CachedLocationProvider, IPLocationProvider, StaticLocationProvider
+from safety_detection.events import EventBus
+from safety_detection.thumbnails import ThumbnailCache
+from safety_detection.storage import FrameStore
+from safety_detection.metrics import render_prometheus
+from safety_detection.profiling import ProfileCapture
+from safety_detection.model_registry import shared_registry
+import atexit
 import os
 
 app = Flask(__name__)
-CORS(app)
+CORS(app, expose_headers=['X-Next-Cursor', 'Link'])
 
-# Initialize detector with custom config
+# Detection config shared by every camera
 config = DetectionConfig(
     alert_cooldown=10,  # 10 seconds between alerts
     night_start_hour=20,
@@ -21,54 +32,182 @@ config = DetectionConfig(
         'thumb_folded': 0.12
     }
 )
-detector = SafetyDetector(config)
 
 
-# DB config (SQLite for simplicity)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///alerts.db'
+# DB config: SQLite in WAL mode by default; SAFEWATCH_DATABASE_URL may point
+# at Postgres, SAFEWATCH_DATABASE_READ_URL at a replica for the read endpoints
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-db.init_app(app)
+init_database(
+    app,
+    os.environ.get('SAFEWATCH_DATABASE_URL', 'sqlite:///alerts.db'),
+    read_url=os.environ.get('SAFEWATCH_DATABASE_READ_URL'),
+    pool_size=int(os.environ.get('SAFEWATCH_DB_POOL_SIZE', 5))
+)
 
 # Create tables on first run
 with app.app_context():
     db.create_all()
+    upgrade_schema()
+    ensure_rollups()
+
+# Models load once per process in the background; cameras borrow them from
+# the shared registry, and /api/ready reports when they are warm
+model_registry = shared_registry()
+model_registry.warm_async(config)
+
+# Live gesture/count/alert changes pushed to /api/events subscribers
+event_bus = EventBus()
+
+# Alert thumbnails for galleries, written with each alert and cached on disk and in memory
+thumbnails = ThumbnailCache()
+# Alert images never change once written; clients revalidate with the ETag after this
+ALERT_IMAGE_MAX_AGE = 3600
+
+# Alert frame files: removed in the background, with optional retention by
+# age (SAFEWATCH_RETENTION_DAYS) and total size (SAFEWATCH_STORAGE_LIMIT_MB),
+# and removal of files no alert points at (SAFEWATCH_ORPHAN_FRAME_HOURS old)
+retention_days = os.environ.get('SAFEWATCH_RETENTION_DAYS')
+storage_limit_mb = os.environ.get('SAFEWATCH_STORAGE_LIMIT_MB')
+orphan_frame_hours = os.environ.get('SAFEWATCH_ORPHAN_FRAME_HOURS')
+frame_store = FrameStore(
+    app=app,
+    retention_days=float(retention_days) if retention_days else None,
+    max_bytes=int(float(storage_limit_mb) * 1024 * 1024) if storage_limit_mb else None,
+    orphan_max_age=float(orphan_frame_hours) * 3600 if orphan_frame_hours else None,
+    thumbnails=thumbnails,
+    event_bus=event_bus
+)
+frame_store.start()
+
+# Alerts are persisted by a background writer, so the frame loop needs no app context
+alert_writer = AlertWriter(app, event_bus=event_bus, thumbnails=thumbnails, frame_store=frame_store)
+
+# Site location for alerts: SAFEWATCH_LOCATION="lat,lng" if set, otherwise an
+# IP geolocation lookup that is cached and refreshed in the background
+if os.environ.get('SAFEWATCH_LOCATION'):
+    location_provider = StaticLocationProvider(*os.environ['SAFEWATCH_LOCATION'].split(','))
+else:
+    location_provider = CachedLocationProvider(IPLocationProvider())
+    location_provider.refresh_async()
+
+# On-demand profiling of frame processing across all cameras (/api/profile)
+profiler = ProfileCapture()
+
+# Camera registry: SAFEWATCH_CAMERAS="id=source,..." where source is a device
+# index, video file path or stream URL (defaults to local camera 0)
+cameras = CameraRegistry(
+    config_factory=lambda: config,
+    alert_writer=alert_writer,
+    location_provider=location_provider,
+    event_bus=event_bus,
+    profiler=profiler
+)
+cameras.load_spec(os.environ.get('SAFEWATCH_CAMERAS', '0'))
 
-# Detector initialization
-config = DetectionConfig()
-detector = SafetyDetector(config)
+
+@atexit.register
+def shutdown():
+    """Stop cameras and flush queued alerts on interpreter exit"""
+    cameras.shutdown()
+    alert_writer.close()
+    frame_store.close()
+    model_registry.close()
+
+
+def read_alert_or_404(session, alert_id):
+    """Load an alert through a read session, aborting with 404 if it does not exist"""
+    alert = session.get(DBAlert, alert_id)
+    if alert is None:
+        abort(404)
+    return alert
+
+
+def get_camera_or_404(camera_id=None):
+    """Return the camera pipeline for camera_id (default camera if None)"""
+    pipeline = cameras.get(camera_id)
+    if pipeline is None:
+        abort(404, description=f"Unknown camera '{camera_id}'")
+    return pipeline
 
 @app.route('/video_feed')
-def video_feed():
-    def generate():
-        cap = cv2.VideoCapture(0)
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            else:
-                # ensure app context is active
-                with app.app_context():
-                    processed_frame, alert = detector.process_frame(frame)
-            _, buffer = cv2.imencode('.jpg', processed_frame)
-            yield (b'--frame\r\n'
-                   b'Content-Type: image/jpeg\r\n\r\n' + buffer.tobytes() + b'\r\n')
-    return Response(generate(), mimetype='multipart/x-mixed-replace; boundary=frame')
+@app.route('/video_feed/<camera_id>')
+def video_feed(camera_id=None):
+    pipeline = get_camera_or_404(camera_id)
+    # Optional per-viewer frame rate cap for slow clients, e.g. ?fps=5
+    max_fps = request.args.get('fps', type=float)
+    if max_fps is not None and max_fps <= 0:
+        abort(400, description="fps must be positive")
+    if max_fps is not None and pipeline.hub.max_fps:
+        max_fps = min(max_fps, pipeline.hub.max_fps)
+    return Response(pipeline.hub.mjpeg(max_fps), mimetype='multipart/x-mixed-replace; boundary=frame')
+
+@app.route('/api/cameras')
+def list_cameras():
+    """Returns all registered cameras"""
+    return jsonify({
+        'default': cameras.default_camera_id,
+        'cameras': [c.to_dict() for c in cameras.cameras()]
+    })
+
+@app.route('/api/cameras', methods=['POST'])
+def register_camera():
+    """Register a camera: {"camera_id", "source", "name", "latitude", "longitude"}"""
+    data = request.get_json(silent=True) or {}
+    camera_id = data.get('camera_id')
+    source = data.get('source')
+    if camera_id is None or source is None:
+        return jsonify({'error': 'camera_id and source are required'}), 400
+    try:
+        pipeline = cameras.add(
+            camera_id, source,
+            name=data.get('name'),
+            latitude=data.get('latitude'),
+            longitude=data.get('longitude')
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 409
+    return jsonify(pipeline.to_dict()), 201
+
+@app.route('/api/cameras/<camera_id>', methods=['DELETE'])
+def remove_camera(camera_id):
+    """Stop and unregister a camera"""
+    if not cameras.remove(camera_id):
+        return jsonify({'error': f"Unknown camera '{camera_id}'"}), 404
+    return jsonify({'message': 'Camera removed successfully', 'camera_id': camera_id})
 
 @app.route('/alerts')
 def get_alerts():
-    """Returns all alerts ordered by most recent first"""
-    alerts = DBAlert.query.order_by(DBAlert.timestamp.desc()).all()
-    return jsonify([a.to_dict() for a in alerts])
+    """Returns one page of alerts, most recent first (or oldest with order=oldest).
+
+    Query params: limit, cursor, alert_type, gesture, camera_id, since, until,
+    q, order, fields. The cursor for the next page is returned in the X-Next-Cursor
+    header (and a Link rel="next" header) while more pages exist.
+    """
+    try:
+        with read_session() as session:
+            items, next_cursor = query_alerts_from_args(request.args, session=session)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    response = jsonify(items)
+    if next_cursor:
+        args = request.args.to_dict()
+        args['cursor'] = next_cursor
+        response.headers['X-Next-Cursor'] = next_cursor
+        response.headers['Link'] = f'<{url_for("get_alerts", _external=True, **args)}>; rel="next"'
+    return response
 
 @app.route('/screenshots')
 def get_screenshots():
     """Returns the 10 most recent alerts that have frame_path (screenshots available)"""
-    alerts = DBAlert.query.filter(DBAlert.frame_path.isnot(None)).order_by(DBAlert.timestamp.desc()).limit(10).all()
-    return jsonify([a.to_dict() for a in alerts])
+    with read_session() as session:
+        alerts = session.query(DBAlert).filter(DBAlert.frame_path.isnot(None)) \
+            .order_by(DBAlert.timestamp.desc()).limit(10).all()
+        return jsonify([a.to_dict() for a in alerts])
 
 @app.route('/gender_count')
 def get_gender_count():
-    """Returns the current gender count from the detector"""
+    """Returns the current gender count from the default camera's detector"""
+    detector = get_camera_or_404().detector
     return jsonify({
         'male': detector.current_counts.get('male', 0),
         'female': detector.current_counts.get('female', 0)
@@ -77,27 +216,51 @@ def get_gender_count():
 @app.route('/alert/<int:alert_id>')
 def get_alert_detail(alert_id):
     """Get detailed information about a specific alert"""
-    alert = DBAlert.query.get_or_404(alert_id)
-    return jsonify(alert.to_dict())
+    with read_session() as session:
+        return jsonify(read_alert_or_404(session, alert_id).to_dict())
 
 @app.route('/alert_image/<int:alert_id>')
 def get_alert_image(alert_id):
-    alert = DBAlert.query.get_or_404(alert_id)
-    if alert.frame_path and os.path.exists(alert.frame_path):
-        return send_file(alert.frame_path, mimetype='image/jpeg')
-    return jsonify({'error': 'Image not found'}), 404
+    """Alert frame, or its thumbnail with ?size=thumb.
+
+    Responses carry an ETag and Cache-Control, and honour If-None-Match /
+    If-Modified-Since (304) and Range requests.
+    """
+    size = request.args.get('size', 'full')
+    if size not in ('full', 'thumb'):
+        return jsonify({'error': "size must be 'full' or 'thumb'"}), 400
+    with read_session() as session:
+        alert = read_alert_or_404(session, alert_id)
+    if not alert.frame_path:
+        return jsonify({'error': 'Image not found'}), 404
+    if size == 'full':
+        if not os.path.exists(alert.frame_path):
+            return jsonify({'error': 'Image not found'}), 404
+        return send_file(alert.frame_path, mimetype='image/jpeg', conditional=True,
+                         etag=True, max_age=ALERT_IMAGE_MAX_AGE)
+    thumbnail = thumbnails.get(alert.frame_path)
+    if thumbnail is None:
+        return jsonify({'error': 'Image not found'}), 404
+    data, etag = thumbnail
+    response = Response(data, mimetype='image/jpeg')
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = ALERT_IMAGE_MAX_AGE
+    return response.make_conditional(request, accept_ranges=True, complete_length=len(data))
 
 @app.route('/alert/<int:alert_id>', methods=['DELETE'])
 def delete_alert(alert_id):
     """Delete a specific alert"""
     alert = DBAlert.query.get_or_404(alert_id)
+    camera_id = alert.camera_id
+    frame_path = alert.frame_path
     try:
-        # Delete the image file if it exists
-        if alert.frame_path and os.path.exists(alert.frame_path):
-            os.remove(alert.frame_path)
-        # Delete from database
+        forget_alerts([alert])
         db.session.delete(alert)
         db.session.commit()
+        # The image file and thumbnail are removed in the background
+        frame_store.remove_async([frame_path])
+        event_bus.publish('alert_deleted', {'id': alert_id, 'camera_id': camera_id})
         return jsonify({'message': 'Alert deleted successfully', 'id': alert_id})
     except Exception as e:
         db.session.rollback()
@@ -105,28 +268,25 @@ def delete_alert(alert_id):
 
 @app.route('/alerts', methods=['DELETE'])
 def delete_all_alerts():
-    """Delete all alerts"""
+    """Delete all alerts in one statement; their images are removed in the background"""
     try:
-        # Delete all alert images
-        alerts = DBAlert.query.all()
-        for alert in alerts:
-            if alert.frame_path and os.path.exists(alert.frame_path):
-                try:
-                    os.remove(alert.frame_path)
-                except Exception as e:
-                    print(f"Error deleting image {alert.frame_path}: {e}")
-        
-        # Delete all alerts from database
+        frame_paths = [path for (path,) in db.session.query(DBAlert.frame_path)
+                       .filter(DBAlert.frame_path.isnot(None))]
         num_deleted = DBAlert.query.delete()
+        clear_rollups()
         db.session.commit()
+        frame_store.remove_async(frame_paths)
+        event_bus.publish('alert_deleted', {'all': True, 'count': num_deleted})
         return jsonify({'message': f'Deleted {num_deleted} alerts successfully', 'count': num_deleted})
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/person_count')
-def get_person_count():
-    """Returns the current person count from the detector"""
+@app.route('/api/person_count/<camera_id>')
+def get_person_count(camera_id=None):
+    """Returns the current person count from a camera's detector"""
+    detector = get_camera_or_404(camera_id).detector
     return jsonify({
         'male': detector.current_counts.get('male', 0),
         'female': detector.current_counts.get('female', 0),
@@ -136,17 +296,127 @@ def get_person_count():
 @app.route('/api/stats')
 def get_stats():
     """Returns system statistics"""
-    total_alerts = DBAlert.query.count()
+    with read_session() as session:
+        total_alerts = alert_totals(session=session)['total']
+    detector = get_camera_or_404().detector
     return jsonify({
         'total_alerts': total_alerts,
         'current_male': detector.current_counts.get('male', 0),
-        'current_female': detector.current_counts.get('female', 0)
+        'current_female': detector.current_counts.get('female', 0),
+        'alert_writer': alert_writer.stats(),
+        'thumbnails': thumbnails.stats(),
+        'storage': frame_store.footprint(),
+        'database': database_stats()
     })
 
+@app.route('/api/stats/alerts')
+def get_alert_stats():
+    """Alert time series and totals from the rollup tables.
+
+    Query params: resolution (minute|hour), since, until, group_by
+    (alert_type|gesture|camera_id), and alert_type, gesture, camera_id
+    filters (comma-separated lists).
+    """
+    try:
+        with read_session() as session:
+            return jsonify(alert_stats_from_args(request.args, session=session))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/storage')
+def get_storage():
+    """Alert frame storage footprint and retention status (?rescan=1 recounts now)"""
+    if request.args.get('rescan') in ('1', 'true'):
+        return jsonify(frame_store.scan())
+    return jsonify(frame_store.footprint())
+
+@app.route('/api/ready')
+def readiness():
+    """200 once the detection models are loaded and warmed, 503 until then"""
+    status = model_registry.status()
+    return jsonify(status), 200 if status['ready'] else 503
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus metrics: per-camera stage latencies and counters, plus queue and storage gauges"""
+    writer_stats = alert_writer.stats()
+    footprint = frame_store.footprint()
+    text = render_prometheus(
+        [(pipeline.camera_id, pipeline.detector.metrics) for pipeline in cameras.cameras()],
+        gauges={
+            'alert_queue_depth': ('Alerts waiting to be persisted', writer_stats['queue_depth']),
+            'alert_write_failures': ('Alerts that failed to persist', writer_stats['failed']),
+            'alert_frames_bytes': ('Bytes used by alert frame files', footprint['bytes']),
+            'alert_frames_files': ('Alert frame files on disk', footprint['files'])
+        }
+    )
+    return Response(text, mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/profile', methods=['POST'])
+def start_profile():
+    """Profile frame processing for ?seconds=N (default 10) with ?mode=cprofile|pyinstrument"""
+    try:
+        seconds = float(request.args.get('seconds', 10))
+        return jsonify(profiler.start(seconds, request.args.get('mode', 'cprofile'))), 202
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/profile')
+def get_profile():
+    """Capture status, or the last capture's text report with ?report=1"""
+    status = profiler.status()
+    if request.args.get('report') not in ('1', 'true'):
+        return jsonify(status)
+    if profiler.report is None:
+        abort(404, description="No profile report yet")
+    return Response(profiler.report, mimetype='text/plain')
+
 @app.route('/api/gesture_status')
-def get_gesture_status():
-    """Returns the current gesture detection status"""
-    return jsonify(detector.current_gesture)
+@app.route('/api/gesture_status/<camera_id>')
+def get_gesture_status(camera_id=None):
+    """Returns the current gesture detection status for a camera"""
+    return jsonify(get_camera_or_404(camera_id).detector.current_gesture)
+
+@app.route('/api/events')
+def stream_events():
+    """Server-Sent Events stream of live state changes.
+
+    Event types: gesture, counts, alert, alert_deleted (and reset when a
+    reconnecting client missed too much). Query params: types (comma-separated)
+    and camera_id ("default" for the default camera). Reconnects resume from
+    the Last-Event-ID header; fresh connections first get the current gesture
+    and counts of each camera.
+    """
+    types = [t.strip() for t in request.args.get('types', '').split(',') if t.strip()]
+    camera_id = request.args.get('camera_id')
+    if camera_id == 'default':
+        camera_id = cameras.default_camera_id
+    if camera_id is not None and camera_id not in cameras:
+        abort(404, description=f"Unknown camera '{camera_id}'")
+    last_event_id = request.headers.get('Last-Event-ID', request.args.get('last_event_id'))
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        return jsonify({'error': 'Last-Event-ID must be an integer'}), 400
+
+    initial = []
+    if last_event_id is None:
+        for pipeline in cameras.cameras():
+            detector = pipeline.detector
+            counts = detector.current_counts
+            initial.append(('counts', {
+                'camera_id': pipeline.camera_id,
+                'male': counts['male'],
+                'female': counts['female'],
+                'total': counts['male'] + counts['female']
+            }))
+            initial.append(('gesture', dict(detector.current_gesture, camera_id=pipeline.camera_id)))
+
+    stream = event_bus.stream(last_event_id, types=types, camera_id=camera_id, initial=initial)
+    return Response(stream, mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
 
 if __name__ == '__main__':
     app.run(debug=True)
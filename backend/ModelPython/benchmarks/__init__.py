@@ -0,0 +1,4 @@
+"""Micro-benchmarks for the safety_detection pipeline.
+
+Run from backend/ModelPython, e.g. ``python -m benchmarks.bench_gender_batch``.
+"""
@@ -0,0 +1,98 @@
+"""GET /alerts response time vs. table size: full dump vs keyset pages.
+
+    python -m benchmarks.bench_alerts_api [--rows 1000000] [--legacy-max 100000]
+
+Seeds a throwaway SQLite database in growing steps and, at each size,
+times the first page, a page 50 cursors deep, a filtered page and (up to
+--legacy-max rows) the previous unbounded ``.all()`` + ``to_dict`` dump.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from flask import Flask, jsonify
+
+from safety_detection.db import db
+from safety_detection.models import Alert
+from safety_detection.queries import query_alerts
+
+ALERT_TYPES = ['distress', 'lone_woman_night', 'woman_surrounded', 'woman_surrounded_spatial']
+GESTURES = ['thumb_palm', 'wave', 'ok_sign']
+
+
+def seed(count, start_id, rng, base_time):
+    """Insert `count` alerts with increasing timestamps via core executemany"""
+    rows = []
+    for i in range(start_id, start_id + count):
+        alert_type = rng.choice(ALERT_TYPES)
+        rows.append({
+            'alert_type': alert_type,
+            'timestamp': base_time + timedelta(seconds=i * 7),
+            'latitude': 28.6 + rng.random() / 100,
+            'longitude': 77.2 + rng.random() / 100,
+            'frame_path': f'alert_frames/alert_{i}.jpg',
+            'male_count': rng.randint(0, 4),
+            'female_count': rng.randint(0, 2),
+            'gesture': rng.choice(GESTURES) if alert_type == 'distress' else None,
+            'camera_id': str(rng.randint(0, 5))
+        })
+        if len(rows) == 50000:
+            db.session.execute(Alert.__table__.insert(), rows)
+            rows = []
+    if rows:
+        db.session.execute(Alert.__table__.insert(), rows)
+    db.session.commit()
+
+
+def time_ms(fn, repeat=5):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def deep_page(depth, **filters):
+    cursor = None
+    for _ in range(depth):
+        _, cursor = query_alerts(limit=100, cursor=cursor, **filters)
+    return jsonify(query_alerts(limit=100, cursor=cursor, **filters)[0])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--legacy-max', type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = Flask(__name__)
+        app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        db.init_app(app)
+        with app.app_context(), app.test_request_context():
+            db.create_all()
+            rng = random.Random(0)
+            base_time = datetime(2025, 1, 1)
+            sizes = [s for s in (10000, 100000, 1000000, 10000000) if s <= args.rows] or [args.rows]
+            seeded = 0
+            print(f"{'rows':>9}  {'page 1':>8}  {'page 50':>8}  {'filtered':>8}  {'legacy all()':>12}   (ms)")
+            for size in sizes:
+                seed(size - seeded, seeded, rng, base_time)
+                seeded = size
+                first = time_ms(lambda: jsonify(query_alerts(limit=100)[0]))
+                deep = time_ms(lambda: deep_page(50), repeat=1) / 51
+                filtered = time_ms(lambda: jsonify(query_alerts(
+                    limit=100, alert_types=['distress'], gestures=['wave'])[0]))
+                legacy = '-'
+                if size <= args.legacy_max:
+                    legacy = f"{time_ms(lambda: jsonify([a.to_dict() for a in Alert.query.order_by(Alert.timestamp.desc()).all()]), repeat=1):.1f}"
+                print(f"{size:>9}  {first:>8.2f}  {deep:>8.2f}  {filtered:>8.2f}  {legacy:>12}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,218 @@
+"""Alert store under multi-writer load: WAL + pooled readers vs the previous defaults.
+
+    python -m benchmarks.bench_db_load [--seconds 10] [--readers 8] [--page 1000] \\
+        [--batch 32] [--rate 0] [--modes legacy,wal] [--url postgresql+psycopg2://...]
+
+For each mode a throwaway database is seeded, then for --seconds:
+
+- one writer commits alert batches the way AlertWriter does (rows plus
+  rollup upserts in one transaction), as fast as it can or at --rate
+  alerts/s
+- a second writer deletes the oldest alerts every half second, like the
+  retention compactor and DELETE /alerts
+- --readers threads alternate a /alerts page of --page rows and the
+  /api/stats totals
+
+``legacy`` is the previous setup (rollback journal, default pool, reads
+on the writer's engine); ``wal`` goes through init_database and
+read_session. --url runs the ``wal`` path against another database, e.g.
+Postgres, instead of a temporary SQLite file.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+from flask import Flask
+from sqlalchemy import text
+
+from benchmarks.bench_alerts_api import ALERT_TYPES, GESTURES, seed
+from safety_detection.db import db, init_database, read_session
+from safety_detection.models import Alert
+from safety_detection.queries import query_alerts
+from safety_detection.rollups import alert_totals, forget_alerts, rebuild_rollups, record_alerts
+
+SEED_ROWS = 20000
+
+
+def percentile(samples, q):
+    if not samples:
+        return 0.0
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+def build_app(mode, url):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    if mode == 'legacy':
+        app.config['SQLALCHEMY_DATABASE_URI'] = url
+        db.init_app(app)
+    else:
+        init_database(app, url)
+    return app
+
+
+class Load:
+    def __init__(self, app, mode, args):
+        self.app = app
+        self.mode = mode
+        self.args = args
+        self.stop = threading.Event()
+        self.lock = threading.Lock()
+        self.written = 0
+        self.deleted = 0
+        self.reads = 0
+        self.errors = {}
+        self.commit_ms = []
+        self.read_ms = []
+
+    def error(self, kind, e):
+        message = f"{kind}: {str(e).splitlines()[0][:60]}"
+        with self.lock:
+            self.errors[message] = self.errors.get(message, 0) + 1
+
+    def writer(self):
+        rng = random.Random(1)
+        interval = self.args.batch / self.args.rate if self.args.rate else 0
+        next_at = time.perf_counter()
+        with self.app.app_context():
+            while not self.stop.is_set():
+                rows = []
+                for _ in range(self.args.batch):
+                    alert_type = rng.choice(ALERT_TYPES)
+                    rows.append(Alert(alert_type=alert_type, timestamp=datetime.now(),
+                                      latitude=28.6, longitude=77.2, male_count=rng.randint(0, 4),
+                                      female_count=rng.randint(0, 2), camera_id=str(rng.randint(0, 5)),
+                                      gesture=rng.choice(GESTURES) if alert_type == 'distress' else None,
+                                      frame_path='alert_frames/bench.jpg'))
+                started = time.perf_counter()
+                try:
+                    db.session.add_all(rows)
+                    record_alerts(rows)
+                    db.session.commit()
+                    with self.lock:
+                        self.written += len(rows)
+                        self.commit_ms.append((time.perf_counter() - started) * 1000)
+                except Exception as e:
+                    db.session.rollback()
+                    self.error('write', e)
+                if interval:
+                    next_at += interval
+                    self.stop.wait(max(0.0, next_at - time.perf_counter()))
+
+    def deleter(self):
+        with self.app.app_context():
+            while not self.stop.wait(0.5):
+                try:
+                    oldest = Alert.query.order_by(Alert.timestamp, Alert.id).limit(100).all()
+                    forget_alerts(oldest)
+                    Alert.query.filter(Alert.id.in_([a.id for a in oldest])).delete(synchronize_session=False)
+                    db.session.commit()
+                    with self.lock:
+                        self.deleted += len(oldest)
+                except Exception as e:
+                    db.session.rollback()
+                    self.error('delete', e)
+
+    def reader(self, index):
+        with self.app.app_context():
+            turn = index
+            while not self.stop.is_set():
+                started = time.perf_counter()
+                try:
+                    if self.mode == 'legacy':
+                        self.read(turn, db.session)
+                        db.session.rollback()
+                    else:
+                        with read_session() as session:
+                            self.read(turn, session)
+                    with self.lock:
+                        self.reads += 1
+                        self.read_ms.append((time.perf_counter() - started) * 1000)
+                except Exception as e:
+                    db.session.rollback()
+                    self.error('read', e)
+                turn += 1
+
+    def read(self, turn, session):
+        if turn % 2:
+            alert_totals(session=session)
+        else:
+            query_alerts(limit=self.args.page, session=session)
+
+    def run(self):
+        threads = [threading.Thread(target=self.writer), threading.Thread(target=self.deleter)]
+        threads += [threading.Thread(target=self.reader, args=(i,)) for i in range(self.args.readers)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(self.args.seconds)
+        self.stop.set()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - started
+
+
+def run_mode(mode, url, args):
+    app = build_app(mode, url)
+    with app.app_context():
+        db.create_all()
+        if Alert.query.first() is None:
+            seed(SEED_ROWS, 0, random.Random(0), datetime.now() - timedelta(days=2))
+            rebuild_rollups()
+            db.session.commit()
+        journal = db.session.execute(text('PRAGMA journal_mode')).scalar() \
+            if db.engine.dialect.name == 'sqlite' else db.engine.dialect.name
+    load = Load(app, mode, args)
+    elapsed = load.run()
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+    return {
+        'journal': journal,
+        'alerts_s': load.written / elapsed,
+        'deleted_s': load.deleted / elapsed,
+        'reads_s': load.reads / elapsed,
+        'read_p50': statistics.median(load.read_ms) if load.read_ms else 0.0,
+        'read_p99': percentile(load.read_ms, 0.99),
+        'commit_p99': percentile(load.commit_ms, 0.99),
+        'commit_max': max(load.commit_ms, default=0.0),
+        'errors': load.errors
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--page', type=int, default=1000, help="rows per /alerts page read")
+    parser.add_argument('--batch', type=int, default=32, help="alerts per write transaction")
+    parser.add_argument('--rate', type=float, default=0, help="target alerts/s (0 = as fast as possible)")
+    parser.add_argument('--modes', default='legacy,wal')
+    parser.add_argument('--url', help="database URL for the wal mode instead of a temporary SQLite file")
+    args = parser.parse_args()
+
+    print(f"{args.readers} readers, 1 batch writer ({args.batch}/commit), 1 deleter, {args.seconds:g} s per mode")
+    print(f"{'mode':>7} {'journal':>8} {'alerts/s':>9} {'deleted/s':>9} {'reads/s':>8} {'read p50':>9} "
+          f"{'read p99':>9} {'commit p99':>10} {'commit max':>10}   (ms)")
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in [m.strip() for m in args.modes.split(',') if m.strip()]:
+            if mode not in ('legacy', 'wal'):
+                return f"Unknown mode '{mode}'; expected legacy or wal"
+            url = args.url if args.url and mode == 'wal' else f"sqlite:///{os.path.join(tmp, mode + '.db')}"
+            r = run_mode(mode, url, args)
+            print(f"{mode:>7} {r['journal']:>8} {r['alerts_s']:>9.0f} {r['deleted_s']:>9.0f} {r['reads_s']:>8.0f} "
+                  f"{r['read_p50']:>9.2f} {r['read_p99']:>9.2f} {r['commit_p99']:>10.2f} {r['commit_max']:>10.2f}")
+            for message, count in sorted(r['errors'].items()):
+                print(f"{'':>17}{count} x {message}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""Face (and hand) detection time and accuracy vs. detection resolution.
+
+Every frame of the fixture video is detected at full resolution as the
+baseline and again at each detection width. Boxes from downscaled runs are
+mapped back to full resolution and matched to the baseline at IoU >= 0.5.
+Hands are included when MediaPipe Hands is available; their landmarks are
+compared as the mean wrist-relative distance in normalized units.
+
+    python -m benchmarks.bench_detection_resolution --video fixture.mp4 [--widths 1280,960,640,480,320] [--frames 100]
+"""
+import argparse
+import statistics
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from safety_detection.faces import detect_faces_haar
+from safety_detection.tracking import iou_matrix
+from safety_detection.utils import downscale
+
+
+def read_frames(path, limit):
+    capture = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < limit:
+        ok, frame = capture.read()
+        if not ok:
+            break
+        frames.append(frame)
+    capture.release()
+    return frames
+
+
+def match(baseline, boxes, threshold=0.5):
+    """Greedy IoU matching; returns (matched, mean IoU of matches)"""
+    iou = iou_matrix(baseline, boxes)
+    matched, ious = 0, []
+    while iou.size and iou.max() >= threshold:
+        i, j = np.unravel_index(iou.argmax(), iou.shape)
+        ious.append(float(iou[i, j]))
+        iou[i, :] = 0
+        iou[:, j] = 0
+        matched += 1
+    return matched, (statistics.mean(ious) if ious else 0.0)
+
+
+def load_hands():
+    try:
+        import mediapipe as mp
+        return mp.solutions.hands.Hands(static_image_mode=True, max_num_hands=2,
+                                        min_detection_confidence=0.7)
+    except Exception as e:
+        print(f"(hands skipped: {type(e).__name__}: {e})")
+        return None
+
+
+def detect_hands(hands, frame, width):
+    small, _ = downscale(frame, width)
+    results = hands.process(cv2.cvtColor(small, cv2.COLOR_BGR2RGB))
+    return [
+        np.array([(lm.x, lm.y) for lm in hand.landmark])
+        for hand in (results.multi_hand_landmarks or [])
+    ]
+
+
+def hand_error(baseline, found):
+    """Mean landmark distance between baseline hands and their nearest match"""
+    errors = []
+    for hand in baseline:
+        if found:
+            errors.append(min(np.linalg.norm(hand - other, axis=1).mean() for other in found))
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--video', required=True, help='fixture video (ideally from a 1080p camera)')
+    parser.add_argument('--widths', default='1280,960,640,480,320')
+    parser.add_argument('--frames', type=int, default=100)
+    args = parser.parse_args()
+
+    frames = read_frames(args.video, args.frames)
+    if not frames:
+        sys.exit(f"Could not read frames from {args.video}")
+    cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+    hands = load_hands()
+    height, width = frames[0].shape[:2]
+    print(f"{len(frames)} frames at {width}x{height}")
+
+    def run(detection_width):
+        face_ms, hand_ms, boxes, hand_sets = [], [], [], []
+        for frame in frames:
+            started = time.perf_counter()
+            boxes.append(detect_faces_haar(cascade, frame, detection_width))
+            face_ms.append((time.perf_counter() - started) * 1000)
+            if hands is not None:
+                started = time.perf_counter()
+                hand_sets.append(detect_hands(hands, frame, detection_width))
+                hand_ms.append((time.perf_counter() - started) * 1000)
+        return face_ms, hand_ms, boxes, hand_sets
+
+    base_face_ms, base_hand_ms, base_boxes, base_hands = run(None)
+    total_faces = sum(len(b) for b in base_boxes)
+    total_hands = sum(len(h) for h in base_hands)
+    print(f"baseline: {total_faces} faces, {total_hands} hands")
+
+    header = f"{'width':>6} {'face ms':>8} {'recall':>7} {'precision':>9} {'IoU':>5}"
+    if hands is not None:
+        header += f" {'hand ms':>8} {'hands found':>11} {'lm err':>7}"
+    print(header)
+    widths = [None] + [int(w) for w in args.widths.split(',') if int(w) < width]
+    for detection_width in widths:
+        face_ms, hand_ms, boxes, hand_sets = (
+            (base_face_ms, base_hand_ms, base_boxes, base_hands) if detection_width is None
+            else run(detection_width)
+        )
+        matched, ious, found = 0, [], 0
+        for baseline, detected in zip(base_boxes, boxes):
+            m, iou = match(baseline, detected)
+            matched += m
+            found += len(detected)
+            if m:
+                ious.append(iou)
+        recall = matched / total_faces if total_faces else 1.0
+        precision = matched / found if found else 1.0
+        line = (f"{detection_width or width:>6} {statistics.median(face_ms):>8.1f} {recall:>7.2f} "
+                f"{precision:>9.2f} {statistics.mean(ious) if ious else 0.0:>5.2f}")
+        if hands is not None:
+            errors = [e for base, found_hands in zip(base_hands, hand_sets) for e in hand_error(base, found_hands)]
+            line += (f" {statistics.median(hand_ms):>8.1f} {sum(len(h) for h in hand_sets):>11}"
+                     f" {statistics.mean(errors) if errors else 0.0:>7.4f}")
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
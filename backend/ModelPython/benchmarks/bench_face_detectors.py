@@ -0,0 +1,113 @@
+"""Face detector latency and recall per backend, to pick a speed/accuracy tradeoff per site.
+
+The fixture set is a directory of images. An optional labels.json maps file
+names to ground-truth [x, y, w, h] face boxes; without it the first detector
+listed is used as the reference. Detectors are given as
+name[@detection_width][:dnn_backend/dnn_target], e.g.
+
+    python -m benchmarks.bench_face_detectors --fixtures faces/ \\
+        --detectors haar,haar@640,ssd,ssd:openvino/cpu,ssd:opencv/opencl
+
+SSD entries need res10_300x300_ssd_iter_140000.caffemodel in
+safety_detection/models/; unavailable detectors are reported and skipped.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from safety_detection.faces import HaarFaceDetector, SSDFaceDetector
+from safety_detection.tracking import iou_matrix
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+def load_fixtures(directory):
+    names = sorted(n for n in os.listdir(directory) if n.lower().endswith(IMAGE_EXTENSIONS))
+    images = [(n, cv2.imread(os.path.join(directory, n))) for n in names]
+    images = [(n, img) for n, img in images if img is not None]
+    labels = None
+    labels_path = os.path.join(directory, 'labels.json')
+    if os.path.exists(labels_path):
+        with open(labels_path) as f:
+            labels = {name: [tuple(box) for box in boxes] for name, boxes in json.load(f).items()}
+    return images, labels
+
+
+def build_detector(spec, confidence):
+    """Detector from a name[@width][:backend/target] spec"""
+    name, _, dnn = spec.partition(':')
+    name, _, width = name.partition('@')
+    backend, _, target = dnn.partition('/') if dnn else ('opencv', '', 'cpu')
+    if name == 'haar':
+        return HaarFaceDetector(detection_width=int(width) if width else None)
+    if name == 'ssd':
+        return SSDFaceDetector(confidence=confidence, backend=backend, target=target or 'cpu')
+    raise ValueError(f"Unknown detector '{name}'")
+
+
+def count_matches(truth, boxes, threshold=0.5):
+    iou = iou_matrix(truth, boxes)
+    matched = 0
+    while iou.size and iou.max() >= threshold:
+        i, j = np.unravel_index(iou.argmax(), iou.shape)
+        iou[i, :] = 0
+        iou[:, j] = 0
+        matched += 1
+    return matched
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fixtures', required=True, help='directory of images (+ optional labels.json)')
+    parser.add_argument('--detectors', default='haar,haar@640,ssd')
+    parser.add_argument('--confidence', type=float, default=0.5, help='SSD confidence threshold')
+    parser.add_argument('--repeat', type=int, default=3, help='timed passes over the fixture set')
+    args = parser.parse_args()
+
+    images, labels = load_fixtures(args.fixtures)
+    if not images:
+        sys.exit(f"No images found in {args.fixtures}")
+
+    results = []
+    for spec in args.detectors.split(','):
+        try:
+            detector = build_detector(spec, args.confidence)
+        except (RuntimeError, ValueError) as e:
+            print(f"{spec}: skipped ({str(e).splitlines()[0][:100]})")
+            continue
+        boxes = {name: detector.detect(img) for name, img in images}  # also warms up
+        samples = []
+        for _ in range(args.repeat):
+            for _, img in images:
+                started = time.perf_counter()
+                detector.detect(img)
+                samples.append((time.perf_counter() - started) * 1000)
+        if isinstance(detector, SSDFaceDetector):
+            spec = f"{spec} [{detector.backend}/{detector.target}]"
+        results.append((spec, samples, boxes))
+
+    if not results:
+        sys.exit("No detector could be loaded")
+    if labels is None:
+        print(f"No labels.json; recall/precision are relative to {results[0][0]}")
+        labels = results[0][2]
+
+    total = sum(len(labels.get(name, [])) for name, _ in images)
+    print(f"{len(images)} images, {total} reference faces")
+    print(f"{'detector':<32} {'median ms':>9} {'p95 ms':>7} {'recall':>7} {'precision':>9}")
+    for spec, samples, boxes in results:
+        matched = sum(count_matches(labels.get(name, []), boxes[name]) for name, _ in images)
+        found = sum(len(b) for b in boxes.values())
+        p95 = sorted(samples)[int(0.95 * (len(samples) - 1))]
+        print(f"{spec:<32} {statistics.median(samples):>9.1f} {p95:>7.1f} "
+              f"{matched / total if total else 1.0:>7.2f} {matched / found if found else 1.0:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Gender classification latency vs. number of faces: per-face vs batched.
+
+    python -m benchmarks.bench_gender_batch [--faces 1,2,4,8,16,32] [--repeat 20]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from safety_detection.gender import (
+    GENDER_INPUT_SIZE, GENDER_LABELS, GENDER_MEAN, classify_gender_batch
+)
+
+MODEL_DIR = os.path.join(os.path.dirname(__file__), '..', 'safety_detection', 'models')
+
+
+def classify_per_face(net, crops):
+    """The previous implementation: one blobFromImage + forward per face"""
+    results = []
+    for face in crops:
+        blob = cv2.dnn.blobFromImage(face, 1.0, GENDER_INPUT_SIZE, GENDER_MEAN, swapRB=False)
+        net.setInput(blob)
+        predictions = net.forward()
+        results.append((int(predictions[0].argmax()), float(predictions[0].max())))
+    return results
+
+
+def make_crops(count, rng):
+    """Random face-sized crops of varying size, like detectMultiScale output"""
+    sizes = rng.integers(40, 160, size=count)
+    return [rng.integers(0, 256, size=(s, s, 3), dtype=np.uint8) for s in sizes]
+
+
+def time_ms(fn, repeat):
+    fn()  # warm-up
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--faces', default='1,2,4,8,16,32')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--batch-size', type=int, default=32)
+    args = parser.parse_args()
+
+    weights = os.path.join(MODEL_DIR, 'gender_net.caffemodel')
+    if not os.path.exists(weights):
+        sys.exit(f"Missing {weights}; the gender net weights are required for this benchmark.")
+    net = cv2.dnn.readNetFromCaffe(os.path.join(MODEL_DIR, 'gender_deploy.prototxt'), weights)
+
+    rng = np.random.default_rng(0)
+    print(f"{'faces':>5}  {'per-face ms':>11}  {'batched ms':>10}  {'speedup':>7}  labels match")
+    for count in (int(n) for n in args.faces.split(',')):
+        crops = make_crops(count, rng)
+        single = time_ms(lambda: classify_per_face(net, crops), args.repeat)
+        batched = time_ms(lambda: classify_gender_batch(net, crops, args.batch_size), args.repeat)
+        match = ([i for i, _ in classify_per_face(net, crops)] ==
+                 [GENDER_LABELS.index(g) for g, _ in classify_gender_batch(net, crops, args.batch_size)])
+        print(f"{count:>5}  {single:>11.2f}  {batched:>10.2f}  {single / batched:>6.2f}x  {match}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+"""Gesture classification: legacy per-hand Python vs the scalar and vectorized paths.
+
+Checks that the legacy classifier and both classify_gestures paths agree on
+every fixture hand, then times them per hand count. classify_gestures
+takes the scalar path below VECTORIZE_MIN_HANDS hands, where the matrix
+setup costs more than it saves; the ``dispatch`` column is what callers
+get. Fixtures are synthetic poses (fists, open hands, OK signs, jittered
+and random hands) unless a landmark file is given: an (N x 21 x 3) .npy,
+or an .npz with a ``landmarks`` array such as
+tests/fixtures/hand_landmarks.npz.
+
+    python -m benchmarks.bench_gestures [--fixtures hands.npy] [--hands 1,2,3,4,8] [--repeat 2000]
+"""
+import argparse
+import statistics
+import sys
+import time
+from collections import Counter, namedtuple
+
+import numpy as np
+
+from safety_detection import gestures
+from safety_detection.gestures import (
+    DEFAULT_GESTURE_THRESHOLDS, INDEX_MCP, INDEX_TIP, MIDDLE_MCP, MIDDLE_TIP, NUM_LANDMARKS,
+    PINKY_MCP, PINKY_TIP, RING_MCP, RING_TIP, THUMB_MCP, THUMB_TIP, WRIST, classify_gestures
+)
+
+Landmark = namedtuple('Landmark', 'x y z')
+
+
+def legacy_check_hand_gestures(landmarks):
+    """The previous SafetyDetector._check_hand_gestures, with its hardcoded thresholds"""
+    thumb_tip = landmarks[THUMB_TIP]
+    thumb_mcp = landmarks[THUMB_MCP]
+    index_tip = landmarks[INDEX_TIP]
+    index_mcp = landmarks[INDEX_MCP]
+    middle_tip = landmarks[MIDDLE_TIP]
+    middle_mcp = landmarks[MIDDLE_MCP]
+    ring_tip = landmarks[RING_TIP]
+    ring_mcp = landmarks[RING_MCP]
+    pinky_tip = landmarks[PINKY_TIP]
+    pinky_mcp = landmarks[PINKY_MCP]
+    wrist = landmarks[WRIST]
+
+    def distance(p1, p2):
+        return ((p1.x - p2.x)**2 + (p1.y - p2.y)**2 + (p1.z - p2.z)**2)**0.5
+
+    thumb_to_wrist = distance(thumb_tip, wrist)
+    thumb_to_index_mcp = distance(thumb_tip, index_mcp)
+    thumb_to_middle_mcp = distance(thumb_tip, middle_mcp)
+    thumb_to_index_tip = distance(thumb_tip, index_tip)
+
+    index_curled = distance(index_tip, index_mcp) < 0.10
+    middle_curled = distance(middle_tip, middle_mcp) < 0.10
+    ring_curled = distance(ring_tip, ring_mcp) < 0.10
+    pinky_curled = distance(pinky_tip, pinky_mcp) < 0.10
+    curled_count = sum([index_curled, middle_curled, ring_curled, pinky_curled])
+    mostly_curled = curled_count >= 3
+    all_fingers_curled = curled_count == 4
+
+    thumb_inside_fist = (thumb_to_wrist < 0.15 and thumb_to_index_mcp < 0.10 and all_fingers_curled)
+    thumb_near_knuckles = (thumb_to_index_mcp < 0.12 or thumb_to_middle_mcp < 0.12) and mostly_curled
+    thumb_touching_finger = (thumb_to_index_tip < 0.10 and mostly_curled)
+    thumb_not_extended = distance(thumb_tip, wrist) < 0.20
+    fist_shape = (distance(index_tip, wrist) < distance(index_mcp, wrist) * 1.5 and
+                  distance(middle_tip, wrist) < distance(middle_mcp, wrist) * 1.5 and
+                  curled_count >= 2)
+    relaxed_thumb_palm = thumb_not_extended and fist_shape
+    if thumb_inside_fist or thumb_near_knuckles or thumb_touching_finger or relaxed_thumb_palm:
+        return "thumb_palm"
+
+    index_extended = distance(index_tip, wrist) > distance(index_mcp, wrist) * 1.2
+    middle_extended = distance(middle_tip, wrist) > distance(middle_mcp, wrist) * 1.2
+    ring_extended = distance(ring_tip, wrist) > distance(ring_mcp, wrist) * 1.2
+    pinky_extended = distance(pinky_tip, wrist) > distance(pinky_mcp, wrist) * 1.2
+    thumb_extended = distance(thumb_tip, wrist) > distance(thumb_mcp, wrist) * 1.2
+    fingers_spread = distance(index_tip, pinky_tip) > 0.15
+    if (index_extended and middle_extended and ring_extended and
+            pinky_extended and thumb_extended and fingers_spread):
+        return "wave"
+
+    thumb_index_distance = distance(thumb_tip, index_tip)
+    middle_extended_ok = distance(middle_tip, wrist) > distance(middle_mcp, wrist)
+    ring_extended_ok = distance(ring_tip, wrist) > distance(ring_mcp, wrist)
+    pinky_extended_ok = distance(pinky_tip, wrist) > distance(pinky_mcp, wrist)
+    if thumb_index_distance < 0.05 and middle_extended_ok and ring_extended_ok and pinky_extended_ok:
+        return "ok_sign"
+    return None
+
+
+def _pose(rng, curled, thumb):
+    """One hand: wrist at the bottom, knuckles in a row, tips extended or curled"""
+    hand = np.zeros((NUM_LANDMARKS, 3))
+    hand[WRIST] = (0.5, 0.8, 0.0)
+    for finger, (mcp, tip) in enumerate(zip([INDEX_MCP, MIDDLE_MCP, RING_MCP, PINKY_MCP],
+                                            [INDEX_TIP, MIDDLE_TIP, RING_TIP, PINKY_TIP])):
+        x = 0.44 + finger * 0.04
+        hand[mcp] = (x, 0.66, 0.0)
+        # Joints between knuckle and tip sit halfway
+        hand[mcp + 1:tip] = (x, 0.6, 0.0)
+        hand[tip] = (x + (finger - 1.5) * 0.03, 0.45, 0.0) if not curled[finger] else (x, 0.72, -0.02)
+    hand[THUMB_MCP] = (0.4, 0.74, 0.0)
+    hand[THUMB_MCP - 1] = (0.45, 0.78, 0.0)
+    hand[THUMB_MCP + 1] = (0.36, 0.7, 0.0)
+    hand[THUMB_TIP] = {
+        'out': (0.3, 0.62, 0.0),
+        'tucked': (0.46, 0.7, -0.01),
+        'pinch': tuple(hand[INDEX_TIP] + (0.01, 0.01, 0.0)),
+    }[thumb]
+    return hand + rng.normal(0, 0.012, hand.shape)
+
+
+def synthetic_fixtures(count, seed=0):
+    """Jittered canonical poses plus fully random hands"""
+    rng = np.random.default_rng(seed)
+    poses = [
+        ((True, True, True, True), 'tucked'),      # fist, thumb inside
+        ((True, True, True, False), 'tucked'),
+        ((False, False, False, False), 'out'),     # open hand
+        ((False, False, False, False), 'pinch'),   # OK sign
+        ((True, False, False, False), 'pinch'),
+        ((True, True, False, False), 'out'),
+    ]
+    hands = [_pose(rng, *poses[i % len(poses)]) for i in range(count // 2)]
+    random_hands = rng.uniform(0.2, 0.8, size=(count - len(hands), NUM_LANDMARKS, 3))
+    random_hands[..., 2] *= 0.1
+    return np.concatenate([np.array(hands), random_hands]).astype(np.float32)
+
+
+def load_fixtures(path):
+    """(N x 21 x 3) float32 landmarks from a .npy array or an .npz with a landmarks array"""
+    data = np.load(path)
+    if path.endswith('.npz'):
+        data = data['landmarks']
+    return data.astype(np.float32).reshape(-1, NUM_LANDMARKS, 3)
+
+
+def classify_path(landmarks, path):
+    """classify_gestures forced onto the 'scalar' or 'vectorized' path"""
+    previous = gestures.VECTORIZE_MIN_HANDS
+    gestures.VECTORIZE_MIN_HANDS = 1 if path == 'vectorized' else len(landmarks) + 1
+    try:
+        return classify_gestures(landmarks, DEFAULT_GESTURE_THRESHOLDS)
+    finally:
+        gestures.VECTORIZE_MIN_HANDS = previous
+
+
+def check_parity(fixtures):
+    """Legacy and both paths on every hand; returns (mismatches, label counts)"""
+    paths = {path: classify_path(fixtures, path) for path in ('scalar', 'vectorized')}
+    mismatches = []
+    for i, hand in enumerate(fixtures):
+        expected = legacy_check_hand_gestures([Landmark(*map(float, lm)) for lm in hand])
+        for path, labels in paths.items():
+            if expected != labels[i]:
+                mismatches.append((i, path, expected, labels[i]))
+    return mismatches, Counter(paths['vectorized'])
+
+
+def time_us(fn, repeat):
+    fn()  # warm-up
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1e6)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fixtures', help='.npy (N x 21 x 3) or .npz landmark file')
+    parser.add_argument('--count', type=int, default=2000, help='synthetic fixture hands')
+    parser.add_argument('--hands', default='1,2,3,4,8', help='hands per frame to time')
+    parser.add_argument('--repeat', type=int, default=2000)
+    args = parser.parse_args()
+
+    if args.fixtures:
+        fixtures = load_fixtures(args.fixtures)
+    else:
+        fixtures = synthetic_fixtures(args.count)
+
+    mismatches, labels = check_parity(fixtures)
+    print(f"parity: {len(fixtures) - len(mismatches)}/{len(fixtures)} hands agree "
+          f"({', '.join(f'{k}={v}' for k, v in sorted(labels.items(), key=str))})")
+    for i, path, expected, got in mismatches[:10]:
+        print(f"  hand {i}: legacy={expected} {path}={got}")
+
+    print(f"vectorized from {gestures.VECTORIZE_MIN_HANDS} hands")
+    print(f"{'hands':>5} {'legacy us':>10} {'scalar us':>10} {'vectorized us':>14} {'dispatch us':>12} "
+          f"{'vs legacy':>10}")
+    for count in [int(n) for n in args.hands.split(',')]:
+        batch = fixtures[:count]
+        # Legacy input mimics MediaPipe's landmark objects
+        landmark_lists = [[Landmark(*map(float, lm)) for lm in hand] for hand in batch]
+        legacy = time_us(lambda: [legacy_check_hand_gestures(h) for h in landmark_lists], args.repeat)
+        scalar = time_us(lambda: classify_path(batch, 'scalar'), args.repeat)
+        vectorized = time_us(lambda: classify_path(batch, 'vectorized'), args.repeat)
+        dispatch = time_us(lambda: classify_gestures(batch, DEFAULT_GESTURE_THRESHOLDS), args.repeat)
+        print(f"{count:>5} {legacy:>10.1f} {scalar:>10.1f} {vectorized:>14.1f} {dispatch:>12.1f} "
+              f"{legacy / dispatch:>9.2f}x")
+
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""MJPEG stream cost per viewer: encode per viewer vs. encode once and share.
+
+"before" is the old /video_feed path: every viewer runs cv2.imencode at
+OpenCV's default quality (95) on every frame and concatenates its own
+multipart chunk. "after" encodes each frame once with JpegEncoder
+(quality / max width / encoder as given) and hands the same chunk to every
+viewer. Bytes/s assume the source delivers --fps frames per second.
+
+    python -m benchmarks.bench_mjpeg [--video fixture.mp4] [--viewers 1,4,8] \\
+        [--quality 80] [--max-width 960] [--encoder auto] [--fps 15]
+"""
+import argparse
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from safety_detection.encoding import JpegEncoder, mjpeg_chunk
+
+
+def read_frames(path, limit):
+    capture = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < limit:
+        ok, frame = capture.read()
+        if not ok:
+            break
+        frames.append(frame)
+    capture.release()
+    return frames
+
+
+def synthetic_frames(count, width=1280, height=720):
+    """Smooth gradient scene with a moving shape and mild sensor noise"""
+    rng = np.random.default_rng(0)
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    base = np.dstack([x + 0 * y, y + 0 * x, (x + y) / 2]).astype(np.uint8)
+    frames = []
+    for i in range(count):
+        frame = base.copy()
+        cv2.rectangle(frame, (50 + 10 * i, 200), (250 + 10 * i, 500), (40, 40, 200), -1)
+        noise = rng.integers(-4, 5, frame.shape, dtype=np.int16)
+        frames.append(np.clip(frame.astype(np.int16) + noise, 0, 255).astype(np.uint8))
+    return frames
+
+
+def run_before(frames, viewers):
+    sent = 0
+    for frame in frames:
+        for _ in range(viewers):
+            _, buffer = cv2.imencode('.jpg', frame)
+            chunk = b'--frame\r\nContent-Type: image/jpeg\r\n\r\n' + buffer.tobytes() + b'\r\n'
+            sent += len(chunk)
+    return sent
+
+
+def run_after(frames, viewers, encoder):
+    sent = 0
+    for frame in frames:
+        chunk = mjpeg_chunk(encoder.encode(frame))
+        for _ in range(viewers):
+            sent += len(chunk)
+    return sent
+
+
+def measure(run, *args):
+    started = time.process_time()
+    sent = run(*args)
+    return sent, time.process_time() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--video', help='fixture video (synthetic 720p frames if omitted)')
+    parser.add_argument('--frames', type=int, default=60)
+    parser.add_argument('--viewers', default='1,4,8')
+    parser.add_argument('--quality', type=int, default=80)
+    parser.add_argument('--max-width', type=int, default=None)
+    parser.add_argument('--encoder', default='auto', help='auto, opencv or turbojpeg')
+    parser.add_argument('--fps', type=float, default=15.0, help='source frame rate for bytes/s')
+    args = parser.parse_args()
+
+    frames = read_frames(args.video, args.frames) if args.video else synthetic_frames(args.frames)
+    if not frames:
+        sys.exit(f"Could not read frames from {args.video}")
+    height, width = frames[0].shape[:2]
+    encoder = JpegEncoder(args.quality, args.max_width, args.encoder)
+    print(f"{len(frames)} frames at {width}x{height}; after = {encoder.name} q{args.quality}"
+          f"{f' max {args.max_width}px' if args.max_width else ''}")
+    print(f"{'viewers':>7} {'mode':>6} {'KB/s per viewer':>15} {'CPU ms/frame':>12} "
+          f"{'CPU ms/frame/viewer':>19}")
+    for viewers in [int(v) for v in args.viewers.split(',')]:
+        for mode, run, extra in (('before', run_before, ()), ('after', run_after, (encoder,))):
+            sent, cpu = measure(run, frames, viewers, *extra)
+            per_frame = cpu * 1000 / len(frames)
+            rate = sent / len(frames) / viewers * args.fps / 1024
+            print(f"{viewers:>7} {mode:>6} {rate:>15.0f} {per_frame:>12.2f} {per_frame / viewers:>19.2f}")
+
+
+if __name__ == '__main__':
+    main()
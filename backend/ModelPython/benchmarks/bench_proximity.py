@@ -0,0 +1,111 @@
+"""Spatial "surrounded" check: Python pair loop vs dense NumPy vs grid index.
+
+Synthetic crowds of face boxes (1080p, sizes falling off with distance
+from the camera) are judged with the same SurroundRule by a per-pair
+Python loop, the dense (women x men) NumPy path and the grid index; all
+three must agree. The previous check (first woman only, raw 100 px
+top-left offsets) is timed for reference.
+
+    python -m benchmarks.bench_proximity [--faces 20,100,300,1000,3000] [--repeat 20] \\
+        [--min-males 2] [--min-sides 2]
+"""
+import argparse
+import math
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from safety_detection.proximity import SurroundRule, near_males, surrounded_females
+
+
+def legacy_is_surrounded(females, males):
+    """The previous SafetyDetector._is_surrounded"""
+    if not females or not males:
+        return False
+    wx, wy = females[0][:2]
+    for mx, my, mw, mh in males:
+        if abs(mx - wx) < 100 and abs(my - wy) < 100:
+            return True
+    return False
+
+
+def python_surrounded(females, males, rule):
+    """Per-pair Python loop implementing the same rule as proximity.py"""
+    surrounded = []
+    for i, (fx, fy, fw, fh) in enumerate(females):
+        fcx, fcy, fs = fx + fw / 2, fy + fh / 2, math.sqrt(max(fw * fh, 1))
+        near, sides = 0, set()
+        for mx, my, mw, mh in males:
+            mcx, mcy, ms = mx + mw / 2, my + mh / 2, math.sqrt(max(mw * mh, 1))
+            dx, dy = mcx - fcx, mcy - fcy
+            if math.hypot(dx, dy) / ((fs + ms) / 2) > rule.radius:
+                continue
+            if max(fs, ms) / min(fs, ms) > rule.max_size_ratio:
+                continue
+            near += 1
+            angle = math.atan2(dy, dx) + math.pi / rule.sectors
+            sides.add(math.floor(angle / (2 * math.pi / rule.sectors)) % rule.sectors)
+        if near >= rule.min_males and (rule.min_sides <= 1 or len(sides) >= rule.min_sides):
+            surrounded.append(i)
+    return surrounded
+
+
+def synthetic_crowd(count, rng, width=1920, height=1080):
+    """count face boxes, about a third female; faces lower in the frame are closer and larger"""
+    ys = rng.uniform(0.1, 0.95, count) * height
+    sizes = 20 + 100 * (ys / height) ** 2 * rng.uniform(0.8, 1.2, count)
+    xs = rng.uniform(0, width, count)
+    boxes = [(int(x - s / 2), int(y - s / 2), int(s), int(s)) for x, y, s in zip(xs, ys, sizes)]
+    female = rng.random(count) < 0.35
+    return ([b for b, f in zip(boxes, female) if f], [b for b, f in zip(boxes, female) if not f])
+
+
+def time_ms(fn, repeat):
+    fn()  # warm-up
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--faces', default='20,100,300,1000,3000')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--min-males', type=int, default=2)
+    parser.add_argument('--min-sides', type=int, default=2)
+    args = parser.parse_args()
+
+    rule = SurroundRule(min_males=args.min_males, min_sides=args.min_sides)
+    rng = np.random.default_rng(0)
+    print(f"rule: {rule.min_males}+ men within {rule.radius} face sizes on {rule.min_sides}+ sides")
+    print(f"{'faces':>6} {'women':>6} {'men':>5} {'surr.':>6} {'legacy ms':>10} {'python ms':>10} "
+          f"{'dense ms':>9} {'grid ms':>8}")
+    for count in [int(n) for n in args.faces.split(',')]:
+        females, males = synthetic_crowd(count, rng)
+        expected = python_surrounded(females, males, rule)
+        dense = surrounded_females(females, males, rule, grid_min_pairs=sys.maxsize)
+        grid = surrounded_females(females, males, rule, grid_min_pairs=0)
+        if dense != expected or grid != expected:
+            return f"Mismatch at {count} faces: python {expected[:10]}, dense {dense[:10]}, grid {grid[:10]}"
+        dense_near = near_males(females, males, rule, grid_min_pairs=sys.maxsize)
+        grid_near = near_males(females, males, rule, grid_min_pairs=0)
+        if any(not np.array_equal(a, b) for a, b in zip(dense_near, grid_near)):
+            return f"Near-male sets differ at {count} faces"
+
+        legacy = time_ms(lambda: legacy_is_surrounded(females, males), args.repeat)
+        python = time_ms(lambda: python_surrounded(females, males, rule), args.repeat)
+        dense_ms = time_ms(lambda: surrounded_females(females, males, rule, grid_min_pairs=sys.maxsize),
+                           args.repeat)
+        grid_ms = time_ms(lambda: surrounded_females(females, males, rule, grid_min_pairs=0), args.repeat)
+        print(f"{count:>6} {len(females):>6} {len(males):>5} {len(expected):>6} {legacy:>10.3f} "
+              f"{python:>10.3f} {dense_ms:>9.3f} {grid_ms:>8.3f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,450 @@
+"""End-to-end benchmark suite, compared against a stored baseline.
+
+    python -m benchmarks.suite [--cases gestures,face_detect,...] [--video fixture.avi] \\
+        [--landmarks hands.npy] [--baseline benchmarks/baseline.json] [--update-baseline] \\
+        [--tolerance 0.25] [--quick] [--json results.json]
+
+Cases (all headless and CPU-only; no camera is opened):
+
+- gestures: classify_gestures + GestureConfirmer over landmark fixtures
+  (synthetic poses from bench_gestures, or an N x 21 x 3 .npy / landmarks .npz)
+- face_detect: the configured face detector on every frame
+- detect_genders: SafetyDetector.detect_genders (detect, track, classify, draw)
+- process_frame: SafetyDetector.process_frame with every stage on every frame,
+  driven by a video clock at noon so results do not depend on the time of day
+- api_alerts, api_alerts_filtered, api_stats: GET requests against app.py
+  with a seeded alerts database
+- video_feed: frames per second delivered by GET /video_feed from a file
+  source
+
+Frames are the synthetic 720p scene from bench_mjpeg unless --video gives
+a recorded fixture (use one with people in it to load the face and gender
+stages). Every random input is seeded. Cases whose models or dependencies
+are missing are reported as skipped.
+
+FPS/requests per second, p50/p95 latency and resident memory after each
+case are compared with the baseline; anything worse by more than
+--tolerance is reported as a REGRESSION and the exit status is 1. So is
+every selected case that was skipped in this run or has no baseline
+measurement: leave such a case out of --cases explicitly rather than let
+it pass unchecked. --update-baseline records this run instead; record it on
+a machine with every model file so all cases are covered.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.bench_alerts_api import seed  # noqa: E402
+from benchmarks.bench_gestures import load_fixtures, synthetic_fixtures  # noqa: E402
+from benchmarks.bench_mjpeg import read_frames, synthetic_frames  # noqa: E402
+
+CASES = ('gestures', 'face_detect', 'detect_genders', 'process_frame',
+         'api_alerts', 'api_alerts_filtered', 'api_stats', 'video_feed')
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+# Metrics compared with the baseline; everything else is informational
+HIGHER_IS_BETTER = ('fps', 'rps', 'hands_per_s')
+LOWER_IS_BETTER = ('p50_ms', 'p95_ms', 'p50_us', 'p95_us')
+# Noon on a fixed day: the night-time rules never fire during process_frame
+BENCH_TIME = datetime(2024, 1, 1, 12, 0, 0)
+
+
+class Skip(Exception):
+    """A case cannot run here (missing model, dependency or fixture)"""
+
+
+def rss_mb() -> float:
+    """Current resident set size; peak RSS where /proc is unavailable"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def latency(samples, unit='ms') -> dict:
+    scale = 1000 if unit == 'ms' else 1e6
+    p50, p95, p99 = np.percentile(np.array(samples) * scale, [50, 95, 99])
+    return {f'p50_{unit}': round(float(p50), 3), f'p95_{unit}': round(float(p95), 3),
+            f'p99_{unit}': round(float(p99), 3)}
+
+
+def timed(fn, items, warmup=3):
+    """Per-item seconds of fn(item), after a few warm-up calls"""
+    for item in items[:warmup]:
+        fn(item)
+    samples = []
+    for item in items:
+        started = time.perf_counter()
+        fn(item)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def frame_result(samples) -> dict:
+    result = {'frames': len(samples), 'fps': round(len(samples) / sum(samples), 2)}
+    result.update(latency(samples))
+    return result
+
+
+class Fixtures:
+    """Deterministic inputs shared by the cases, built on first use"""
+
+    def __init__(self, args):
+        self.args = args
+        self.tmp = tempfile.mkdtemp(prefix='safewatch-bench-')
+        self._frames = None
+        self._video = None
+
+    @property
+    def frames(self):
+        if self._frames is None:
+            count = 30 if self.args.quick else self.args.frames
+            if self.args.video:
+                self._frames = read_frames(self.args.video, count)
+                if not self._frames:
+                    raise Skip(f"Could not read frames from {self.args.video}")
+            else:
+                self._frames = synthetic_frames(count)
+        return self._frames
+
+    @property
+    def video(self) -> str:
+        """A file source for /video_feed: the fixture, or the synthetic frames written out"""
+        if self.args.video:
+            return self.args.video
+        if self._video is None:
+            self._video = os.path.join(self.tmp, 'bench.avi')
+            height, width = self.frames[0].shape[:2]
+            # A high nominal rate so FrameHub's native-rate playback does not throttle
+            writer = cv2.VideoWriter(self._video, cv2.VideoWriter_fourcc(*'MJPG'), 200, (width, height))
+            for _ in range(20):
+                for frame in self.frames:
+                    writer.write(frame)
+            writer.release()
+        return self._video
+
+    def landmarks(self):
+        if self.args.landmarks:
+            return load_fixtures(self.args.landmarks)
+        return synthetic_fixtures(500 if self.args.quick else 4000)
+
+    def cleanup(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+
+def build_detector(fixtures):
+    try:
+        from safety_detection.detector import SafetyDetector
+        from safety_detection.offline import FrameSink, VideoClock, offline_config
+    except ImportError as e:
+        raise Skip(str(e))
+
+    clock = VideoClock()
+    try:
+        detector = SafetyDetector(
+            offline_config(known_time=True, every_frame=True), camera_id='bench',
+            alert_writer=FrameSink(os.path.join(fixtures.tmp, 'alerts')), clock=clock,
+            time_origin=BENCH_TIME
+        )
+        detector.ensure_models()
+    except (RuntimeError, AttributeError) as e:
+        # AttributeError: a mediapipe build without the legacy solutions API
+        raise Skip(str(e))
+    return detector, clock
+
+
+def case_gestures(fixtures):
+    from safety_detection.gestures import DEFAULT_GESTURE_THRESHOLDS, classify_gestures
+    from safety_detection.temporal import GestureConfirmer
+
+    landmarks = fixtures.landmarks()
+    thresholds = dict(DEFAULT_GESTURE_THRESHOLDS)
+    confirmer = GestureConfirmer(window=15, min_frames=8, clock=lambda: 0.0)
+    frames = [landmarks[i:i + 2] for i in range(0, len(landmarks) - 1, 2)]
+    position = {'now': 0.0}
+
+    def step(hands):
+        labels = classify_gestures(hands, thresholds)
+        position['now'] += 1 / 15
+        confirmer.update([
+            {'landmarks': hand, 'hand': side, 'score': 0.9, 'gesture': label}
+            for hand, side, label in zip(hands, ('Left', 'Right'), labels)
+        ], now=position['now'])
+
+    samples = timed(step, frames)
+    result = {'hands': 2 * len(frames), 'hands_per_s': round(2 * len(frames) / sum(samples), 1)}
+    result.update(latency(samples, 'us'))
+    return result
+
+
+def case_face_detect(fixtures):
+    from safety_detection.faces import create_face_detector
+    from safety_detection.models import DetectionConfig
+
+    try:
+        detector = create_face_detector(DetectionConfig())
+    except (RuntimeError, cv2.error) as e:
+        raise Skip(str(e))
+    faces = []
+    samples = timed(lambda frame: faces.append(len(detector.detect(frame))), fixtures.frames)
+    result = frame_result(samples)
+    result['faces'] = sum(faces[-len(samples):])
+    return result
+
+
+def case_detect_genders(fixtures):
+    detector, _ = build_detector(fixtures)
+    try:
+        return frame_result(timed(lambda frame: detector.detect_genders(frame.copy()), fixtures.frames))
+    finally:
+        detector.release()
+
+
+def case_process_frame(fixtures):
+    detector, clock = build_detector(fixtures)
+    alerts = []
+
+    def step(frame):
+        clock.now += 1 / 15
+        _, alert = detector.process_frame(frame.copy())
+        if alert is not None:
+            alerts.append(alert)
+
+    try:
+        result = frame_result(timed(step, fixtures.frames))
+    finally:
+        detector.release()
+    result['alerts'] = len(alerts)
+    result['stages'] = detector.metrics.summary()['stages']
+    return result
+
+
+class AppHarness:
+    """app.py imported against a throwaway seeded database and a file camera"""
+
+    def __init__(self, fixtures):
+        self.fixtures = fixtures
+        self._app = None
+
+    @property
+    def module(self):
+        if self._app is None:
+            tmp = self.fixtures.tmp
+            os.environ['SAFEWATCH_DATABASE_URL'] = 'sqlite:///' + os.path.join(tmp, 'alerts.db')
+            os.environ['SAFEWATCH_CAMERAS'] = 'bench=' + self.fixtures.video
+            os.environ['SAFEWATCH_LOCATION'] = '28.6139,77.2090'
+            # app.py keeps alert frames and thumbnails relative to the working directory
+            os.chdir(tmp)
+            try:
+                import app
+            except (ImportError, RuntimeError, AttributeError) as e:
+                raise Skip(f"app.py could not be loaded: {e}")
+            from safety_detection.rollups import rebuild_rollups
+
+            with app.app.app_context():
+                seed(self.fixtures.args.alerts, 0, random.Random(0), datetime(2024, 1, 1))
+                rebuild_rollups()
+                app.db.session.commit()
+            self._app = app
+        return self._app
+
+    def requests(self, path, count):
+        client = self.module.app.test_client()
+
+        def get(_):
+            response = client.get(path)
+            if response.status_code != 200:
+                raise RuntimeError(f"GET {path} returned {response.status_code}")
+
+        samples = timed(get, list(range(count)), warmup=5)
+        result = {'requests': count, 'rps': round(count / sum(samples), 1)}
+        result.update(latency(samples))
+        return result
+
+    def video_feed(self, count):
+        # The camera loads the same models; without them no frame would ever arrive
+        detector, _ = build_detector(self.fixtures)
+        detector.release()
+        client = self.module.app.test_client()
+        response = client.get('/video_feed', buffered=False)
+        chunks = iter(response.response)
+        try:
+            for _ in range(5):
+                next(chunks)
+            samples, sizes = [], []
+            started = time.perf_counter()
+            for _ in range(count):
+                sizes.append(len(next(chunks)))
+                now = time.perf_counter()
+                samples.append(now - started)
+                started = now
+        finally:
+            response.close()
+        result = frame_result(samples)
+        result['avg_bytes'] = int(sum(sizes) / len(sizes))
+        return result
+
+
+def run_cases(names, fixtures, args):
+    harness = AppHarness(fixtures)
+    requests = 50 if args.quick else args.requests
+    runners = {
+        'gestures': lambda: case_gestures(fixtures),
+        'face_detect': lambda: case_face_detect(fixtures),
+        'detect_genders': lambda: case_detect_genders(fixtures),
+        'process_frame': lambda: case_process_frame(fixtures),
+        'api_alerts': lambda: harness.requests('/alerts?limit=50', requests),
+        'api_alerts_filtered': lambda: harness.requests('/alerts?limit=50&alert_type=distress', requests),
+        'api_stats': lambda: harness.requests('/api/stats', requests),
+        'video_feed': lambda: harness.video_feed(30 if args.quick else 100)
+    }
+    results = {}
+    for name in names:
+        started = time.perf_counter()
+        try:
+            result = runners[name]()
+        except Skip as e:
+            result = {'skipped': str(e)}
+        result['rss_mb'] = round(rss_mb(), 1)
+        result['seconds'] = round(time.perf_counter() - started, 2)
+        results[name] = result
+        print(f"  {name:<20} {summarize(result)}", flush=True)
+    return results
+
+
+def summarize(result: dict) -> str:
+    if 'skipped' in result:
+        return f"skipped: {result['skipped']}"
+    keys = HIGHER_IS_BETTER + LOWER_IS_BETTER + ('p99_ms', 'p99_us', 'rss_mb')
+    return '  '.join(f"{key}={result[key]}" for key in keys if key in result)
+
+
+def machine() -> dict:
+    return {
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpus': os.cpu_count(),
+        'python': platform.python_version(),
+        'opencv': cv2.__version__
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float, cases) -> list:
+    """Failed checks against the baseline, as messages.
+
+    Every case in ``cases`` must have run and have a baseline measurement;
+    its metrics, resident memory included, must be within tolerance.
+    """
+    failures = []
+    for name in cases:
+        result = results.get(name, {'skipped': 'not run'})
+        base = baseline.get('cases', {}).get(name)
+        if not base or 'skipped' in base:
+            failures.append(f"{name}: no baseline measurement; record one with --update-baseline "
+                            f"or leave it out of --cases")
+            continue
+        if 'skipped' in result:
+            failures.append(f"{name}: skipped ({result['skipped']}) but the baseline measures it")
+            continue
+        for key in HIGHER_IS_BETTER + LOWER_IS_BETTER + ('rss_mb',):
+            if not base.get(key) or key not in result:
+                continue
+            change = result[key] / base[key] - 1
+            worse = -change if key in HIGHER_IS_BETTER else change
+            if worse > tolerance:
+                failures.append(f"{name}.{key}: {base[key]} -> {result[key]} ({change:+.0%})")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cases', default=','.join(CASES), help='comma-separated subset of ' + ', '.join(CASES))
+    parser.add_argument('--video', help='recorded fixture video (synthetic 720p frames if omitted)')
+    parser.add_argument('--landmarks', help='.npy (N x 21 x 3) or .npz hand landmark file')
+    parser.add_argument('--frames', type=int, default=120, help='frames per detector case')
+    parser.add_argument('--requests', type=int, default=300, help='requests per endpoint case')
+    parser.add_argument('--alerts', type=int, default=20000, help='alerts seeded into the database')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--update-baseline', action='store_true', help='record this run as the baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed relative slowdown')
+    parser.add_argument('--quick', action='store_true', help='fewer frames and requests (smoke run)')
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args()
+
+    names = [n.strip() for n in args.cases.split(',') if n.strip()]
+    unknown = [n for n in names if n not in CASES]
+    if unknown:
+        sys.exit(f"Unknown cases: {', '.join(unknown)} (choose from {', '.join(CASES)})")
+
+    cwd = os.getcwd()
+    fixtures = Fixtures(args)
+    print(f"SafeWatch benchmark suite on {machine()['processor']} x{os.cpu_count()}, "
+          f"{'video ' + args.video if args.video else 'synthetic frames'}")
+    try:
+        results = run_cases(names, fixtures, args)
+    finally:
+        os.chdir(cwd)
+        fixtures.cleanup()
+
+    run = {'machine': machine(), 'cases_run': names, 'quick': args.quick, 'cases': results}
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(run, f, indent=2, sort_keys=True)
+
+    if args.update_baseline:
+        baseline = {'cases': {}}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline['cases'].update({n: r for n, r in results.items() if 'skipped' not in r})
+        missing = [n for n in CASES if n not in baseline['cases']]
+        if missing:
+            print(f"Warning: the baseline has no measurement for {', '.join(missing)}; "
+                  "default runs fail until it does")
+        baseline.update({'machine': run['machine'], 'cases_run': names, 'quick': args.quick,
+                         'recorded': datetime.now().isoformat(timespec='seconds')})
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline to record one")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get('machine', {}).get('processor') != run['machine']['processor'] or \
+            baseline.get('machine', {}).get('cpus') != run['machine']['cpus']:
+        print("Warning: the baseline was recorded on a different machine; "
+              "re-record it with --update-baseline before trusting comparisons")
+    if baseline.get('quick') != args.quick:
+        print("Warning: the baseline and this run differ in --quick")
+    failures = compare(results, baseline, args.tolerance, names)
+    if failures:
+        print(f"\nREGRESSION: {len(failures)} check(s) failed against the baseline "
+              f"(tolerance {args.tolerance:.0%}):")
+        for line in failures:
+            print(f"  {line}")
+        return 1
+    print(f"\nNo regressions beyond {args.tolerance:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
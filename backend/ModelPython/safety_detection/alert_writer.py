@@ -0,0 +1,206 @@
+import queue
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+
+from .db import db
+from .models import Alert as DBAlert
+from .rollups import record_alerts
+from .utils import get_location, save_alert_frame
+
+
+class AlertWriter:
+    """Background persistence for alerts raised in the video loop.
+
+    ``submit`` only copies the frame and enqueues it, so the frame loop never
+    waits on JPEG writes, geolocation or the database. A single writer thread
+    drains the bounded queue in batches: it writes the frames, resolves
+    missing coordinates, then inserts the whole batch with one commit inside
+    its own app context. When the queue is full, ``submit`` waits up to
+    ``block_timeout`` seconds and then drops the alert, counting the drop.
+    With an ``event_bus``, each stored alert is published as an ``alert``
+    event once committed; with ``thumbnails`` (a ThumbnailCache), each
+    frame's thumbnail is written alongside it. Frames go through
+    ``frame_store`` (a storage.FrameStore) when given, so its footprint
+    stays current.
+    """
+
+    def __init__(self, app=None, max_queue: int = 256, batch_size: int = 32,
+                 flush_interval: float = 0.5, block_timeout: float = 0.0,
+                 event_bus=None, thumbnails=None, frame_store=None):
+        self.app = app
+        self.frame_store = frame_store
+        self.event_bus = event_bus
+        self.thumbnails = thumbnails
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.block_timeout = block_timeout
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._cond = threading.Condition()
+        self._pending = 0  # submitted but not yet written (or failed)
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+        # Counters
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+        self.max_depth = 0
+        self.last_batch_ms = 0.0
+
+    def init_app(self, app):
+        self.app = app
+
+    def start(self):
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="AlertWriter", daemon=True)
+            self._thread.start()
+
+    def submit(self, alert, frame: np.ndarray) -> bool:
+        """Queue a transient Alert and its frame; returns False if dropped.
+
+        ``alert.frame_path`` must already be set; ``alert.latitude`` and
+        ``alert.longitude`` may be None to be resolved by the writer.
+        """
+        if self._closed:
+            self.dropped += 1
+            return False
+        self.start()
+        with self._cond:
+            self._pending += 1
+        try:
+            self._queue.put((alert, frame.copy()), timeout=self.block_timeout or None,
+                            block=self.block_timeout > 0)
+        except queue.Full:
+            with self._cond:
+                self._pending -= 1
+                self.dropped += 1
+                self._cond.notify_all()
+            print(f"Alert queue full, dropped {alert.alert_type} alert")
+            return False
+        with self._cond:
+            self.enqueued += 1
+            self.max_depth = max(self.max_depth, self._queue.qsize())
+        return True
+
+    def _run(self):
+        while True:
+            try:
+                job = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                if self._closed:
+                    return
+                continue
+            if job is None:
+                return
+            batch = [job]
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    job = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if job is None:
+                    stop = True
+                    break
+                batch.append(job)
+            self._write_batch(batch)
+            if stop:
+                return
+
+    def _write_batch(self, batch):
+        started = time.perf_counter()
+        rows = []
+        for alert, frame in batch:
+            try:
+                if self.frame_store is not None:
+                    self.frame_store.save(frame, alert.frame_path)
+                else:
+                    save_alert_frame(frame, frame_path=alert.frame_path)
+                if self.thumbnails is not None:
+                    self._write_thumbnail(frame, alert.frame_path)
+                if alert.latitude is None or alert.longitude is None:
+                    alert.latitude, alert.longitude = get_location()
+                rows.append(DBAlert(
+                    alert_type=alert.alert_type,
+                    timestamp=alert.timestamp,
+                    latitude=alert.latitude,
+                    longitude=alert.longitude,
+                    frame_path=alert.frame_path,
+                    male_count=alert.male_count,
+                    female_count=alert.female_count,
+                    gesture=alert.gesture,
+                    confidence=alert.confidence,
+                    camera_id=alert.camera_id
+                ))
+            except Exception as e:
+                self.failed += 1
+                print(f"Error writing alert frame {alert.frame_path}: {e}")
+
+        written = 0
+        stored = []
+        if rows:
+            try:
+                with self.app.app_context():
+                    db.session.add_all(rows)
+                    record_alerts(rows)
+                    db.session.commit()
+                    if self.event_bus is not None:
+                        stored = [row.to_dict() for row in rows]
+                written = len(rows)
+            except Exception as e:
+                self.failed += len(rows)
+                print(f"Error saving {len(rows)} alerts: {e}")
+                with self.app.app_context():
+                    db.session.rollback()
+        for alert in stored:
+            self.event_bus.publish('alert', alert)
+
+        with self._cond:
+            self.written += written
+            self.batches += 1
+            self.last_batch_ms = (time.perf_counter() - started) * 1000
+            self._pending -= len(batch)
+            self._cond.notify_all()
+
+    def _write_thumbnail(self, frame: np.ndarray, frame_path: str):
+        # A missing thumbnail is regenerated on request, so never fail the alert
+        try:
+            self.thumbnails.write(frame, frame_path)
+        except Exception as e:
+            print(f"Error writing thumbnail for {frame_path}: {e}")
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every submitted alert is persisted; False on timeout"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pending <= 0, timeout)
+
+    def close(self, timeout: float = 10.0) -> bool:
+        """Flush outstanding alerts and stop the writer thread"""
+        flushed = self.flush(timeout)
+        self._closed = True
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+        return flushed
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                'queue_depth': self._queue.qsize(),
+                'queue_capacity': self._queue.maxsize,
+                'max_depth': self.max_depth,
+                'pending': self._pending,
+                'enqueued': self.enqueued,
+                'written': self.written,
+                'dropped': self.dropped,
+                'failed': self.failed,
+                'batches': self.batches,
+                'last_batch_ms': round(self.last_batch_ms, 2)
+            }
@@ -0,0 +1,243 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Union
+
+from .detector import SafetyDetector
+from .encoding import JpegEncoder
+from .location import LocationProvider, StaticLocationProvider
+from .models import DetectionConfig
+from .parallel import ProcessInferenceBackend
+from .profiling import ProfileCapture
+from .stream import FrameHub
+
+
+def parse_source(value: Union[int, str]) -> Union[int, str]:
+    """Turn a camera source spec into a VideoCapture argument.
+
+    Digit strings are local device indices; anything else (file path,
+    rtsp://, http:// URL) is passed through unchanged.
+    """
+    if isinstance(value, int):
+        return value
+    value = str(value).strip()
+    return int(value) if value.isdigit() else value
+
+
+def source_kind(source: Union[int, str]) -> str:
+    """Classify a parsed source as 'device', 'file' or 'stream'"""
+    if isinstance(source, int):
+        return 'device'
+    if '://' in source:
+        return 'stream'
+    return 'file'
+
+
+def config_key(config: DetectionConfig) -> str:
+    """Key equal for configs with equal settings (DetectionConfig has no __eq__)"""
+    return repr(sorted(vars(config).items()))
+
+
+class CameraPipeline:
+    """One camera source with its own detector state and frame hub"""
+
+    def __init__(self, camera_id: str, source: Union[int, str], detector: SafetyDetector,
+                 hub: FrameHub, name: Optional[str] = None,
+                 location_provider: Optional[LocationProvider] = None):
+        self.camera_id = camera_id
+        self.location_provider = location_provider
+        self.source = source
+        self.detector = detector
+        self.hub = hub
+        self.name = name or camera_id
+
+    def to_dict(self):
+        return {
+            "camera_id": self.camera_id,
+            "name": self.name,
+            "source": self.source,
+            "kind": source_kind(self.source),
+            "running": self.hub.running,
+            "viewers": self.hub.viewers,
+            "error": self.hub.error,
+            "location": self.location_provider.current() if self.location_provider else None,
+            "stages": self.detector.scheduler.stats(),
+            "motion": self.detector.gate_stats(),
+            "stream": self.hub.stream_stats(),
+            "metrics": self.detector.metrics.summary()
+        }
+
+
+class CameraRegistry:
+    """Registry of camera pipelines sharing one inference worker pool.
+
+    Every camera gets its own ``SafetyDetector`` (cooldown, counts, gesture
+    state) and ``FrameHub``. Inference tasks from all cameras are scheduled
+    onto a single thread pool so N cameras spread across cores; OpenCV and
+    MediaPipe release the GIL inside their native calls. Cameras whose config
+    uses ``execution_mode='process'`` run detection outside the GIL in a
+    ``ProcessInferenceBackend``; cameras with equal configs share one, since
+    its workers analyze with the config it was built from.
+    """
+
+    def __init__(self, config_factory: Callable[[], DetectionConfig] = DetectionConfig,
+                 context_factory: Optional[Callable] = None, max_workers: Optional[int] = None,
+                 always_on: bool = False, alert_writer=None,
+                 location_provider: Optional[LocationProvider] = None, event_bus=None,
+                 profiler: Optional[ProfileCapture] = None):
+        self.config_factory = config_factory
+        self.context_factory = context_factory
+        # Shared alert_writer.AlertWriter passed to every detector
+        self.alert_writer = alert_writer
+        # Site-wide provider for cameras registered without coordinates
+        self.location_provider = location_provider
+        # Shared events.EventBus for live gesture/count/alert pushes
+        self.event_bus = event_bus
+        # Shared profiling.ProfileCapture hooked into every hub's frame processing
+        self.profiler = profiler
+        self.always_on = always_on
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="inference"
+        )
+        self._cameras: Dict[str, CameraPipeline] = {}
+        self._lock = threading.Lock()
+        self.default_camera_id: Optional[str] = None
+        # Worker pools for process-mode cameras, keyed by config_key
+        self.process_backends: Dict[str, ProcessInferenceBackend] = {}
+
+    def _backend_for(self, config: DetectionConfig) -> Optional[ProcessInferenceBackend]:
+        if config.execution_mode != 'process':
+            return None
+        key = config_key(config)
+        with self._lock:
+            backend = self.process_backends.get(key)
+            if backend is None:
+                backend = self.process_backends[key] = ProcessInferenceBackend(config)
+            return backend
+
+    def _close_unused_backend(self, backend: Optional[ProcessInferenceBackend]):
+        """Close a process backend once no registered camera uses it"""
+        if backend is None:
+            return
+        with self._lock:
+            if any(p.detector.inference_backend is backend for p in self._cameras.values()):
+                return
+            for key, candidate in list(self.process_backends.items()):
+                if candidate is backend:
+                    del self.process_backends[key]
+        backend.close()
+
+    def add(self, camera_id: str, source: Union[int, str], name: Optional[str] = None,
+            config: Optional[DetectionConfig] = None, latitude: Optional[float] = None,
+            longitude: Optional[float] = None) -> CameraPipeline:
+        """Register a camera; raises ValueError if the id is already taken.
+
+        Cameras with latitude/longitude stamp those on their alerts; others
+        use the registry's location provider.
+        """
+        camera_id = str(camera_id)
+        location_provider = self.location_provider
+        if latitude is not None and longitude is not None:
+            location_provider = StaticLocationProvider(latitude, longitude)
+        source = parse_source(source)
+        with self._lock:
+            if camera_id in self._cameras:
+                raise ValueError(f"Camera '{camera_id}' is already registered")
+        config = config or self.config_factory()
+        detector = SafetyDetector(
+            config, camera_id=camera_id, inference_backend=self._backend_for(config),
+            alert_writer=self.alert_writer, location_provider=location_provider,
+            event_bus=self.event_bus
+        )
+        hub = FrameHub(
+            source, detector,
+            context_factory=self.context_factory,
+            always_on=self.always_on,
+            executor=self.executor,
+            name=camera_id,
+            encoder=JpegEncoder(config.stream_jpeg_quality, config.stream_max_width,
+                                config.jpeg_encoder),
+            skip_unchanged=config.stream_skip_unchanged,
+            refresh_interval=config.stream_refresh_interval,
+            max_fps=config.stream_max_fps,
+            profiler=self.profiler
+        )
+        pipeline = CameraPipeline(camera_id, source, detector, hub, name=name,
+                                  location_provider=location_provider)
+        with self._lock:
+            duplicate = camera_id in self._cameras
+            if not duplicate:
+                self._cameras[camera_id] = pipeline
+                if self.default_camera_id is None:
+                    self.default_camera_id = camera_id
+        if duplicate:
+            detector.release()
+            self._close_unused_backend(detector.inference_backend)
+            raise ValueError(f"Camera '{camera_id}' is already registered")
+        if self.always_on:
+            hub.start()
+        return pipeline
+
+    def remove(self, camera_id: str) -> bool:
+        """Stop and unregister a camera; returns False if it was unknown"""
+        with self._lock:
+            pipeline = self._cameras.pop(str(camera_id), None)
+            if pipeline is None:
+                return False
+            if self.default_camera_id == pipeline.camera_id:
+                self.default_camera_id = next(iter(self._cameras), None)
+        # Waits for a frame already on the pool too, so releasing the
+        # detector cannot race process_frame loading its models again
+        if pipeline.hub.stop():
+            pipeline.detector.release()
+        else:
+            print(f"Camera {pipeline.camera_id!r} is still processing a frame; "
+                  "its models are not returned to the registry")
+        self._close_unused_backend(pipeline.detector.inference_backend)
+        return True
+
+    def get(self, camera_id: Optional[str] = None) -> Optional[CameraPipeline]:
+        """Look up a camera, falling back to the default camera when no id is given"""
+        with self._lock:
+            if camera_id is None:
+                camera_id = self.default_camera_id
+            return self._cameras.get(str(camera_id)) if camera_id is not None else None
+
+    def cameras(self) -> List[CameraPipeline]:
+        with self._lock:
+            return list(self._cameras.values())
+
+    def __contains__(self, camera_id) -> bool:
+        with self._lock:
+            return str(camera_id) in self._cameras
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._cameras)
+
+    def load_spec(self, spec: str):
+        """Register cameras from a ``id=source,id=source`` string.
+
+        Entries without ``=`` use their position as the id, e.g.
+        ``"0,gate=rtsp://10.0.0.5/stream,replay=/data/incident.avi"``.
+        """
+        for index, entry in enumerate(filter(None, (e.strip() for e in spec.split(',')))):
+            camera_id, sep, source = entry.partition('=')
+            # An '=' inside a URL query string is not an id separator
+            if not sep or any(c in camera_id for c in ':/\\'):
+                camera_id, source = str(index), entry
+            self.add(camera_id.strip(), source.strip())
+
+    def shutdown(self):
+        """Stop every camera and the shared worker pool"""
+        for pipeline in self.cameras():
+            self.remove(pipeline.camera_id)
+        # Cameras are already stopped; this only waits out a task that missed
+        # its hub's stop timeout before the backends go away under it
+        self.executor.shutdown(wait=True)
+        with self._lock:
+            backends = list(self.process_backends.values())
+            self.process_backends.clear()
+        for backend in backends:
+            backend.close()
@@ -1,3 +1,150 @@
+from contextlib import contextmanager
+from functools import partial
+from typing import Optional
+
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
 
 db = SQLAlchemy()
+
+# Bind key of the read-only engine the API read endpoints use
+READ_BIND = 'readonly'
+
+# Set on every SQLite connection. journal_mode is stored in the database
+# file, so only the writer side sets it.
+SQLITE_PRAGMAS = (
+    ('journal_mode', 'WAL'),  # readers and the writer no longer block each other
+    ('synchronous', 'NORMAL'),  # fsync at checkpoints only; durable with WAL
+    ('cache_size', -20000),  # ~20 MB page cache per connection
+    ('temp_store', 'MEMORY'),
+    ('mmap_size', 256 * 1024 * 1024)
+)
+
+
+def _normalize_url(url: str) -> str:
+    # postgres:// (Heroku style) is not a registered SQLAlchemy dialect name
+    if url.startswith('postgres://'):
+        return 'postgresql://' + url[len('postgres://'):]
+    return url
+
+
+def _sqlite_memory(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == 'sqlite' and parsed.database in (None, '', ':memory:')
+
+
+def _engine_options(url: str, read_only: bool, pool_size: int, max_overflow: int,
+                    pool_timeout: float, busy_timeout_ms: int) -> dict:
+    if _sqlite_memory(url):
+        # In-memory databases live in one StaticPool connection
+        return {}
+    options = {'pool_size': pool_size, 'max_overflow': max_overflow, 'pool_timeout': pool_timeout}
+    backend = make_url(url).get_backend_name()
+    if backend == 'sqlite':
+        options['connect_args'] = {'timeout': busy_timeout_ms / 1000, 'check_same_thread': False}
+    else:
+        options.update(pool_pre_ping=True, pool_recycle=1800)
+        if backend == 'postgresql' and read_only:
+            options['connect_args'] = {'options': '-c default_transaction_read_only=on'}
+    return options
+
+
+def _on_sqlite_connect(dbapi_connection, connection_record, read_only: bool, busy_timeout_ms: int):
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f'PRAGMA busy_timeout = {int(busy_timeout_ms)}')
+        for name, value in SQLITE_PRAGMAS:
+            if name == 'journal_mode' and read_only:
+                continue
+            cursor.execute(f'PRAGMA {name} = {value}')
+        if read_only:
+            cursor.execute('PRAGMA query_only = ON')
+    finally:
+        cursor.close()
+
+
+def init_database(app, url: str = 'sqlite:///alerts.db', read_url: Optional[str] = None,
+                  pool_size: int = 5, max_overflow: int = 10, pool_timeout: float = 30.0,
+                  busy_timeout_ms: int = 5000):
+    """Configure the alert database engines and bind ``db`` to app.
+
+    SQLite files are opened in WAL mode with tuned pragmas and a
+    ``busy_timeout``, so a writer waits for the lock instead of failing
+    with "database is locked". Server databases (e.g. a
+    ``postgresql+psycopg2://`` URL; the driver must be installed) get a
+    sized, pre-pinged connection pool. A second, read-only engine
+    (``READ_BIND``) serves ``read_session``: the same database by default,
+    or ``read_url`` (e.g. a replica). In-memory SQLite has no separate
+    reader.
+    """
+    url = _normalize_url(url)
+    read_url = _normalize_url(read_url) if read_url else url
+    app.config['SQLALCHEMY_DATABASE_URI'] = url
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = _engine_options(
+        url, False, pool_size, max_overflow, pool_timeout, busy_timeout_ms)
+    binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+    if not _sqlite_memory(read_url):
+        binds[READ_BIND] = dict(_engine_options(read_url, True, pool_size, max_overflow, pool_timeout,
+                                                busy_timeout_ms), url=read_url)
+    app.config['SQLALCHEMY_BINDS'] = binds
+    db.init_app(app)
+
+    with app.app_context():
+        for key, engine in db.engines.items():
+            if engine.dialect.name == 'sqlite' and not _sqlite_memory(str(engine.url)):
+                event.listen(engine, 'connect', partial(_on_sqlite_connect, read_only=key == READ_BIND,
+                                                        busy_timeout_ms=busy_timeout_ms))
+
+
+@contextmanager
+def read_session():
+    """A short-lived session on the read-only engine (the primary one if there is none).
+
+    Must run in an app context. Closing it after each request ends the
+    read snapshot, so WAL checkpoints are not held back.
+    """
+    engine = db.engines.get(READ_BIND) or db.engine
+    with Session(engine) as session:
+        yield session
+
+
+def database_stats() -> dict:
+    """Backend and connection pool usage of the writer and reader engines"""
+    stats = {'backend': db.engine.dialect.name}
+    for name, key in (('pool', None), ('read_pool', READ_BIND)):
+        engine = db.engines.get(key)
+        if engine is None:
+            continue
+        pool = engine.pool
+        stats[name] = {
+            'size': pool.size() if hasattr(pool, 'size') else 1,
+            'checked_out': pool.checkedout() if hasattr(pool, 'checkedout') else 0,
+            'overflow': max(pool.overflow(), 0) if hasattr(pool, 'overflow') else 0
+        }
+    return stats
+
+
+def upgrade_schema():
+    """Add nullable columns and indexes introduced after a database was first created.
+
+    ``db.create_all()`` only creates missing tables, so existing alert
+    databases would otherwise lack new columns and indexes. Must run in an
+    app context.
+    """
+    inspector = inspect(db.engine)
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            column_type = column.type.compile(dialect=db.engine.dialect)
+            with db.engine.begin() as conn:
+                conn.execute(text(
+                    f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'
+                ))
+        for index in table.indexes:
+            index.create(bind=db.engine, checkfirst=True)
@@ -1,15 +1,30 @@
 import cv2
 import numpy as np
 import os
-import mediapipe as mp
 import time
-from datetime import datetime
+from datetime import datetime, timedelta
 import pytz
 from typing import Tuple, Optional, List
 from .models import Alert, DetectionConfig
-from .utils import get_location, is_nighttime, save_alert_frame, encode_frame_to_jpg
+from .gender import classify_gender_batch, face_crops
+from .gestures import classify_gestures, gesture_thresholds
+from .metrics import PipelineMetrics
+from .model_registry import shared_registry
+from .scheduler import StageScheduler
+from .temporal import GestureConfirmer
+from .motion import MotionGate, expand_box, sticky_box, union_box
+from .proximity import SurroundRule, surrounded_females
+from .tracking import FaceTracker
+from .utils import get_location, is_nighttime, save_alert_frame, alert_frame_path, encode_frame_to_jpg, downscale
 from .db import db
 from .models import Alert as DBAlert
+from .rollups import record_alerts
+
+# Independently scheduled analysis stages
+ANALYSIS_STAGES = ('faces', 'hands')
+# Share of hand_roi_max_fraction a region must fit in to leave full-frame hand search
+ROI_REENTER_SHARE = 0.75
+
 
 def ist_now():
     """Return current time in IST"""
@@ -19,288 +34,529 @@ def ist_now():
 
 class SafetyDetector:
     # In detector.py, modify the __init__ method to:
-    def __init__(self, config: DetectionConfig = None):
+    def __init__(self, config: DetectionConfig = None, camera_id: Optional[str] = None,
+                 inference_backend=None, alert_writer=None, location_provider=None,
+                 event_bus=None, clock=None, time_origin: Optional[datetime] = None,
+                 model_registry=None):
         self.config = config if config else DetectionConfig()
-        
-        # Initialize MediaPipe Hands
+        self.camera_id = camera_id
+        self.gesture_thresholds = gesture_thresholds(self.config.gesture_thresholds)
+        # Optional out-of-process backend (see parallel.ProcessInferenceBackend);
+        # when set, analysis runs in worker processes and no models load here
+        self.inference_backend = inference_backend
+        # Optional alert_writer.AlertWriter; when set, alerts are persisted in
+        # the background and no app context is needed in the frame loop
+        self.alert_writer = alert_writer
+        # Optional location.LocationProvider; its current() never blocks
+        self.location_provider = location_provider
+        # Optional events.EventBus; gesture and count changes are pushed to it
+        self.event_bus = event_bus
+        # Seconds clock for cooldowns, stage rates and gesture timing. Offline
+        # analysis passes the video position; time_origin is then the wall
+        # time of position 0, used for alert timestamps and night-time rules
+        self.clock = clock or time.monotonic
+        self.time_origin = time_origin
+        # Stage latencies and frame/face/hand/alert counters for /metrics
+        self.metrics = PipelineMetrics(self.config.metrics_enabled, self.config.metrics_window)
+        
+        # Imported here, like the hand model in model_registry, so the package
+        # (and its pure modules) import without mediapipe installed
+        import mediapipe as mp
         self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
-            max_num_hands=2,
-            min_detection_confidence=0.7,
-            min_tracking_confidence=0.5
-        )
         self.mp_drawing = mp.solutions.drawing_utils
         self.mp_drawing_styles = mp.solutions.drawing_styles
-        
-        # Initialize gender detection with proper path handling
-        model_dir = os.path.join(os.path.dirname(__file__), 'models')
-        try:
-            self.gender_net = cv2.dnn.readNetFromCaffe(
-                os.path.join(model_dir, 'gender_deploy.prototxt'),
-                os.path.join(model_dir, 'gender_net.caffemodel')
-            )
-        except Exception as e:
-            raise RuntimeError(f"Failed to load gender detection models: {str(e)}. "
-                            "Please ensure 'gender_deploy.prototxt' and 'gender_net.caffemodel' "
-                            "are in the 'models' directory.")
-        
-        # Initialize face detection
-        self.face_cascade = cv2.CascadeClassifier(
-            cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
-        )
+        # Models are borrowed from a model_registry.ModelRegistry on first use
+        # and handed back by release(), so building a detector reads no files
+        self.model_registry = model_registry or shared_registry()
+        self.hands = None
+        self.gender_net = None
+        self.face_detector = None
+        self.models_loaded = False
         
         # State tracking
-        self.last_alert_time = 0
+        self.last_alert_time = None
         self.alerts: List[Alert] = []
         self.current_counts = {'male': 0, 'female': 0}
         self.person_boxes = []  # Store detected person boxes with gender info
+        self.tracked_faces: List[dict] = []  # Per-track face data for the last frame
+        self.trackers = {}  # stream id -> FaceTracker
+        
+        # Per-stage scheduling; results of the last run of each stage are
+        # redrawn on frames where that stage is skipped
+        self.scheduler = StageScheduler(
+            self.config.stage_rates,
+            idle_rates=self.config.idle_stage_rates,
+            max_share=self.config.stage_max_share,
+            clock=self.clock
+        )
+        self.last_faces: List[dict] = []
+        self.last_hands: List[dict] = []
+        
+        # Motion gate: an empty, unchanging scene skips every stage except a
+        # check every motion_keepalive seconds
+        self.motion_gate = MotionGate(
+            threshold=self.config.motion_threshold,
+            min_area=self.config.motion_min_area
+        ) if self.config.motion_gate_enabled else None
+        self.last_analysis_time = 0.0
+        self.frame_changed = True  # False after a still frame where no stage ran
+        self.skipped_frames = 0
+        self.hand_roi_frames = 0
+        self.hand_full_frames = 0
+        self.hand_roi: Optional[Tuple[int, int, int, int]] = None  # None = full frame
+        self.hand_roi_changes = 0
+        
+        # Spatial "surrounded" rule for woman_surrounded_spatial alerts
+        self.surround_rule = SurroundRule(
+            radius=self.config.surround_radius,
+            min_males=self.config.surround_min_males,
+            min_sides=self.config.surround_min_sides,
+            max_size_ratio=self.config.surround_max_size_ratio
+        )
         
         # Gesture tracking
+        self.gesture_confirmer = GestureConfirmer(
+            window=self.config.gesture_window,
+            min_frames=self.config.gesture_min_frames,
+            min_duration=self.config.gesture_min_duration,
+            min_confidence=self.config.gesture_min_confidence,
+            wave_reversals=self.config.wave_min_reversals,
+            wave_amplitude=self.config.wave_min_amplitude,
+            clock=self.clock
+        )
         self.current_gesture = {
             'detected': False,
             'type': None,
+            'candidate': None,
             'confidence': 0.0,
             'handsCount': 0
         }
 
-    def detect_genders(self, frame: np.ndarray) -> np.ndarray:
-        """Detect faces and classify gender in the frame"""
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = self.face_cascade.detectMultiScale(
-            gray, 
-            scaleFactor=1.1, 
-            minNeighbors=5, 
-            minSize=(30, 30)
-        )
-        
-        male_count = 0
-        female_count = 0
-        labels = ['Male', 'Female']
-        self.person_boxes = []  # Reset person boxes for this frame
-        
-        for (x, y, w, h) in faces:
-            face = frame[y:y+h, x:x+w]
-            blob = cv2.dnn.blobFromImage(
-                face, 1.0, (227, 227),
-                (78.4263377603, 87.7689143744, 114.895847746),
-                swapRB=False
+    def _load_models(self):
+        # MediaPipe Hands, the Caffe gender net and the face detector (Haar
+        # cascade or DNN SSD, see faces.py), shared through the registry
+        registry = self.model_registry
+        self.hands = registry.acquire('hands', self.config)
+        self.gender_net = registry.acquire('gender', self.config)
+        self.face_detector = registry.acquire('faces', self.config)
+
+    def ensure_models(self):
+        """Load the models now instead of on the first frame.
+
+        Raises RuntimeError when a model file is missing.
+        """
+        if not self.models_loaded:
+            self._load_models()
+            self.models_loaded = True
+
+    def detect_faces(self, frame: np.ndarray) -> List[Tuple[int, int, int, int]]:
+        """Return (x, y, w, h) face boxes in full-resolution pixels"""
+        self.ensure_models()
+        return self.face_detector.detect(frame)
+
+    def classify_genders(self, crops: List[np.ndarray]) -> List[Tuple[str, float]]:
+        """Classify face crops in one batched gender_net forward pass"""
+        self.ensure_models()
+        return classify_gender_batch(self.gender_net, crops, self.config.gender_batch_size)
+
+    def _tracker_for(self, stream_id) -> FaceTracker:
+        tracker = self.trackers.get(stream_id)
+        if tracker is None:
+            tracker = FaceTracker(
+                iou_threshold=self.config.track_iou_threshold,
+                max_missed=self.config.track_max_missed,
+                reclassify_interval=self.config.gender_reclassify_interval,
+                min_confidence=self.config.gender_min_confidence,
+                min_votes=self.config.gender_min_votes
             )
-            self.gender_net.setInput(blob)
-            predictions = self.gender_net.forward()
-            
-            gender = labels[predictions[0].argmax()]
-            confidence = predictions[0].max()
-            
-            if gender == "Female":
-                female_count += 1
+            self.trackers[stream_id] = tracker
+        return tracker
+
+    def _analyze_faces_batch(self, frames: List[np.ndarray], stream_ids: List,
+                             timings: Optional[dict] = None) -> List[List[dict]]:
+        """Detect and track faces in each frame, classifying every crop that
+        needs the gender net in a single batched forward pass.
+
+        ``timings`` receives the seconds spent in 'face_detect' and 'gender'.
+        """
+        timings = timings if timings is not None else {}
+        started = time.perf_counter()
+        boxes = [self.detect_faces(frame) for frame in frames]
+        timings['face_detect'] = time.perf_counter() - started
+        if not self.config.tracking_enabled:
+            crops = [crop for frame, b in zip(frames, boxes) for crop in face_crops(frame, b)]
+            started = time.perf_counter()
+            genders = iter(self.classify_genders(crops))
+            timings['gender'] = time.perf_counter() - started
+            return [
+                [{'box': box, 'gender': g, 'confidence': c}
+                 for box, (g, c) in zip(frame_boxes, genders)]
+                for frame_boxes in boxes
+            ]
+        
+        # Only new, low-confidence or stale tracks go through the gender net
+        tracked, pending = [], []
+        for frame, frame_boxes, stream_id in zip(frames, boxes, stream_ids):
+            tracker = self._tracker_for(stream_id)
+            tracks = tracker.update(frame_boxes)
+            tracked.append(list(zip(tracks, frame_boxes)))
+            pending.extend(
+                (tracker, track, frame, box) for track, box in zip(tracks, frame_boxes)
+                if tracker.needs_classification(track)
+            )
+        started = time.perf_counter()
+        genders = self.classify_genders(
+            [frame[y:y+h, x:x+w] for _, _, frame, (x, y, w, h) in pending]
+        )
+        timings['gender'] = time.perf_counter() - started
+        for (tracker, track, _, _), (gender, confidence) in zip(pending, genders):
+            tracker.record(track, gender, confidence)
+        return [[track.to_face(box) for track, box in frame_tracks] for frame_tracks in tracked]
+
+    def analyze_faces(self, frame: np.ndarray, stream_id=None) -> List[dict]:
+        """Detect faces and classify gender; returns plain data, draws nothing"""
+        return self._analyze_faces_batch([frame], [stream_id])[0]
+
+    def _apply_faces(self, faces: List[dict]):
+        """Update person boxes and counts from analyzed faces"""
+        # Store person box with gender info (x, y, w, h, gender)
+        self.person_boxes = [(*f['box'], f['gender']) for f in faces]
+        self.tracked_faces = faces
+        female_count = sum(1 for f in faces if f['gender'] == 'female')
+        self.current_counts = {'male': len(faces) - female_count, 'female': female_count}
+
+    def draw_faces(self, frame: np.ndarray, faces: List[dict]) -> np.ndarray:
+        """Draw face boxes with gender labels"""
+        for f in faces:
+            x, y, w, h = f['box']
+            if f['gender'] == 'female':
                 color = (0, 255, 0)  # Green
-                gender_label = 'female'
             else:
-                male_count += 1
                 color = (255, 0, 0)  # Blue
-                gender_label = 'male'
-            
-            # Store person box with gender info (x, y, w, h, gender)
-            self.person_boxes.append((x, y, w, h, gender_label))
-            
             cv2.rectangle(frame, (x, y), (x+w, y+h), color, 2)
-            cv2.putText(frame, f"{gender}: {confidence:.2f}", (x, y-10), 
+            cv2.putText(frame, f"{f['gender'].capitalize()}: {f['confidence']:.2f}", (x, y-10), 
                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
-        
-        self.current_counts = {'male': male_count, 'female': female_count}
         return frame
 
-    def _check_hand_gestures(self, landmarks) -> Optional[str]:
-        """Check for specific distress gestures - works for both hands"""
-        thumb_tip = landmarks[self.mp_hands.HandLandmark.THUMB_TIP]
-        thumb_ip = landmarks[self.mp_hands.HandLandmark.THUMB_IP]
-        thumb_mcp = landmarks[self.mp_hands.HandLandmark.THUMB_MCP]
-        index_tip = landmarks[self.mp_hands.HandLandmark.INDEX_FINGER_TIP]
-        index_mcp = landmarks[self.mp_hands.HandLandmark.INDEX_FINGER_MCP]
-        index_pip = landmarks[self.mp_hands.HandLandmark.INDEX_FINGER_PIP]
-        middle_tip = landmarks[self.mp_hands.HandLandmark.MIDDLE_FINGER_TIP]
-        middle_mcp = landmarks[self.mp_hands.HandLandmark.MIDDLE_FINGER_MCP]
-        ring_tip = landmarks[self.mp_hands.HandLandmark.RING_FINGER_TIP]
-        ring_mcp = landmarks[self.mp_hands.HandLandmark.RING_FINGER_MCP]
-        pinky_tip = landmarks[self.mp_hands.HandLandmark.PINKY_TIP]
-        pinky_mcp = landmarks[self.mp_hands.HandLandmark.PINKY_MCP]
-        wrist = landmarks[self.mp_hands.HandLandmark.WRIST]
-        
-        # Calculate distances
-        def distance(p1, p2):
-            return ((p1.x - p2.x)**2 + (p1.y - p2.y)**2 + (p1.z - p2.z)**2)**0.5
-        
-        # 1. THUMB_PALM: Enhanced detection with multiple variations for better reliability
-        # Detects thumb tucked in fist, thumb folded down, or closed fist with thumb hidden
-        thumb_to_wrist = distance(thumb_tip, wrist)
-        thumb_to_index_mcp = distance(thumb_tip, index_mcp)
-        thumb_to_middle_mcp = distance(thumb_tip, middle_mcp)
-        thumb_to_index_tip = distance(thumb_tip, index_tip)
-        
-        # Check if fingers are curled (relaxed thresholds for better detection)
-        index_curled = distance(index_tip, index_mcp) < 0.10
-        middle_curled = distance(middle_tip, middle_mcp) < 0.10
-        ring_curled = distance(ring_tip, ring_mcp) < 0.10
-        pinky_curled = distance(pinky_tip, pinky_mcp) < 0.10
-        
-        # Count how many fingers are curled (at least 3 out of 4)
-        curled_count = sum([index_curled, middle_curled, ring_curled, pinky_curled])
-        mostly_curled = curled_count >= 3
-        all_fingers_curled = curled_count == 4
-        
-        # VARIATION 1: Thumb tucked deep inside fist (strict)
-        thumb_inside_fist = (thumb_to_wrist < 0.15 and 
-                            thumb_to_index_mcp < 0.10 and 
-                            all_fingers_curled)
-        
-        # VARIATION 2: Thumb touching or near index finger knuckle (medium)
-        thumb_near_knuckles = (thumb_to_index_mcp < 0.12 or thumb_to_middle_mcp < 0.12) and mostly_curled
-        
-        # VARIATION 3: Thumb folded down touching index fingertip (loose)
-        thumb_touching_finger = (thumb_to_index_tip < 0.10 and mostly_curled)
-        
-        # VARIATION 4: Relaxed closed fist with thumb down (most permissive)
-        # Check if thumb is not extended outward and hand is making a fist
-        thumb_not_extended = distance(thumb_tip, wrist) < 0.20
-        fist_shape = (distance(index_tip, wrist) < distance(index_mcp, wrist) * 1.5 and
-                     distance(middle_tip, wrist) < distance(middle_mcp, wrist) * 1.5 and
-                     curled_count >= 2)
-        relaxed_thumb_palm = thumb_not_extended and fist_shape
-        
-        # Detect any variation of thumb_palm gesture
-        if thumb_inside_fist or thumb_near_knuckles or thumb_touching_finger or relaxed_thumb_palm:
-            return "thumb_palm"
-        
-        # 2. WAVE: Open hand with fingers spread
-        # Check if all fingers are extended and spread apart
-        index_extended = distance(index_tip, wrist) > distance(index_mcp, wrist) * 1.2
-        middle_extended = distance(middle_tip, wrist) > distance(middle_mcp, wrist) * 1.2
-        ring_extended = distance(ring_tip, wrist) > distance(ring_mcp, wrist) * 1.2
-        pinky_extended = distance(pinky_tip, wrist) > distance(pinky_mcp, wrist) * 1.2
-        thumb_extended = distance(thumb_tip, wrist) > distance(thumb_mcp, wrist) * 1.2
-        
-        # Check finger spread
-        fingers_spread = distance(index_tip, pinky_tip) > 0.15
-        
-        all_extended = (index_extended and middle_extended and ring_extended and 
-                       pinky_extended and thumb_extended and fingers_spread)
-        
-        if all_extended:
-            return "wave"
-        
-        # 3. OK_SIGN: Thumb and index finger forming a circle (distress signal)
-        # Thumb tip touches index tip, other fingers extended
-        thumb_index_distance = distance(thumb_tip, index_tip)
-        
-        # Check if middle, ring, and pinky are extended
-        middle_extended_ok = distance(middle_tip, wrist) > distance(middle_mcp, wrist)
-        ring_extended_ok = distance(ring_tip, wrist) > distance(ring_mcp, wrist)
-        pinky_extended_ok = distance(pinky_tip, wrist) > distance(pinky_mcp, wrist)
-        
-        # Thumb and index should form a small circle
-        if (thumb_index_distance < 0.05 and 
-            middle_extended_ok and ring_extended_ok and pinky_extended_ok):
-            return "ok_sign"
-        
-        return None
+    def detect_genders(self, frame: np.ndarray) -> np.ndarray:
+        """Detect faces and classify gender in the frame"""
+        faces = self.analyze_faces(frame)
+        self._apply_faces(faces)
+        return self.draw_faces(frame, faces)
 
-    def detect_gestures(self, frame: np.ndarray) -> Tuple[Optional[str], np.ndarray]:
-        """Detect hand gestures on BOTH hands, draw them on frame, and return distress type if found"""
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    def analyze_hands(self, frame: np.ndarray, roi: Optional[Tuple[int, int, int, int]] = None,
+                      timings: Optional[dict] = None) -> List[dict]:
+        """Detect hands and classify distress gestures; returns plain data, draws nothing.
+
+        With ``roi`` (x, y, w, h) only that part of the frame is searched;
+        landmarks are still returned in full-frame normalized coordinates.
+        ``timings`` receives the seconds spent in 'hands_convert' (downscale
+        and BGR->RGB) and 'hands_process' (MediaPipe).
+        """
+        self.ensure_models()
+        frame_h, frame_w = frame.shape[:2]
+        x, y, w, h = roi if roi is not None else (0, 0, frame_w, frame_h)
+        if w <= 0 or h <= 0:
+            return []
+        # Normalized landmarks are resolution independent, so a downscaled
+        # copy needs no remapping beyond the crop offset below
+        started = time.perf_counter()
+        small, _ = downscale(frame[y:y+h, x:x+w], self.config.detection_width)
+        rgb_frame = cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
+        converted = time.perf_counter()
         results = self.hands.process(rgb_frame)
+        if timings is not None:
+            timings['hands_convert'] = converted - started
+            timings['hands_process'] = time.perf_counter() - converted
         
-        detected_gesture = None
-        hands_count = 0
-        max_confidence = 0.0
-        
+        hands = []
         if results.multi_hand_landmarks:
-            hands_count = len(results.multi_hand_landmarks)
-            for i, hand_landmarks in enumerate(results.multi_hand_landmarks):
-                # Draw hand landmarks on the frame
-                self.mp_drawing.draw_landmarks(
-                    frame,
-                    hand_landmarks,
-                    self.mp_hands.HAND_CONNECTIONS,
-                    self.mp_drawing_styles.get_default_hand_landmarks_style(),
-                    self.mp_drawing_styles.get_default_hand_connections_style()
-                )
-                
-                # Check for distress gestures
-                handedness = results.multi_handedness[i]
+            # All hands' landmarks as one (hands x 21 x 3) array, classified in one pass
+            landmarks = np.array([
+                [(lm.x, lm.y, lm.z) for lm in hand_landmarks.landmark]
+                for hand_landmarks in results.multi_hand_landmarks
+            ], dtype=np.float32)
+            if roi is not None:
+                # Crop-normalized -> frame-normalized (z scales with width)
+                landmarks[..., 0] = (landmarks[..., 0] * w + x) / frame_w
+                landmarks[..., 1] = (landmarks[..., 1] * h + y) / frame_h
+                landmarks[..., 2] *= w / frame_w
+            # Check gestures on BOTH hands (removed single-hand restriction)
+            gestures = classify_gestures(landmarks, self.gesture_thresholds)
+            for i, handedness in enumerate(results.multi_handedness):
                 # MediaPipe detects hands from camera perspective (mirror image)
                 # So we need to flip: "Left" in camera = Right hand in reality
                 hand_label = handedness.classification[0].label
-                actual_hand = "Right" if hand_label == "Left" else "Left"
-                confidence = handedness.classification[0].score
-                
-                if confidence > max_confidence:
-                    max_confidence = confidence
-                
-                # Check gestures on BOTH hands (removed single-hand restriction)
-                gesture = self._check_hand_gestures(hand_landmarks.landmark)
-                if gesture:
-                    detected_gesture = gesture
-                    
-                    # Draw gesture label on frame
-                    # Get wrist position for label placement
-                    h, w, c = frame.shape
-                    wrist = hand_landmarks.landmark[self.mp_hands.HandLandmark.WRIST]
-                    cx, cy = int(wrist.x * w), int(wrist.y * h)
-                    
-                    # Display gesture name with background
-                    gesture_text = f"GESTURE: {gesture.upper()}"
-                    text_size = cv2.getTextSize(gesture_text, cv2.FONT_HERSHEY_SIMPLEX, 0.8, 2)[0]
-                    
-                    # Determine color based on gesture type
-                    if gesture == "thumb_palm":
-                        color = (0, 0, 255)  # Red - Emergency
-                    elif gesture == "wave":
-                        color = (0, 255, 255)  # Yellow - Attention
-                    elif gesture == "ok_sign":
-                        color = (0, 165, 255)  # Orange - Distress Signal
-                    else:
-                        color = (0, 0, 255)  # Default red
-                    
-                    # Draw background rectangle
-                    cv2.rectangle(frame, 
-                                (cx - 10, cy - text_size[1] - 15), 
-                                (cx + text_size[0] + 10, cy - 5), 
-                                color, -1)
-                    
-                    # Draw text
-                    cv2.putText(frame, gesture_text, (cx, cy - 10), 
-                              cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
-                
-                # Show actual hand label (corrected for mirror image)
-                h, w, c = frame.shape
-                wrist = hand_landmarks.landmark[self.mp_hands.HandLandmark.WRIST]
-                cx, cy = int(wrist.x * w), int(wrist.y * h)
-                
-                # Draw hand label with actual hand (not mirrored)
-                cv2.putText(frame, f"{actual_hand} Hand", (cx + 10, cy + 20), 
-                          cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
+                hands.append({
+                    'landmarks': landmarks[i],
+                    'hand': "Right" if hand_label == "Left" else "Left",
+                    'score': float(handedness.classification[0].score),
+                    'gesture': gestures[i]
+                })
+        return hands
+
+    def _apply_hands(self, hands: List[dict]) -> Optional[str]:
+        """Update the current gesture state; returns the confirmed gesture, if any"""
+        candidate = None
+        for hand in hands:
+            if hand['gesture']:
+                candidate = hand['gesture']
+        # Single-frame labels only count once they hold over time
+        detected_gesture = self.gesture_confirmer.update(hands)
         
-        # Update current gesture state
         self.current_gesture = {
             'detected': detected_gesture is not None,
             'type': detected_gesture,
-            'confidence': max_confidence,
-            'handsCount': hands_count
+            'candidate': candidate,
+            'confidence': max((hand['score'] for hand in hands), default=0.0),
+            'handsCount': len(hands)
         }
-        
-        return detected_gesture, frame
+        return detected_gesture
 
-    def process_frame(self, frame: np.ndarray) -> Tuple[np.ndarray, Optional[Alert]]:
-        """Process a frame and return (annotated_frame, alert_if_triggered)"""
-        # Detect genders and update counts
-        frame = self.detect_genders(frame)
-        
-        # Detect and draw hand gestures on frame
-        gesture, frame = self.detect_gestures(frame)
+    @staticmethod
+    def _to_landmark_list(landmarks: np.ndarray):
+        # Only drawing needs the protobuf types, and not every mediapipe build ships them
+        from mediapipe.framework.formats import landmark_pb2
+        landmark_list = landmark_pb2.NormalizedLandmarkList()
+        for x, y, z in landmarks:
+            landmark_list.landmark.add(x=float(x), y=float(y), z=float(z))
+        return landmark_list
+
+    def draw_hands(self, frame: np.ndarray, hands: List[dict]) -> np.ndarray:
+        """Draw hand landmarks, gesture labels and hand labels"""
+        h, w, c = frame.shape
+        for hand in hands:
+            # Draw hand landmarks on the frame
+            self.mp_drawing.draw_landmarks(
+                frame,
+                self._to_landmark_list(hand['landmarks']),
+                self.mp_hands.HAND_CONNECTIONS,
+                self.mp_drawing_styles.get_default_hand_landmarks_style(),
+                self.mp_drawing_styles.get_default_hand_connections_style()
+            )
+            
+            # Get wrist position for label placement
+            wrist = hand['landmarks'][self.mp_hands.HandLandmark.WRIST]
+            cx, cy = int(wrist[0] * w), int(wrist[1] * h)
+            
+            gesture = hand['gesture']
+            if gesture:
+                # Display gesture name with background
+                gesture_text = f"GESTURE: {gesture.upper()}"
+                text_size = cv2.getTextSize(gesture_text, cv2.FONT_HERSHEY_SIMPLEX, 0.8, 2)[0]
+                
+                # Determine color based on gesture type
+                if gesture == "thumb_palm":
+                    color = (0, 0, 255)  # Red - Emergency
+                elif gesture == "wave":
+                    color = (0, 255, 255)  # Yellow - Attention
+                elif gesture == "ok_sign":
+                    color = (0, 165, 255)  # Orange - Distress Signal
+                else:
+                    color = (0, 0, 255)  # Default red
+                
+                # Draw background rectangle
+                cv2.rectangle(frame, 
+                            (cx - 10, cy - text_size[1] - 15), 
+                            (cx + text_size[0] + 10, cy - 5), 
+                            color, -1)
+                
+                # Draw text
+                cv2.putText(frame, gesture_text, (cx, cy - 10), 
+                          cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+            
+            # Draw hand label with actual hand (not mirrored)
+            cv2.putText(frame, f"{hand['hand']} Hand", (cx + 10, cy + 20), 
+                      cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
+        return frame
+
+    def detect_gestures(self, frame: np.ndarray) -> Tuple[Optional[str], np.ndarray]:
+        """Detect hand gestures on BOTH hands, draw them on frame, and return distress type if found"""
+        hands = self.analyze_hands(frame)
+        detected_gesture = self._apply_hands(hands)
+        return detected_gesture, self.draw_hands(frame, hands)
+
+    def analyze(self, frame: np.ndarray, stream_id=None, stages=ANALYSIS_STAGES, hand_roi=None) -> dict:
+        """Run face/gender and hand analysis without touching counts or alert state"""
+        return self.analyze_batch([frame], [stream_id], [stages], [hand_roi])[0]
+
+    def analyze_batch(self, frames: List[np.ndarray], stream_ids: Optional[List] = None,
+                      stages: Optional[List[Tuple[str, ...]]] = None,
+                      hand_rois: Optional[List] = None) -> List[dict]:
+        """Analyze several frames, classifying every face crop in one forward pass.
+
+        ``stream_ids`` keys the face trackers so frames from different cameras
+        never share tracks. ``stages`` selects which of ANALYSIS_STAGES run per
+        frame; each result only has keys for the stages that ran, plus the
+        per-stage run time in seconds under 'timings', along with sub-step
+        times (face_detect, gender, hands_convert, hands_process; batched
+        face steps are split evenly across frames). ``hand_rois`` limits
+        the hand search per frame (None searches the whole frame).
+        """
+        if stream_ids is None:
+            stream_ids = [None] * len(frames)
+        if hand_rois is None:
+            hand_rois = [None] * len(frames)
+        if stages is None:
+            stages = [ANALYSIS_STAGES] * len(frames)
+        stages = [s if s is not None else ANALYSIS_STAGES for s in stages]
+        analyses = [{'timings': {}} for _ in frames]
+        
+        face_indices = [i for i, frame_stages in enumerate(stages) if 'faces' in frame_stages]
+        if face_indices:
+            started = time.perf_counter()
+            face_timings = {}
+            faces = self._analyze_faces_batch(
+                [frames[i] for i in face_indices], [stream_ids[i] for i in face_indices], face_timings
+            )
+            elapsed = (time.perf_counter() - started) / len(face_indices)
+            for i, frame_faces in zip(face_indices, faces):
+                analyses[i]['faces'] = frame_faces
+                analyses[i]['timings']['faces'] = elapsed
+                for step, duration in face_timings.items():
+                    analyses[i]['timings'][step] = duration / len(face_indices)
+        
+        if self.config.gesture_enabled:
+            for i, frame in enumerate(frames):
+                if 'hands' in stages[i]:
+                    started = time.perf_counter()
+                    analyses[i]['hands'] = self.analyze_hands(frame, hand_rois[i], analyses[i]['timings'])
+                    analyses[i]['timings']['hands'] = time.perf_counter() - started
+        return analyses
+
+    def _due_stages(self, moving: bool = True) -> Tuple[str, ...]:
+        """Stages to run on this frame given the motion gate and the scheduler"""
+        empty = not self.last_faces and not self.last_hands
+        if not moving and empty:
+            if self.clock() - self.last_analysis_time < self.config.motion_keepalive:
+                self.skipped_frames += 1
+                return ()
+        # A still scene with people in it re-checks faces at the idle rate;
+        # hands keep their rate so held gestures are still confirmed
+        idle = {'faces': empty or not moving, 'hands': empty}
+        return tuple(
+            stage for stage in ANALYSIS_STAGES
+            if (stage != 'hands' or self.config.gesture_enabled) and self.scheduler.due(stage, idle[stage])
+        )
+
+    def _hand_roi(self, frame: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
+        """Region around people, recent hands and motion to search for hands.
+
+        None means the whole frame: ROIs are disabled, nothing is known to
+        be in view, or the region would cover most of the frame anyway.
+        MediaPipe Hands runs in tracking mode, predicting each hand from
+        where it was in the previous crop, so the region is kept sticky
+        (see ``sticky_box``) rather than recomputed every frame; a crop
+        that moved every frame would force palm re-detection each time.
+        Returning to a crop after the full frame needs the region to fit
+        in ``ROI_REENTER_SHARE`` of the maximum, so the two do not alternate.
+        """
+        previous = self.hand_roi
+        self.hand_roi = self._next_hand_roi(frame)
+        if self.hand_roi != previous:
+            self.hand_roi_changes += 1
+        return self.hand_roi
+
+    def _next_hand_roi(self, frame: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
+        if not self.config.hand_roi_enabled:
+            return None
+        frame_h, frame_w = frame.shape[:2]
+        # Faces widened to where that person's hands can be
+        boxes = [expand_box(face['box'], frame.shape, 2.0, 2.0, 1.0, 4.0) for face in self.last_faces]
+        for hand in self.last_hands:
+            xs, ys = hand['landmarks'][:, 0] * frame_w, hand['landmarks'][:, 1] * frame_h
+            hand_box = (int(xs.min()), int(ys.min()), int(np.ptp(xs)) + 1, int(np.ptp(ys)) + 1)
+            boxes.append(expand_box(hand_box, frame.shape, 1.0, 1.0, 1.0, 1.0))
+        if self.motion_gate is not None and self.motion_gate.motion_box is not None:
+            boxes.append(expand_box(self.motion_gate.motion_box, frame.shape, 0.25, 0.25, 0.25, 0.25))
+        target = union_box(boxes)
+        if target is None:
+            return None
+        roi = sticky_box(self.hand_roi, target, frame.shape, self.config.hand_roi_margin,
+                         self.config.hand_roi_shrink_ratio)
+        max_area = self.config.hand_roi_max_fraction * frame_w * frame_h
+        if self.hand_roi is None:
+            max_area *= ROI_REENTER_SHARE
+        if roi[2] * roi[3] > max_area:
+            return None
+        return roi
+
+    def gate_stats(self) -> dict:
+        """Frames skipped by the motion gate and how hands were searched"""
+        stats = self.motion_gate.stats() if self.motion_gate is not None else {}
+        stats.update({
+            'skipped_frames': self.skipped_frames,
+            'hand_roi_frames': self.hand_roi_frames,
+            'hand_roi_changes': self.hand_roi_changes,
+            'hand_full_frames': self.hand_full_frames
+        })
+        return stats
+
+    def _wall_time(self) -> datetime:
+        """Wall-clock time of the current frame (IST for live sources)"""
+        if self.time_origin is None:
+            return ist_now()
+        return self.time_origin + timedelta(seconds=self.clock())
+
+    def process_frame(self, frame: np.ndarray, annotate: bool = True) -> Tuple[np.ndarray, Optional[Alert]]:
+        """Process a frame and return (annotated_frame, alert_if_triggered).
+
+        With annotate=False nothing is drawn, for offline analysis where the
+        frames are never shown.
+        """
+        metrics = self.metrics
+        metrics.inc('frames')
+        moving = True
+        if self.motion_gate is not None:
+            with metrics.time('motion'):
+                moving = self.motion_gate.update(frame)
+        stages = self._due_stages(moving)
+        hand_roi = None
+        if 'hands' in stages:
+            hand_roi = self._hand_roi(frame)
+            if hand_roi is None:
+                self.hand_full_frames += 1
+            else:
+                self.hand_roi_frames += 1
+        analysis = {}
+        # Whether this frame can look different from the last one once drawn
+        self.frame_changed = moving or bool(stages)
+        if stages:
+            self.last_analysis_time = self.clock()
+        if stages and self.inference_backend is not None:
+            analysis = self.inference_backend.analyze(
+                self.camera_id or id(self), frame, stages, hand_roi=hand_roi
+            )
+        elif stages:
+            analysis = self.analyze(frame, stages=stages, hand_roi=hand_roi)
+        for stage, duration in analysis.get('timings', {}).items():
+            if stage in ANALYSIS_STAGES:
+                self.scheduler.mark_run(stage, duration)
+            metrics.observe(stage, duration)
+        
+        # Update counts and gesture state from whichever stages ran
+        gesture = None
+        previous_counts = self.current_counts
+        previous_gesture = self.current_gesture
+        if 'faces' in analysis:
+            self.last_faces = analysis['faces']
+            self._apply_faces(self.last_faces)
+            metrics.inc('faces', len(self.last_faces))
+        if 'hands' in analysis:
+            self.last_hands = analysis['hands']
+            gesture = self._apply_hands(self.last_hands)
+            metrics.inc('hands', len(self.last_hands))
+        self._publish_changes(previous_counts, previous_gesture)
+        
+        # Redraw the latest results of every stage on this fresh frame
+        if annotate:
+            with metrics.time('draw'):
+                frame = self.draw_faces(frame, self.last_faces)
+                frame = self.draw_hands(frame, self.last_hands)
         
         # Check for distress gestures
-        current_time = time.time()
-        if current_time - self.last_alert_time > self.config.alert_cooldown:
+        current_time = self.clock()
+        if self.last_alert_time is None or current_time - self.last_alert_time > self.config.alert_cooldown:
             female_count = self.current_counts['female']
             male_count = self.current_counts['male']
             
@@ -323,7 +579,8 @@ class SafetyDetector:
         #                 return frame, alert
             
             # Check for gender anomaly at night
-            if is_nighttime(self.config.night_start_hour, self.config.night_end_hour):
+            wall_time = self._wall_time() if self.time_origin is not None else None
+            if is_nighttime(self.config.night_start_hour, self.config.night_end_hour, at=wall_time):
                 female_count = self.current_counts['female']
                 male_count = self.current_counts['male']
     
@@ -339,9 +596,9 @@ class SafetyDetector:
                     alert = self._create_alert(frame, "woman_surrounded")
                     return frame, alert
 
-                # Woman is surrounded by men spatially (closer proximity)
-                elif female_count == 1 and male_count >= 1:
-                    if self._is_surrounded(frame):  # You’ll implement this separately
+                # A woman is surrounded by men spatially (closer proximity)
+                elif female_count >= 1 and male_count >= 1:
+                    if self._is_surrounded(frame):
                         self.last_alert_time = current_time
                         alert = self._create_alert(frame, "woman_surrounded_spatial")
                         return frame, alert
@@ -349,54 +606,81 @@ class SafetyDetector:
         
         return frame, None
     
-    def _is_surrounded(self, frame):
-        # self.person_boxes contains [(x, y, w, h, gender), ...]
-        females = [box for box in self.person_boxes if box[-1] == 'female']
-        males = [box for box in self.person_boxes if box[-1] == 'male']
-
-        if not females or not males:
-            return False
-
-        woman_box = females[0]
-        wx, wy, ww, wh = woman_box[:4]
-
-        for mx, my, mw, mh, _ in males:
-            # Simple proximity check: if male is within a threshold distance
-            if abs(mx - wx) < 100 and abs(my - wy) < 100:
-                return True
+    def _publish_changes(self, previous_counts: dict, previous_gesture: dict):
+        """Push count and gesture state to the event bus when it changed"""
+        if self.event_bus is None:
+            return
+        if self.current_counts != previous_counts:
+            counts = self.current_counts
+            self.event_bus.publish('counts', {
+                'camera_id': self.camera_id,
+                'male': counts['male'],
+                'female': counts['female'],
+                'total': counts['male'] + counts['female']
+            })
+        # Confidence alone changing is not worth a push
+        keys = ('detected', 'type', 'handsCount')
+        if any(self.current_gesture[k] != previous_gesture[k] for k in keys):
+            self.event_bus.publish('gesture', dict(self.current_gesture, camera_id=self.camera_id))
 
-        return False
+    def _is_surrounded(self, frame):
+        # Only faces tracked for a few frames count, so a single misdetection
+        # or gender flicker cannot raise a spatial alert on its own
+        confirmed = [f for f in self.tracked_faces
+                     if f.get('hits', self.config.track_min_hits) >= self.config.track_min_hits]
+        females = [f['box'] for f in confirmed if f['gender'] == 'female']
+        males = [f['box'] for f in confirmed if f['gender'] == 'male']
+        # Any woman in view, judged in face-size units (see proximity.py)
+        return bool(surrounded_females(females, males, self.surround_rule))
 
 
     def _create_alert(self, frame: np.ndarray, alert_type: str, gesture: str = None) -> Alert:
-        frame_path = save_alert_frame(frame)
-        lat, lng = get_location()
+        self.metrics.inc('alerts', label=alert_type)
+        with self.metrics.time('alert'):
+            return self._record_alert(frame, alert_type, gesture)
 
+    def _record_alert(self, frame: np.ndarray, alert_type: str, gesture: str = None) -> Alert:
         # Save to in-memory alert list (optional)
+        timestamp = self._wall_time()
         alert = Alert(
             alert_type=alert_type,
-            timestamp=ist_now(),
-            latitude=lat,
-            longitude=lng,
-            frame_path=frame_path,
+            timestamp=timestamp,
+            frame_path=alert_frame_path(camera_id=self.camera_id, timestamp=timestamp),
             male_count=self.current_counts['male'],
             female_count=self.current_counts['female'],
-            gesture=gesture
+            gesture=gesture,
+            camera_id=self.camera_id
         )
         self.alerts.append(alert)
+        if self.location_provider is not None:
+            alert.latitude, alert.longitude = self.location_provider.current()
+
+        if self.alert_writer is not None:
+            # Frame write, location lookup and DB insert happen off the video loop
+            self.alert_writer.submit(alert, frame)
+            return alert
+
+        save_alert_frame(frame, frame_path=alert.frame_path)
+        if self.location_provider is None:
+            alert.latitude, alert.longitude = get_location()
 
         # Save to DB
         db_alert = DBAlert(
             alert_type=alert_type,
-            latitude=lat,
-            longitude=lng,
-            frame_path=frame_path,
-            male_count=self.current_counts['male'],
-            female_count=self.current_counts['female'],
-            gesture=gesture
+            timestamp=alert.timestamp,
+            latitude=alert.latitude,
+            longitude=alert.longitude,
+            frame_path=alert.frame_path,
+            male_count=alert.male_count,
+            female_count=alert.female_count,
+            gesture=gesture,
+            camera_id=self.camera_id
         )
         db.session.add(db_alert)
+        record_alerts([db_alert])
         db.session.commit()
+        if self.event_bus is not None:
+            self.event_bus.publish('alert', db_alert.to_dict())
 
         return alert
 
@@ -406,5 +690,16 @@ class SafetyDetector:
         return sorted(self.alerts, key=lambda x: x.timestamp, reverse=True)[:limit]
 
     def release(self):
-        """Release resources"""
-        self.hands.close()
\ No newline at end of file
+        """Release resources, waiting for queued alerts to be persisted.
+
+        Models go back to the registry for the next detector.
+        """
+        if self.alert_writer is not None:
+            self.alert_writer.flush(timeout=10.0)
+        if self.models_loaded:
+            registry = self.model_registry
+            registry.release('hands', self.config, self.hands)
+            registry.release('gender', self.config, self.gender_net)
+            registry.release('faces', self.config, self.face_detector)
+            self.hands = self.gender_net = self.face_detector = None
+            self.models_loaded = False
\ No newline at end of file
@@ -0,0 +1,71 @@
+import time
+from typing import Optional
+
+import numpy as np
+
+from .utils import downscale, encode_frame_to_jpg
+
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR, TJSAMP_420
+except ImportError:  # optional, falls back to cv2.imencode
+    TurboJPEG = None
+
+JPEG_ENCODERS = ('auto', 'opencv', 'turbojpeg')
+
+
+def mjpeg_chunk(jpeg: bytes) -> bytes:
+    """One part of a ``multipart/x-mixed-replace; boundary=frame`` response"""
+    header = f'--frame\r\nContent-Type: image/jpeg\r\nContent-Length: {len(jpeg)}\r\n\r\n'
+    return b''.join((header.encode('ascii'), jpeg, b'\r\n'))
+
+
+class JpegEncoder:
+    """Encodes stream frames at a fixed quality and maximum width.
+
+    ``encoder='auto'`` uses libjpeg-turbo through PyTurboJPEG when it is
+    installed and cv2.imencode otherwise; 'turbojpeg' falls back the same
+    way, with a message, when the library cannot be loaded.
+    """
+
+    def __init__(self, quality: int = 80, max_width: Optional[int] = None, encoder: str = 'auto'):
+        if encoder not in JPEG_ENCODERS:
+            raise ValueError(f"Unknown JPEG encoder '{encoder}', expected one of {JPEG_ENCODERS}")
+        self.quality = quality
+        self.max_width = max_width
+        self._turbo = None
+        if encoder != 'opencv' and TurboJPEG is not None:
+            try:
+                self._turbo = TurboJPEG()
+            except Exception as e:
+                print(f"TurboJPEG unavailable ({e}), using OpenCV JPEG encoding")
+        elif encoder == 'turbojpeg':
+            print("PyTurboJPEG is not installed, using OpenCV JPEG encoding")
+        self.name = 'turbojpeg' if self._turbo is not None else 'opencv'
+
+        # Counters
+        self.frames = 0
+        self.bytes = 0
+        self.total_ms = 0.0
+
+    def encode(self, frame: np.ndarray) -> bytes:
+        started = time.perf_counter()
+        frame, _ = downscale(frame, self.max_width)
+        if self._turbo is not None:
+            jpeg = self._turbo.encode(frame, quality=self.quality, pixel_format=TJPF_BGR,
+                                      jpeg_subsample=TJSAMP_420)
+        else:
+            jpeg = encode_frame_to_jpg(frame, self.quality)
+        self.frames += 1
+        self.bytes += len(jpeg)
+        self.total_ms += (time.perf_counter() - started) * 1000
+        return jpeg
+
+    def stats(self) -> dict:
+        return {
+            'encoder': self.name,
+            'quality': self.quality,
+            'max_width': self.max_width,
+            'frames': self.frames,
+            'avg_bytes': round(self.bytes / self.frames) if self.frames else 0,
+            'avg_encode_ms': round(self.total_ms / self.frames, 2) if self.frames else 0.0
+        }
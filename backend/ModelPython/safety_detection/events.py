@@ -0,0 +1,95 @@
+import itertools
+import json
+import threading
+from collections import deque
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+Event = Tuple[int, str, dict]
+
+
+def format_sse(data: dict, event_type: str, event_id: Optional[int] = None) -> str:
+    """Serialize one Server-Sent Events message"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event_type}")
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return '\n'.join(lines) + '\n\n'
+
+
+class EventBus:
+    """In-process publish/subscribe for live state changes.
+
+    Detectors publish gesture and count changes and the alert writer
+    publishes new alerts. Events get increasing ids and the last ``history``
+    of them are kept, so a client reconnecting with ``Last-Event-ID``
+    receives what it missed. If it fell further behind than the buffer, it
+    gets a ``reset`` event telling it to refetch instead.
+    """
+
+    def __init__(self, history: int = 1000, heartbeat: float = 15.0):
+        self.heartbeat = heartbeat
+        self._events: deque = deque(maxlen=history)
+        self._ids = itertools.count(1)
+        self._last_id = 0
+        self._cond = threading.Condition()
+
+    @property
+    def last_id(self) -> int:
+        return self._last_id
+
+    def publish(self, event_type: str, data: dict) -> int:
+        with self._cond:
+            event_id = next(self._ids)
+            self._events.append((event_id, event_type, data))
+            self._last_id = event_id
+            self._cond.notify_all()
+        return event_id
+
+    def _since(self, last_id: int) -> Tuple[List[Event], bool]:
+        """Buffered events after last_id and whether any were lost (buffer overrun)"""
+        if not self._events or last_id >= self._last_id:
+            return [], False
+        missed = last_id < self._events[0][0] - 1
+        return [e for e in self._events if e[0] > last_id], missed
+
+    def stream(self, last_event_id: Optional[int] = None, types: Optional[Iterable[str]] = None,
+               camera_id: Optional[str] = None, initial: Iterable[Tuple[str, dict]] = ()) -> Iterator[str]:
+        """Yield SSE messages forever, starting after last_event_id.
+
+        ``initial`` (type, data) pairs are sent first without ids, e.g. a
+        snapshot of current state for a fresh connection. Events can be
+        limited to some types and to one camera (events without a camera_id,
+        such as alerts from other sources, always pass).
+        """
+        types = set(types) if types else None
+
+        def wanted(event_type: str, data: dict) -> bool:
+            if types is not None and event_type not in types:
+                return False
+            return camera_id is None or data.get('camera_id') in (None, camera_id)
+
+        # Pinned before the snapshot goes out so nothing published while it
+        # is being sent is skipped
+        with self._cond:
+            cursor = self._last_id if last_event_id is None else last_event_id
+        # Tell the browser how long to wait before reconnecting
+        yield "retry: 2000\n\n"
+        for event_type, data in initial:
+            if wanted(event_type, data):
+                yield format_sse(data, event_type)
+
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._last_id > cursor, self.heartbeat)
+                events, missed = self._since(cursor)
+            if missed:
+                yield format_sse({'reason': 'missed events'}, 'reset', events[0][0] - 1)
+            if not events:
+                # Comment line keeps proxies from closing an idle stream
+                yield ": keep-alive\n\n"
+                continue
+            for event_id, event_type, data in events:
+                cursor = event_id
+                if wanted(event_type, data):
+                    yield format_sse(data, event_type, event_id)
@@ -0,0 +1,183 @@
+import os
+from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .utils import downscale
+
+Box = Tuple[int, int, int, int]
+
+MODEL_DIR = os.path.join(os.path.dirname(__file__), 'models')
+
+# Smallest window the bundled Haar cascades were trained on
+HAAR_WINDOW = 24
+HAAR_CASCADE = os.path.join(MODEL_DIR, 'haarcascade_frontalface_default.xml')
+
+# ResNet-10 SSD face detector; the weights are not bundled (see SSDFaceDetector)
+SSD_PROTOTXT = os.path.join(MODEL_DIR, 'deploy.prototxt.txt')
+SSD_WEIGHTS = os.path.join(MODEL_DIR, 'res10_300x300_ssd_iter_140000.caffemodel')
+SSD_INPUT_SIZE = (300, 300)
+SSD_MEAN = (104.0, 177.0, 123.0)
+
+DNN_BACKENDS = {
+    'default': cv2.dnn.DNN_BACKEND_DEFAULT,
+    'opencv': cv2.dnn.DNN_BACKEND_OPENCV,
+    'openvino': cv2.dnn.DNN_BACKEND_INFERENCE_ENGINE,
+    'cuda': cv2.dnn.DNN_BACKEND_CUDA
+}
+DNN_TARGETS = {
+    'cpu': cv2.dnn.DNN_TARGET_CPU,
+    'opencl': cv2.dnn.DNN_TARGET_OPENCL,
+    'opencl_fp16': cv2.dnn.DNN_TARGET_OPENCL_FP16,
+    'myriad': cv2.dnn.DNN_TARGET_MYRIAD,
+    'cuda': cv2.dnn.DNN_TARGET_CUDA,
+    'cuda_fp16': cv2.dnn.DNN_TARGET_CUDA_FP16
+}
+
+
+def configure_dnn(net, backend: str = 'opencv', target: str = 'cpu') -> Tuple[str, str]:
+    """Select a cv2.dnn backend/target, falling back to OpenCV on the CPU.
+
+    Returns the (backend, target) names actually in use, e.g. when OpenVINO
+    is requested but this OpenCV build was compiled without it.
+    """
+    if backend not in DNN_BACKENDS or target not in DNN_TARGETS:
+        raise ValueError(f"Unknown DNN backend/target '{backend}/{target}'; "
+                         f"backends: {', '.join(DNN_BACKENDS)}, targets: {', '.join(DNN_TARGETS)}")
+    available = cv2.dnn.getAvailableTargets(DNN_BACKENDS[backend])
+    if backend != 'default' and DNN_TARGETS[target] not in available:
+        print(f"DNN backend/target {backend}/{target} is not available in this OpenCV build, "
+              "using opencv/cpu")
+        backend, target = 'opencv', 'cpu'
+    net.setPreferableBackend(DNN_BACKENDS[backend])
+    net.setPreferableTarget(DNN_TARGETS[target])
+    return backend, target
+
+
+def remap_boxes(boxes, scale: float, frame_shape) -> List[Box]:
+    """Map (x, y, w, h) boxes found on a frame resized by ``scale`` back to
+    full-resolution pixels, clipped to the frame"""
+    fh, fw = frame_shape[:2]
+    remapped = []
+    for x, y, w, h in boxes:
+        x0 = max(0, int(round(x / scale)))
+        y0 = max(0, int(round(y / scale)))
+        x1 = min(fw, int(round((x + w) / scale)))
+        y1 = min(fh, int(round((y + h) / scale)))
+        remapped.append((x0, y0, x1 - x0, y1 - y0))
+    return remapped
+
+
+def detect_faces_haar(cascade, frame: np.ndarray, detection_width: Optional[int] = None,
+                      min_size: int = 30) -> List[Box]:
+    """Haar cascade face boxes in full-resolution (x, y, w, h) pixels.
+
+    Detection runs on a copy at most ``detection_width`` wide; ``min_size``
+    is in full-resolution pixels but cannot go below the cascade's own
+    window at detection scale.
+    """
+    small, scale = downscale(frame, detection_width)
+    gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    side = max(HAAR_WINDOW, int(round(min_size * scale)))
+    faces = cascade.detectMultiScale(
+        gray,
+        scaleFactor=1.1,
+        minNeighbors=5,
+        minSize=(side, side)
+    )
+    if scale == 1.0:
+        return [(int(x), int(y), int(w), int(h)) for (x, y, w, h) in faces]
+    return remap_boxes(faces, scale, frame.shape)
+
+
+class FaceDetector(ABC):
+    """Finds faces in a BGR frame; boxes are full-resolution (x, y, w, h) pixels"""
+
+    name = 'base'
+
+    @abstractmethod
+    def detect(self, frame: np.ndarray) -> List[Box]:
+        """Face boxes found in frame"""
+
+
+class HaarFaceDetector(FaceDetector):
+    """OpenCV Haar cascade, by default the bundled frontal face cascade"""
+
+    name = 'haar'
+
+    def __init__(self, cascade_path: str = HAAR_CASCADE, detection_width: Optional[int] = None,
+                 min_size: int = 30):
+        self.cascade = cv2.CascadeClassifier(cascade_path)
+        if self.cascade.empty():
+            raise RuntimeError(f"Failed to load Haar cascade from '{cascade_path}'")
+        self.detection_width = detection_width
+        self.min_size = min_size
+
+    def detect(self, frame: np.ndarray) -> List[Box]:
+        return detect_faces_haar(self.cascade, frame, self.detection_width, self.min_size)
+
+
+class SSDFaceDetector(FaceDetector):
+    """ResNet-10 SSD face detector run through cv2.dnn.
+
+    Uses the bundled ``deploy.prototxt.txt``; the matching weights
+    (``res10_300x300_ssd_iter_140000.caffemodel``, from the OpenCV samples)
+    must be placed in the models directory. The network always sees a
+    300x300 input, so it is insensitive to camera resolution and finds
+    profile and small faces the cascade misses.
+    """
+
+    name = 'ssd'
+
+    def __init__(self, prototxt: str = SSD_PROTOTXT, weights: str = SSD_WEIGHTS,
+                 confidence: float = 0.5, min_size: int = 30,
+                 backend: str = 'opencv', target: str = 'cpu'):
+        try:
+            self.net = cv2.dnn.readNetFromCaffe(prototxt, weights)
+        except Exception as e:
+            raise RuntimeError(f"Failed to load SSD face detector: {str(e)}. "
+                               f"Please ensure '{os.path.basename(prototxt)}' and "
+                               f"'{os.path.basename(weights)}' are in the 'models' directory.")
+        self.backend, self.target = configure_dnn(self.net, backend, target)
+        self.confidence = confidence
+        self.min_size = min_size
+
+    def detect(self, frame: np.ndarray) -> List[Box]:
+        h, w = frame.shape[:2]
+        blob = cv2.dnn.blobFromImage(
+            cv2.resize(frame, SSD_INPUT_SIZE, interpolation=cv2.INTER_AREA),
+            1.0, SSD_INPUT_SIZE, SSD_MEAN
+        )
+        self.net.setInput(blob)
+        detections = self.net.forward().reshape(-1, 7)
+        # Rows are [image, class, confidence, x0, y0, x1, y1] with normalized corners
+        detections = detections[detections[:, 2] >= self.confidence]
+        corners = np.clip(detections[:, 3:7], 0.0, 1.0) * np.array([w, h, w, h])
+        boxes = []
+        for x0, y0, x1, y1 in corners.astype(int):
+            if x1 - x0 >= self.min_size and y1 - y0 >= self.min_size:
+                boxes.append((int(x0), int(y0), int(x1 - x0), int(y1 - y0)))
+        return boxes
+
+
+FACE_DETECTORS = {
+    'haar': HaarFaceDetector,
+    'ssd': SSDFaceDetector
+}
+
+
+def create_face_detector(config) -> FaceDetector:
+    """Build the face detector selected by ``DetectionConfig.face_detector``"""
+    if config.face_detector == 'haar':
+        return HaarFaceDetector(detection_width=config.detection_width, min_size=config.face_min_size)
+    if config.face_detector == 'ssd':
+        return SSDFaceDetector(
+            confidence=config.face_confidence,
+            min_size=config.face_min_size,
+            backend=config.dnn_backend,
+            target=config.dnn_target
+        )
+    raise ValueError(f"Unknown face detector '{config.face_detector}'; "
+                     f"expected one of: {', '.join(FACE_DETECTORS)}")
@@ -0,0 +1,35 @@
+from typing import List, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+# Caffe gender net (gender_deploy.prototxt) input spec
+GENDER_LABELS = ('male', 'female')
+GENDER_INPUT_SIZE = (227, 227)
+GENDER_MEAN = (78.4263377603, 87.7689143744, 114.895847746)
+
+
+def face_crops(frame: np.ndarray, boxes: Sequence[Tuple[int, int, int, int]]) -> List[np.ndarray]:
+    """Cut (x, y, w, h) face boxes out of a frame"""
+    return [frame[y:y+h, x:x+w] for (x, y, w, h) in boxes]
+
+
+def classify_gender_batch(net, crops: Sequence[np.ndarray],
+                          max_batch: int = 32) -> List[Tuple[str, float]]:
+    """Classify face crops with one ``blobFromImages`` forward per chunk.
+
+    Returns (gender, confidence) per crop in input order. ``max_batch``
+    bounds the blob size for very crowded frames.
+    """
+    results: List[Tuple[str, float]] = []
+    for start in range(0, len(crops), max_batch):
+        blob = cv2.dnn.blobFromImages(
+            list(crops[start:start + max_batch]), 1.0, GENDER_INPUT_SIZE,
+            GENDER_MEAN, swapRB=False
+        )
+        net.setInput(blob)
+        predictions = net.forward()
+        for prediction in predictions.reshape(len(predictions), -1):
+            index = int(prediction.argmax())
+            results.append((GENDER_LABELS[index], float(prediction[index])))
+    return results
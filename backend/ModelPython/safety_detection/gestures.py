@@ -0,0 +1,182 @@
+import math
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# MediaPipe Hands landmark indices
+WRIST = 0
+THUMB_MCP, THUMB_IP, THUMB_TIP = 2, 3, 4
+INDEX_MCP, INDEX_PIP, INDEX_TIP = 5, 6, 8
+MIDDLE_MCP, MIDDLE_TIP = 9, 12
+RING_MCP, RING_TIP = 13, 16
+PINKY_MCP, PINKY_TIP = 17, 20
+NUM_LANDMARKS = 21
+
+# Fewest hands in one call for which the vectorized path beats the scalar one
+VECTORIZE_MIN_HANDS = 3
+
+# Distances are in normalized image units, ratios compare tip vs knuckle
+# distance to the wrist
+DEFAULT_GESTURE_THRESHOLDS = {
+    'finger_curled': 0.10,        # fingertip to its knuckle: finger counts as curled
+    'thumb_in_fist': 0.15,        # thumb tip to wrist, thumb tucked inside the fist
+    'thumb_in_fist_knuckle': 0.10,  # thumb tip to index knuckle, thumb tucked inside the fist
+    'thumb_palm': 0.12,           # thumb tip to index/middle knuckle
+    'thumb_folded': 0.10,         # thumb tip to index fingertip
+    'thumb_relaxed': 0.20,        # thumb tip to wrist in a relaxed fist
+    'fist_ratio': 1.5,            # fingertip no further than this x knuckle from wrist
+    'extended_ratio': 1.2,        # fingertip at least this x knuckle from wrist
+    'wave': 0.15,                 # index to pinky fingertip spread of an open hand
+    'ok_sign': 0.05               # thumb tip to index tip forming the circle
+}
+
+# Fingers in thumb, index, middle, ring, pinky order
+_TIPS = [THUMB_TIP, INDEX_TIP, MIDDLE_TIP, RING_TIP, PINKY_TIP]
+_MCPS = [THUMB_MCP, INDEX_MCP, MIDDLE_MCP, RING_MCP, PINKY_MCP]
+
+# Every distance the classifier needs, as rows of a (pairs x 21) difference
+# matrix so one matmul yields all landmark deltas:
+# [0:5] tip-wrist, [5:10] knuckle-wrist, [10:14] tip-knuckle (index..pinky),
+# then thumb tip to index knuckle, middle knuckle, index tip, and index-pinky tip spread
+_PAIR_A = _TIPS + _MCPS + _TIPS[1:] + [THUMB_TIP, THUMB_TIP, THUMB_TIP, INDEX_TIP]
+_PAIR_B = [WRIST] * 10 + _MCPS[1:] + [INDEX_MCP, MIDDLE_MCP, INDEX_TIP, PINKY_TIP]
+_DIFF = np.zeros((len(_PAIR_A), NUM_LANDMARKS))
+_DIFF[np.arange(len(_PAIR_A)), _PAIR_A] += 1.0
+_DIFF[np.arange(len(_PAIR_B)), _PAIR_B] -= 1.0
+
+
+# Rows of the distance matrix
+_TIP_WRIST, _MCP_WRIST, _TIP_MCP = 0, 5, 10
+_THUMB_INDEX_MCP, _THUMB_MIDDLE_MCP, _THUMB_INDEX_TIP, _SPREAD = 14, 15, 16, 17
+_THUMB, _INDEX, _MIDDLE, _RING, _PINKY = range(5)
+
+
+def gesture_thresholds(overrides: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+    """Default thresholds updated with the given (possibly partial) overrides"""
+    thresholds = dict(DEFAULT_GESTURE_THRESHOLDS)
+    if overrides:
+        thresholds.update(overrides)
+    return thresholds
+
+
+@lru_cache(maxsize=16)
+def _comparison_table(thresholds: Tuple[Tuple[str, float], ...]) -> Tuple[np.ndarray, ...]:
+    """Every test the classifier makes, as ``d[lhs] * lhs_scale < d[rhs] * rhs_scale + rhs_offset``.
+
+    Constant thresholds use rhs_scale 0; distance ratios use a scale on one
+    side. Scaling by 1 and adding 0 are exact, so each test gives the same
+    result as the plain comparison.
+    """
+    t = dict(thresholds)
+
+    def below(row, limit):
+        return (row, 1.0, 0, 0.0, limit)
+
+    def farther(finger, ratio):
+        # fingertip further from the wrist than ratio x its knuckle
+        return (_MCP_WRIST + finger, ratio, _TIP_WRIST + finger, 1.0, 0.0)
+
+    tests = [below(_TIP_MCP + i, t['finger_curled']) for i in range(4)] + [  # 0-3
+        below(_TIP_WRIST + _THUMB, t['thumb_in_fist']),                     # 4
+        below(_THUMB_INDEX_MCP, t['thumb_in_fist_knuckle']),                # 5
+        below(_THUMB_INDEX_MCP, t['thumb_palm']),                           # 6
+        below(_THUMB_MIDDLE_MCP, t['thumb_palm']),                          # 7
+        below(_THUMB_INDEX_TIP, t['thumb_folded']),                         # 8
+        below(_TIP_WRIST + _THUMB, t['thumb_relaxed']),                     # 9
+        (_TIP_WRIST + _INDEX, 1.0, _MCP_WRIST + _INDEX, t['fist_ratio'], 0.0),    # 10
+        (_TIP_WRIST + _MIDDLE, 1.0, _MCP_WRIST + _MIDDLE, t['fist_ratio'], 0.0),  # 11
+    ] + [farther(finger, t['extended_ratio']) for finger in range(5)] + [   # 12-16
+        (0, 0.0, _SPREAD, 1.0, -t['wave']),                                 # 17
+        below(_THUMB_INDEX_TIP, t['ok_sign']),                              # 18
+    ] + [farther(finger, 1.0) for finger in (_MIDDLE, _RING, _PINKY)]       # 19-21
+    lhs, lhs_scale, rhs, rhs_scale, rhs_offset = zip(*tests)
+    return (np.array(lhs), np.array(lhs_scale)[:, None], np.array(rhs),
+            np.array(rhs_scale)[:, None], np.array(rhs_offset)[:, None])
+
+
+def _label(c) -> Optional[str]:
+    """Combine one hand's test results (see _comparison_table) into a gesture"""
+    curled_count = c[0] + c[1] + c[2] + c[3]
+    mostly_curled = curled_count >= 3
+    # 1. THUMB_PALM: thumb tucked inside the fist, near the knuckles, touching
+    # the index fingertip, or a relaxed fist with the thumb down
+    if ((c[4] and c[5] and curled_count == 4) or
+            ((c[6] or c[7]) and mostly_curled) or
+            (c[8] and mostly_curled) or
+            (c[9] and c[10] and c[11] and curled_count >= 2)):
+        return 'thumb_palm'
+    # 2. WAVE: open hand, every finger extended and spread apart
+    if all(c[12:18]):
+        return 'wave'
+    # 3. OK_SIGN: thumb and index tips touching, other fingers extended
+    if c[18] and c[19] and c[20] and c[21]:
+        return 'ok_sign'
+    return None
+
+
+def _classify_hand(hand: list, t: Dict[str, float]) -> Optional[str]:
+    """One hand's gesture from plain floats, stopping at the first match.
+
+    Makes the same float64 comparisons as the matrix path (differences,
+    squares summed x+y+z, square root), so both give the same label.
+    """
+    def dist(a, b):
+        (ax, ay, az), (bx, by, bz) = hand[a], hand[b]
+        dx, dy, dz = ax - bx, ay - by, az - bz
+        return math.sqrt(dx * dx + dy * dy + dz * dz)
+
+    thumb_wrist = dist(THUMB_TIP, WRIST)
+    thumb_index_mcp = dist(THUMB_TIP, INDEX_MCP)
+    thumb_index_tip = dist(THUMB_TIP, INDEX_TIP)
+    curled = [dist(tip, mcp) < t['finger_curled'] for tip, mcp in zip(_TIPS[1:], _MCPS[1:])]
+    curled_count = sum(curled)
+    mostly_curled = curled_count >= 3
+
+    if ((thumb_wrist < t['thumb_in_fist'] and thumb_index_mcp < t['thumb_in_fist_knuckle']
+         and curled_count == 4) or
+            ((thumb_index_mcp < t['thumb_palm'] or dist(THUMB_TIP, MIDDLE_MCP) < t['thumb_palm'])
+             and mostly_curled) or
+            (thumb_index_tip < t['thumb_folded'] and mostly_curled) or
+            (thumb_wrist < t['thumb_relaxed'] and curled_count >= 2 and
+             dist(INDEX_TIP, WRIST) < dist(INDEX_MCP, WRIST) * t['fist_ratio'] and
+             dist(MIDDLE_TIP, WRIST) < dist(MIDDLE_MCP, WRIST) * t['fist_ratio'])):
+        return 'thumb_palm'
+
+    tip_wrist = [thumb_wrist] + [dist(tip, WRIST) for tip in _TIPS[1:]]
+    mcp_wrist = [dist(mcp, WRIST) for mcp in _MCPS]
+    if (all(tip > mcp * t['extended_ratio'] for tip, mcp in zip(tip_wrist, mcp_wrist)) and
+            dist(INDEX_TIP, PINKY_TIP) > t['wave']):
+        return 'wave'
+    if (thumb_index_tip < t['ok_sign'] and
+            all(tip > mcp for tip, mcp in zip(tip_wrist[2:], mcp_wrist[2:]))):
+        return 'ok_sign'
+    return None
+
+
+def classify_gestures(landmarks: np.ndarray,
+                      thresholds: Optional[Dict[str, float]] = None) -> List[Optional[str]]:
+    """Classify distress gestures for a (hands x 21 x 3) landmark array.
+
+    Below ``VECTORIZE_MIN_HANDS`` hands each hand is classified with plain
+    float math; from there on all landmark distances and threshold tests
+    for every hand are computed in a handful of array operations, which
+    only pays off once its fixed overhead is shared (see
+    benchmarks/bench_gestures.py). Both paths give the same labels.
+    Returns 'thumb_palm', 'wave', 'ok_sign' or None per hand, checked in
+    that order. Works for both hands.
+    """
+    t = thresholds if thresholds is not None else DEFAULT_GESTURE_THRESHOLDS
+    landmarks = np.asarray(landmarks, dtype=np.float64).reshape(-1, NUM_LANDMARKS, 3)
+    if not len(landmarks):
+        return []
+    if len(landmarks) < VECTORIZE_MIN_HANDS:
+        return [_classify_hand(hand, t) for hand in landmarks.tolist()]
+
+    lhs, lhs_scale, rhs, rhs_scale, rhs_offset = _comparison_table(tuple(sorted(t.items())))
+    # (hands x pairs x 3) deltas, then (pairs x hands) distances
+    delta = _DIFF @ landmarks
+    delta *= delta
+    d = np.sqrt(delta.sum(axis=2)).T
+    tests = (d[lhs] * lhs_scale) < (d[rhs] * rhs_scale + rhs_offset)
+    return [_label(c) for c in tests.T.tolist()]
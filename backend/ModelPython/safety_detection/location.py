@@ -0,0 +1,123 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Optional, Tuple
+
+import geocoder
+
+Coordinates = Tuple[float, float]
+
+# Reported when no location is known, matching utils.get_location's fallback
+UNKNOWN_LOCATION: Coordinates = (0.0, 0.0)
+
+
+class LocationProvider(ABC):
+    """Source of camera coordinates.
+
+    ``lookup`` may block (network I/O) and returns None on failure.
+    ``current`` never blocks; alerts call it from the frame loop. By default
+    it serves a CachedLocationProvider around this provider, so a subclass
+    only implements ``lookup``; providers that answer instantly override
+    ``current``.
+    """
+
+    _cache_lock = threading.Lock()
+
+    @abstractmethod
+    def lookup(self) -> Optional[Coordinates]:
+        """Coordinates from the source, or None when the lookup fails"""
+
+    def current(self) -> Coordinates:
+        cache = self.__dict__.get('_cache')
+        if cache is None:
+            with LocationProvider._cache_lock:
+                cache = self.__dict__.get('_cache')
+                if cache is None:
+                    cache = self._cache = CachedLocationProvider(self)
+        return cache.current()
+
+
+class StaticLocationProvider(LocationProvider):
+    """Fixed coordinates, e.g. a camera's surveyed position from config"""
+
+    def __init__(self, latitude: float, longitude: float):
+        self.coords = (float(latitude), float(longitude))
+
+    def lookup(self) -> Optional[Coordinates]:
+        return self.coords
+
+    def current(self) -> Coordinates:
+        return self.coords
+
+
+class IPLocationProvider(LocationProvider):
+    """Geolocation of this machine's public IP (blocking HTTP call)"""
+
+    def lookup(self) -> Optional[Coordinates]:
+        try:
+            g = geocoder.ip('me')
+            return tuple(g.latlng) if g.latlng else None
+        except Exception:
+            return None
+
+
+class CachedLocationProvider(LocationProvider):
+    """TTL cache around a slow provider with non-blocking background refresh.
+
+    ``current`` returns the cached value (or ``default`` before the first
+    successful lookup) immediately; when the value is older than ``ttl`` it
+    starts a single background refresh. Failed lookups are retried after
+    ``retry_interval`` instead of on every call.
+    """
+
+    def __init__(self, provider: LocationProvider, ttl: float = 3600.0,
+                 retry_interval: float = 60.0, default: Coordinates = UNKNOWN_LOCATION,
+                 clock: Callable[[], float] = time.monotonic):
+        self.provider = provider
+        self.ttl = ttl
+        self.retry_interval = retry_interval
+        self.default = default
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._coords: Optional[Coordinates] = None
+        self._fetched_at = 0.0
+        self._attempted_at: Optional[float] = None
+        self._refreshing = False
+
+    def _stale(self, now: float) -> bool:
+        if self._refreshing:
+            return False
+        if self._attempted_at is not None and now - self._attempted_at < self.retry_interval:
+            return False
+        return self._coords is None or now - self._fetched_at >= self.ttl
+
+    def refresh(self) -> Optional[Coordinates]:
+        """Look up coordinates now (blocking) and update the cache"""
+        coords = self.provider.lookup()
+        with self._lock:
+            self._attempted_at = self.clock()
+            if coords is not None:
+                self._coords = coords
+                self._fetched_at = self._attempted_at
+            self._refreshing = False
+        return coords
+
+    def refresh_async(self):
+        """Start a background refresh unless one is already running"""
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self.refresh, name="LocationRefresh", daemon=True).start()
+
+    def lookup(self) -> Optional[Coordinates]:
+        with self._lock:
+            return self._coords
+
+    def current(self) -> Coordinates:
+        with self._lock:
+            coords = self._coords
+            stale = self._stale(self.clock())
+        if stale:
+            self.refresh_async()
+        return coords if coords is not None else self.default
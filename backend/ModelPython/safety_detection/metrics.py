@@ -0,0 +1,188 @@
+import bisect
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+# Upper bounds (seconds) of the cumulative latency histogram buckets
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class LatencyHistogram:
+    """Cumulative Prometheus-style buckets plus a rolling window for percentiles.
+
+    ``observe`` is a bisect and a few increments; percentiles over the last
+    ``window`` samples are only computed when read.
+    """
+
+    def __init__(self, window: int = 1024):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)  # last bucket is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.recent: deque = deque(maxlen=window)
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.recent.append(seconds)
+
+    def quantiles(self) -> Dict[float, float]:
+        if not self.recent:
+            return {q: 0.0 for q in QUANTILES}
+        values = np.percentile(np.fromiter(self.recent, dtype=np.float64), [q * 100 for q in QUANTILES])
+        return dict(zip(QUANTILES, values.tolist()))
+
+
+class _Timer:
+    __slots__ = ('metrics', 'stage', 'started')
+
+    def __init__(self, metrics: 'PipelineMetrics', stage: str):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.stage, time.perf_counter() - self.started)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class PipelineMetrics:
+    """Per-camera stage latencies and event counters.
+
+    Stages are free-form names (capture, motion, face_detect, gender,
+    hands, draw, alert, encode, process, ...); counters likewise (frames,
+    dropped_frames, faces, hands, alerts). Counters may carry one label
+    value, e.g. ``inc('alerts', label='distress')``. With ``enabled`` False
+    every call is a no-op.
+    """
+
+    def __init__(self, enabled: bool = True, window: int = 1024):
+        self.enabled = enabled
+        self.window = window
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._counters: Dict[Tuple[str, Optional[str]], int] = defaultdict(int)
+
+    def time(self, stage: str):
+        """Context manager observing the duration of its block"""
+        return _Timer(self, stage) if self.enabled else _NULL_TIMER
+
+    def observe(self, stage: str, seconds: float):
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = LatencyHistogram(self.window)
+            histogram.observe(seconds)
+
+    def inc(self, counter: str, amount: int = 1, label: Optional[str] = None):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[(counter, label)] += amount
+
+    def snapshot(self) -> dict:
+        """Copy of the current histograms and counters, safe to read without the lock"""
+        with self._lock:
+            stages = {
+                stage: {
+                    'counts': list(h.counts), 'count': h.count, 'sum': h.sum,
+                    'quantiles': h.quantiles()
+                }
+                for stage, h in self._histograms.items()
+            }
+            counters = dict(self._counters)
+        return {'stages': stages, 'counters': counters}
+
+    def summary(self) -> dict:
+        """Milliseconds p50/p95/p99 per stage plus counters, for JSON status endpoints"""
+        snapshot = self.snapshot()
+        counters = {}
+        for (name, label), value in snapshot['counters'].items():
+            counters[f"{name}:{label}" if label else name] = value
+        return {
+            'stages': {
+                stage: dict({f"p{int(q * 100)}_ms": round(v * 1000, 3) for q, v in s['quantiles'].items()},
+                            count=s['count'])
+                for stage, s in snapshot['stages'].items()
+            },
+            'counters': counters
+        }
+
+
+def _labels(**labels) -> str:
+    parts = []
+    for key, value in labels.items():
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{key}="{value}"')
+    return '{' + ','.join(parts) + '}'
+
+
+def render_prometheus(cameras: Iterable[Tuple[str, PipelineMetrics]],
+                      gauges: Optional[Dict[str, Tuple[str, float]]] = None) -> str:
+    """Prometheus text exposition (format 0.0.4) for every camera's metrics.
+
+    ``gauges`` adds process-wide values as name -> (help text, value).
+    """
+    snapshots = [(camera_id, metrics.snapshot()) for camera_id, metrics in cameras]
+    lines = [
+        '# HELP safewatch_stage_seconds Time spent per pipeline stage',
+        '# TYPE safewatch_stage_seconds histogram'
+    ]
+    for camera_id, snapshot in snapshots:
+        for stage, s in sorted(snapshot['stages'].items()):
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + (float('inf'),), s['counts']):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f"safewatch_stage_seconds_bucket{_labels(camera=camera_id, stage=stage, le=le)} {cumulative}")
+            lines.append(f"safewatch_stage_seconds_sum{_labels(camera=camera_id, stage=stage)} {s['sum']:.6f}")
+            lines.append(f"safewatch_stage_seconds_count{_labels(camera=camera_id, stage=stage)} {s['count']}")
+
+    lines += [
+        '# HELP safewatch_stage_recent_seconds Stage latency quantiles over the most recent samples',
+        '# TYPE safewatch_stage_recent_seconds summary'
+    ]
+    for camera_id, snapshot in snapshots:
+        for stage, s in sorted(snapshot['stages'].items()):
+            for q, value in s['quantiles'].items():
+                lines.append(f"safewatch_stage_recent_seconds{_labels(camera=camera_id, stage=stage, quantile=q)} {value:.6f}")
+            lines.append(f"safewatch_stage_recent_seconds_sum{_labels(camera=camera_id, stage=stage)} {s['sum']:.6f}")
+            lines.append(f"safewatch_stage_recent_seconds_count{_labels(camera=camera_id, stage=stage)} {s['count']}")
+
+    names = sorted({name for _, snapshot in snapshots for name, _ in snapshot['counters']})
+    for name in names:
+        lines += [f'# HELP safewatch_{name}_total Count of {name.replace("_", " ")}',
+                  f'# TYPE safewatch_{name}_total counter']
+        for camera_id, snapshot in snapshots:
+            for (counter, label), value in sorted(snapshot['counters'].items(), key=lambda kv: str(kv[0])):
+                if counter != name:
+                    continue
+                labels = _labels(camera=camera_id, type=label) if label else _labels(camera=camera_id)
+                lines.append(f"safewatch_{name}_total{labels} {value}")
+
+    for name, (help_text, value) in sorted((gauges or {}).items()):
+        lines += [f'# HELP safewatch_{name} {help_text}', f'# TYPE safewatch_{name} gauge',
+                  f'safewatch_{name} {value}']
+    return '\n'.join(lines) + '\n'
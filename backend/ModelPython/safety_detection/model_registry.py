@@ -0,0 +1,227 @@
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .faces import MODEL_DIR, configure_dnn, create_face_detector
+from .gender import classify_gender_batch
+
+GENDER_PROTOTXT = os.path.join(MODEL_DIR, 'gender_deploy.prototxt')
+GENDER_WEIGHTS = os.path.join(MODEL_DIR, 'gender_net.caffemodel')
+MODEL_KINDS = ('faces', 'gender', 'hands')
+
+
+def _model_key(kind: str, config) -> Tuple:
+    """Config values that change how a model of this kind is built"""
+    if kind == 'gender':
+        return (kind, config.dnn_backend, config.dnn_target)
+    if kind == 'faces':
+        return (kind, config.face_detector, config.detection_width, config.face_min_size,
+                config.face_confidence, config.dnn_backend, config.dnn_target)
+    return (kind,)
+
+
+class ModelRegistry:
+    """Process-wide, lazily filled pool of loaded models.
+
+    Nets and MediaPipe graphs keep per-call state, so an instance is never
+    used by two detectors at once: ``acquire`` lends one out (building it
+    on first use) and ``release`` returns it for the next detector, e.g. a
+    newly added camera, instead of loading the files again. DNN weights
+    are read from disk once and built from memory afterwards.
+
+    ``warm``/``warm_async`` load one instance of each model a config
+    needs and run a dummy inference through it ahead of the first frame;
+    ``status`` reports per-model state for readiness checks. A forked
+    process (e.g. an inference worker) starts with an empty pool but keeps
+    the cached files.
+    """
+
+    def __init__(self, cache_artifacts: bool = True):
+        self.cache_artifacts = cache_artifacts
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._artifacts: Dict[str, np.ndarray] = {}
+        self._idle: Dict[Hashable, List] = defaultdict(list)
+        self._warming: Dict[Hashable, threading.Event] = {}
+        self._status: Dict[Hashable, dict] = {}
+
+    def _check_process(self):
+        # Instances inherited through fork (MediaPipe's graph threads in
+        # particular) are unusable in the child
+        if os.getpid() != self._pid:
+            self._pid = os.getpid()
+            self._lock = threading.Lock()
+            self._idle = defaultdict(list)
+            self._warming = {}
+            self._status = {}
+
+    def artifact(self, path: str) -> np.ndarray:
+        """Contents of a model file, read once per process"""
+        with self._lock:
+            data = self._artifacts.get(path)
+        if data is None:
+            with open(path, 'rb') as f:
+                data = np.frombuffer(f.read(), dtype=np.uint8)
+            if self.cache_artifacts:
+                with self._lock:
+                    self._artifacts[path] = data
+        return data
+
+    def _build(self, kind: str, config):
+        if kind == 'gender':
+            try:
+                net = cv2.dnn.readNetFromCaffe(self.artifact(GENDER_PROTOTXT), self.artifact(GENDER_WEIGHTS))
+            except Exception as e:
+                raise RuntimeError(f"Failed to load gender detection models: {str(e)}. "
+                                   "Please ensure 'gender_deploy.prototxt' and 'gender_net.caffemodel' "
+                                   "are in the 'models' directory.")
+            configure_dnn(net, config.dnn_backend, config.dnn_target)
+            return net
+        if kind == 'faces':
+            return create_face_detector(config)
+        if kind == 'hands':
+            import mediapipe as mp
+            return mp.solutions.hands.Hands(
+                max_num_hands=2,
+                min_detection_confidence=0.7,
+                min_tracking_confidence=0.5
+            )
+        raise ValueError(f"Unknown model kind '{kind}'; expected one of: {', '.join(MODEL_KINDS)}")
+
+    @staticmethod
+    def _dummy_inference(kind: str, model, config):
+        if kind == 'gender':
+            classify_gender_batch(model, [np.zeros((64, 64, 3), dtype=np.uint8)])
+        elif kind == 'faces':
+            model.detect(np.zeros((480, 640, 3), dtype=np.uint8))
+        elif kind == 'hands':
+            model.process(np.zeros((240, 320, 3), dtype=np.uint8))
+
+    def _set_status(self, key, **values):
+        with self._lock:
+            status = self._status.setdefault(key, {'state': 'cold', 'instances': 0})
+            status.update(values)
+
+    def acquire(self, kind: str, config):
+        """Lend out a loaded model of this kind for config, loading one if none is idle"""
+        self._check_process()
+        key = _model_key(kind, config)
+        with self._lock:
+            warming = self._warming.get(key)
+        if warming is not None:
+            warming.wait(120.0)
+        with self._lock:
+            if self._idle[key]:
+                return self._idle[key].pop()
+        started = time.perf_counter()
+        try:
+            model = self._build(kind, config)
+        except Exception as e:
+            self._set_status(key, state='error', error=str(e))
+            raise
+        with self._lock:
+            status = self._status.setdefault(key, {'state': 'cold', 'instances': 0})
+            status['instances'] += 1
+            status.setdefault('load_ms', round((time.perf_counter() - started) * 1000, 1))
+            if status['state'] != 'ready':
+                status.update(state='loaded', error=None)
+        return model
+
+    def release(self, kind: str, config, model):
+        """Return a model lent out by acquire"""
+        if model is None:
+            return
+        if os.getpid() != self._pid:
+            return
+        if kind == 'hands' and hasattr(model, 'reset'):
+            # Do not carry hand tracking over to another camera
+            model.reset()
+        with self._lock:
+            self._idle[_model_key(kind, config)].append(model)
+
+    def warm(self, config, kinds: Optional[Tuple[str, ...]] = None) -> dict:
+        """Load and warm one instance of each model the config uses; returns status()"""
+        self._check_process()
+        if kinds is None:
+            kinds = tuple(k for k in MODEL_KINDS if k != 'hands' or config.gesture_enabled)
+        # Claim every model first so a detector asking for one meanwhile
+        # waits for it instead of loading a second copy
+        pending = []
+        with self._lock:
+            for kind in kinds:
+                key = _model_key(kind, config)
+                if key in self._warming or self._status.get(key, {}).get('state') == 'ready':
+                    continue
+                self._warming[key] = threading.Event()
+                self._status.setdefault(key, {'state': 'cold', 'instances': 0})['state'] = 'loading'
+                pending.append((kind, key))
+        for kind, key in pending:
+            event = self._warming[key]
+            try:
+                started = time.perf_counter()
+                model = self._build(kind, config)
+                loaded = time.perf_counter()
+                self._dummy_inference(kind, model, config)
+                with self._lock:
+                    status = self._status[key]
+                    status['instances'] += 1
+                    status.update(state='ready', error=None,
+                                  load_ms=round((loaded - started) * 1000, 1),
+                                  warm_ms=round((time.perf_counter() - loaded) * 1000, 1))
+                    self._idle[key].append(model)
+            except Exception as e:
+                print(f"Could not load {kind} model: {e}")
+                self._set_status(key, state='error', error=str(e))
+            finally:
+                with self._lock:
+                    self._warming.pop(key, None)
+                event.set()
+        return self.status()
+
+    def warm_async(self, config, kinds: Optional[Tuple[str, ...]] = None) -> threading.Thread:
+        thread = threading.Thread(target=self.warm, args=(config, kinds), name="ModelWarmup", daemon=True)
+        thread.start()
+        return thread
+
+    def status(self) -> dict:
+        """Per-model state ('cold', 'loading', 'loaded', 'ready' or 'error') and readiness.
+
+        Ready means at least one model was warmed and none is loading or failed.
+        """
+        self._check_process()
+        with self._lock:
+            models = {}
+            for key, status in self._status.items():
+                models['/'.join(str(part) for part in key)] = dict(status, idle=len(self._idle[key]))
+        states = [m['state'] for m in models.values()]
+        return {
+            'ready': bool(states) and all(s in ('ready', 'loaded') for s in states),
+            'models': models
+        }
+
+    def close(self):
+        """Close pooled MediaPipe graphs and drop every idle instance"""
+        with self._lock:
+            idle, self._idle = self._idle, defaultdict(list)
+        for key, models in idle.items():
+            if key[0] == 'hands':
+                for model in models:
+                    model.close()
+
+
+_shared: Optional[ModelRegistry] = None
+_shared_lock = threading.Lock()
+
+
+def shared_registry() -> ModelRegistry:
+    """The process-wide registry detectors use unless given their own"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = ModelRegistry()
+        return _shared
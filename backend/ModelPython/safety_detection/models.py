@@ -18,6 +18,14 @@ class Alert(db.Model):
     female_count = db.Column(db.Integer)
     gesture = db.Column(db.String(50), nullable=True)
     confidence = db.Column(db.Float, nullable=True)
+    camera_id = db.Column(db.String(64), nullable=True)
+
+    __table_args__ = (
+        # Keyset pagination walks (timestamp, id); type filters use the
+        # second index, which also serves plain alert_type lookups
+        db.Index('ix_alert_timestamp_id', 'timestamp', 'id'),
+        db.Index('ix_alert_type_timestamp', 'alert_type', 'timestamp'),
+    )
 
     def to_dict(self):
         # Format timestamp for IST display
@@ -32,20 +40,157 @@ class Alert(db.Model):
             "male_count": self.male_count,
             "female_count": self.female_count,
             "gesture": self.gesture,
-            "confidence": self.confidence
+            "confidence": self.confidence,
+            "camera_id": self.camera_id
         }
+
+
+class AlertRollup(db.Model):
+    """Alert counts per time bucket, maintained as alerts are written and deleted.
+
+    One row per (resolution, bucket, camera_id, alert_type, gesture), where
+    resolution is 'minute' or 'hour' and bucket is the naive IST start of
+    the period. Missing camera ids and gestures are stored as '' so the
+    unique key also covers them. Peaks are the highest male/female counts
+    seen on an alert in the bucket.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    resolution = db.Column(db.String(8), nullable=False)
+    bucket = db.Column(db.DateTime, nullable=False)
+    camera_id = db.Column(db.String(64), nullable=False, default='')
+    alert_type = db.Column(db.String(50), nullable=False, default='')
+    gesture = db.Column(db.String(50), nullable=False, default='')
+    count = db.Column(db.Integer, nullable=False, default=0)
+    peak_male = db.Column(db.Integer, nullable=False, default=0)
+    peak_female = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.UniqueConstraint('resolution', 'bucket', 'camera_id', 'alert_type', 'gesture',
+                            name='uq_alert_rollup_key'),
+    )
     
 
 class DetectionConfig:
     def __init__(self, confidence_threshold=0.5, gesture_enabled=True, alert_cooldown=5, night_start_hour=20, night_end_hour=6, gesture_thresholds = {
-                'thumb_palm': 0.1,
-                'wave': 0.25,
+                'thumb_palm': 0.12,
+                'wave': 0.15,
                 'thumb_folded': 0.1
-            }):
+            }, execution_mode='thread', process_workers=None, gender_batch_size=32,
+            batch_frames=4, tracking_enabled=True, track_iou_threshold=0.3, track_max_missed=5,
+            track_min_hits=3, gender_reclassify_interval=30, gender_min_confidence=0.6,
+            gender_min_votes=3,
+            stage_rates={'faces': 5.0, 'hands': 15.0},
+            idle_stage_rates={'faces': 2.0, 'hands': 2.0}, stage_max_share=None,
+            gesture_window=15, gesture_min_frames=8, gesture_min_duration=None,
+            gesture_min_confidence=0.0, wave_min_reversals=2, wave_min_amplitude=0.04,
+            motion_gate_enabled=True, motion_threshold=25, motion_min_area=0.002,
+            motion_keepalive=5.0, hand_roi_enabled=True, hand_roi_max_fraction=0.6,
+            hand_roi_margin=0.25, hand_roi_shrink_ratio=0.25,
+            detection_width=640, face_detector='haar', face_confidence=0.5, face_min_size=30,
+            dnn_backend='opencv', dnn_target='cpu', stream_jpeg_quality=80, stream_max_width=None,
+            stream_max_fps=None, stream_skip_unchanged=True, stream_refresh_interval=1.0,
+            jpeg_encoder='auto', metrics_enabled=True, metrics_window=1024, surround_radius=2.5,
+            surround_min_males=1, surround_min_sides=1, surround_max_size_ratio=2.0):
         self.confidence_threshold = confidence_threshold
         self.gesture_enabled = gesture_enabled
         self.alert_cooldown = alert_cooldown
         self.night_start_hour = night_start_hour
         self.night_end_hour = night_end_hour
+        # Partial overrides of gestures.DEFAULT_GESTURE_THRESHOLDS
         self.gesture_thresholds = gesture_thresholds
-        
\ No newline at end of file
+        # 'thread' runs detection in-process; 'process' uses worker processes
+        # (see parallel.ProcessInferenceBackend), process_workers defaults to CPU count
+        self.execution_mode = execution_mode
+        self.process_workers = process_workers
+        # Max face crops per gender_net forward pass
+        self.gender_batch_size = gender_batch_size
+        # Max queued frames a process worker analyzes together (faces from all
+        # of them share one gender forward pass)
+        self.batch_frames = batch_frames
+        # Face tracking: gender is cached per track and the net is only re-run
+        # for tracks with fewer than gender_min_votes votes or below
+        # gender_min_confidence, and every gender_reclassify_interval frames
+        self.tracking_enabled = tracking_enabled
+        self.track_iou_threshold = track_iou_threshold
+        self.track_max_missed = track_max_missed
+        self.track_min_hits = track_min_hits
+        self.gender_reclassify_interval = gender_reclassify_interval
+        self.gender_min_confidence = gender_min_confidence
+        self.gender_min_votes = gender_min_votes
+        # Target rate in Hz per analysis stage (None = every frame), the lower
+        # rate used while nobody is in view, and optionally the max fraction of
+        # wall time a stage may use (adaptively lowers its rate on slow boxes)
+        self.stage_rates = stage_rates
+        self.idle_stage_rates = idle_stage_rates
+        self.stage_max_share = stage_max_share
+        # Gesture confirmation: a distress gesture only counts once it is seen
+        # in gesture_min_frames of a hand's last gesture_window hands-stage
+        # results, or held for gesture_min_duration seconds; a wave also needs
+        # wave_min_reversals side-to-side wrist swings of wave_min_amplitude
+        # (normalized width). gesture_window=1, gesture_min_frames=1 and
+        # wave_min_reversals=0 restore single-frame alerts
+        self.gesture_window = gesture_window
+        self.gesture_min_frames = gesture_min_frames
+        self.gesture_min_duration = gesture_min_duration
+        self.gesture_min_confidence = gesture_min_confidence
+        self.wave_min_reversals = wave_min_reversals
+        self.wave_min_amplitude = wave_min_amplitude
+        # Motion gate: while nobody is in view and less than motion_min_area of
+        # a downscaled frame changes by motion_threshold grey levels, no stage
+        # runs except once every motion_keepalive seconds
+        self.motion_gate_enabled = motion_gate_enabled
+        self.motion_threshold = motion_threshold
+        self.motion_min_area = motion_min_area
+        self.motion_keepalive = motion_keepalive
+        # Search for hands only around faces, recent hands and motion; falls
+        # back to the full frame when that region exceeds hand_roi_max_fraction.
+        # MediaPipe tracks hands from the previous frame's position in the
+        # crop, so the region is sticky: it grows by hand_roi_margin when
+        # something leaves it and shrinks only once the wanted area fills
+        # less than hand_roi_shrink_ratio of it. Each change still costs one
+        # frame of palm re-detection (static_image_mode=True would avoid
+        # that but re-detects palms on every frame)
+        self.hand_roi_enabled = hand_roi_enabled
+        self.hand_roi_max_fraction = hand_roi_max_fraction
+        self.hand_roi_margin = hand_roi_margin
+        self.hand_roi_shrink_ratio = hand_roi_shrink_ratio
+        # Face and hand detection run on a copy at most this many pixels wide
+        # (None = full resolution); boxes are mapped back and gender crops
+        # still come from the full-resolution frame
+        self.detection_width = detection_width
+        # Face detector: 'haar' (bundled cascade) or 'ssd' (ResNet-10 SSD via
+        # cv2.dnn, needs res10_300x300_ssd_iter_140000.caffemodel in models/);
+        # face_confidence only applies to 'ssd'. dnn_backend/dnn_target select
+        # where cv2.dnn nets (SSD and gender) run, e.g. 'openvino'/'cpu' or
+        # 'opencv'/'opencl'; unavailable choices fall back to 'opencv'/'cpu'
+        self.face_detector = face_detector
+        self.face_confidence = face_confidence
+        self.face_min_size = face_min_size
+        self.dnn_backend = dnn_backend
+        self.dnn_target = dnn_target
+        # Live MJPEG stream: each frame is encoded once for all viewers at
+        # stream_jpeg_quality, shrunk to stream_max_width (None = full size).
+        # stream_max_fps caps frames sent per viewer (a ?fps= query can lower
+        # it); with stream_skip_unchanged, still frames where no stage ran are
+        # not re-encoded, but the image is refreshed every
+        # stream_refresh_interval seconds. jpeg_encoder is 'auto' (TurboJPEG
+        # when installed), 'opencv' or 'turbojpeg'
+        self.stream_jpeg_quality = stream_jpeg_quality
+        self.stream_max_width = stream_max_width
+        self.stream_max_fps = stream_max_fps
+        self.stream_skip_unchanged = stream_skip_unchanged
+        self.stream_refresh_interval = stream_refresh_interval
+        self.jpeg_encoder = jpeg_encoder
+        # Per-stage latency histograms and counters (see metrics.py, served at
+        # /metrics); percentiles cover each stage's last metrics_window samples
+        self.metrics_enabled = metrics_enabled
+        self.metrics_window = metrics_window
+        # woman_surrounded_spatial (see proximity.SurroundRule): a man is near
+        # within surround_radius face sizes (centre to centre) if his face is
+        # at most surround_max_size_ratio larger or smaller; a woman is
+        # surrounded by surround_min_males near men on surround_min_sides of
+        # four sides (e.g. 2 and 2 for men on different sides of her)
+        self.surround_radius = surround_radius
+        self.surround_min_males = surround_min_males
+        self.surround_min_sides = surround_min_sides
+        self.surround_max_size_ratio = surround_max_size_ratio
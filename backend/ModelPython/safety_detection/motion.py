@@ -0,0 +1,114 @@
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+Box = Tuple[int, int, int, int]  # x, y, w, h in full-frame pixels
+
+
+class MotionGate:
+    """Cheap change detector run on every frame before the expensive stages.
+
+    Frames are shrunk to ``width`` pixels wide, converted to blurred
+    grayscale and compared against a running-average background. A frame
+    counts as moving when more than ``min_area`` of its pixels differ by
+    over ``threshold`` grey levels. Costs well under a millisecond per
+    frame, versus tens of milliseconds for face and hand detection.
+    """
+
+    def __init__(self, width: int = 160, threshold: int = 25, min_area: float = 0.002,
+                 learning_rate: float = 0.05):
+        self.width = width
+        self.threshold = threshold
+        self.min_area = min_area
+        self.learning_rate = learning_rate
+        self._background: Optional[np.ndarray] = None
+        self.motion_box: Optional[Box] = None  # bounding box of the last motion
+        self.frames = 0
+        self.motion_frames = 0
+
+    def _prepare(self, frame: np.ndarray) -> Tuple[np.ndarray, float]:
+        h, w = frame.shape[:2]
+        scale = min(1.0, self.width / float(w))
+        small = cv2.resize(frame, (max(1, int(w * scale)), max(1, int(h * scale))),
+                           interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+        return cv2.GaussianBlur(gray, (5, 5), 0), scale
+
+    def update(self, frame: np.ndarray) -> bool:
+        """Feed a frame; True if it differs from the background"""
+        gray, scale = self._prepare(frame)
+        self.frames += 1
+        if self._background is None or self._background.shape != gray.shape:
+            self._background = gray.astype(np.float32)
+            self.motion_box = None
+            self.motion_frames += 1
+            return True
+
+        diff = cv2.absdiff(gray, cv2.convertScaleAbs(self._background))
+        _, mask = cv2.threshold(diff, self.threshold, 255, cv2.THRESH_BINARY)
+        cv2.accumulateWeighted(gray, self._background, self.learning_rate)
+
+        changed = cv2.countNonZero(mask)
+        if changed <= self.min_area * mask.size:
+            self.motion_box = None
+            return False
+        x, y, w, h = cv2.boundingRect(mask)
+        self.motion_box = (int(x / scale), int(y / scale), int(np.ceil(w / scale)), int(np.ceil(h / scale)))
+        self.motion_frames += 1
+        return True
+
+    def stats(self) -> dict:
+        return {
+            'frames': self.frames,
+            'motion_frames': self.motion_frames,
+            'still_frames': self.frames - self.motion_frames
+        }
+
+
+def expand_box(box: Box, frame_shape, left: float, right: float, top: float, bottom: float) -> Box:
+    """Grow a box by multiples of its own width/height, clipped to the frame"""
+    x, y, w, h = box
+    fh, fw = frame_shape[:2]
+    x0 = max(0, int(x - left * w))
+    y0 = max(0, int(y - top * h))
+    x1 = min(fw, int(x + w + right * w))
+    y1 = min(fh, int(y + h + bottom * h))
+    return x0, y0, x1 - x0, y1 - y0
+
+
+def union_box(boxes: List[Box]) -> Optional[Box]:
+    """Smallest box containing all boxes"""
+    if not boxes:
+        return None
+    x0 = min(b[0] for b in boxes)
+    y0 = min(b[1] for b in boxes)
+    x1 = max(b[0] + b[2] for b in boxes)
+    y1 = max(b[1] + b[3] for b in boxes)
+    return x0, y0, x1 - x0, y1 - y0
+
+
+def contains_box(outer: Box, inner: Box) -> bool:
+    return (inner[0] >= outer[0] and inner[1] >= outer[1] and
+            inner[0] + inner[2] <= outer[0] + outer[2] and inner[1] + inner[3] <= outer[1] + outer[3])
+
+
+def sticky_box(current: Optional[Box], target: Box, frame_shape, margin: float,
+               shrink_ratio: float) -> Box:
+    """Follow target with a box that changes as rarely as possible.
+
+    ``current`` is kept while it contains target. When target pokes out,
+    the box grows to also cover target padded by ``margin`` x its size on
+    every side, so the next frames of drift still fit; it is replaced by
+    that padded box only once target fills less than ``shrink_ratio`` of
+    it. With shrink_ratio below 1 / (1 + 2 * margin) ** 2 a freshly shrunk
+    box is itself stable.
+    """
+    padded = expand_box(target, frame_shape, margin, margin, margin, margin)
+    if current is None:
+        return padded
+    if not contains_box(current, target):
+        return union_box([current, padded])
+    if target[2] * target[3] < shrink_ratio * current[2] * current[3]:
+        return padded
+    return current
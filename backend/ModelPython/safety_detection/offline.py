@@ -0,0 +1,290 @@
+"""Offline analysis of recorded video files.
+
+Runs SafetyDetector over one or more files as fast as the CPU allows and
+writes the alerts to a JSON Lines (or Parquet) report:
+
+    python -m safety_detection.offline clip1.mp4 clip2.mp4 --report alerts.jsonl \\
+        [--workers 2] [--start-time 2024-05-01T21:30:00+05:30] [--frames-dir out/]
+
+Each file is decoded on its own thread into a bounded prefetch queue while
+the detector consumes frames; nothing is annotated or JPEG-encoded unless
+alert frames are requested. Files are spread over worker processes. All
+detector timing (cooldowns, stage rates, gesture durations) follows the
+frame timestamps, so results do not depend on how fast the machine is.
+"""
+import argparse
+import copy
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .models import DetectionConfig
+from .utils import save_alert_frame
+
+# Columns of the report, in order
+REPORT_FIELDS = ('file', 'frame_index', 'video_time', 'timestamp', 'alert_type', 'gesture',
+                 'male_count', 'female_count', 'camera_id', 'frame_path')
+
+
+class VideoClock:
+    """Clock reading the position of the frame being analyzed, in seconds"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FramePrefetcher:
+    """Decodes a video on a background thread into a bounded queue.
+
+    Iterating yields (frame_index, seconds, frame). Seconds come from the
+    container timestamps, falling back to index / fps when the backend does
+    not report them. The queue holds at most ``prefetch`` frames so decoding
+    runs ahead of analysis without buffering the whole file.
+    """
+
+    def __init__(self, path: str, prefetch: int = 32):
+        self.path = path
+        self.capture = cv2.VideoCapture(path)
+        if not self.capture.isOpened():
+            raise RuntimeError(f"Could not open video {path}")
+        self.fps = self.capture.get(cv2.CAP_PROP_FPS) or 0.0
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, prefetch))
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"Prefetch-{os.path.basename(path)}",
+                                        daemon=True)
+
+    def _put(self, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self):
+        index = 0
+        last = 0.0
+        try:
+            while not self._stop.is_set():
+                ok, frame = self.capture.read()
+                if not ok:
+                    break
+                seconds = self.capture.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+                if seconds <= 0 and index > 0:
+                    seconds = index / self.fps if self.fps > 0 else last
+                last = max(last, seconds)
+                if not self._put((index, last, frame)):
+                    break
+                index += 1
+        finally:
+            self.capture.release()
+            self._put(None)
+
+    def __iter__(self) -> Iterator[Tuple[int, float, np.ndarray]]:
+        self._thread.start()
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    return
+                yield item
+        finally:
+            self.close()
+
+    def close(self):
+        self._stop.set()
+
+
+class FrameSink:
+    """AlertWriter stand-in for offline runs.
+
+    Never touches the database; alert frames are written to ``frames_dir``
+    when given (named after the file and frame index), otherwise dropped.
+    """
+
+    def __init__(self, frames_dir: Optional[str] = None, prefix: str = "alert"):
+        self.frames_dir = frames_dir
+        self.prefix = prefix
+        self.frame_index = 0
+
+    def submit(self, alert, frame: np.ndarray) -> bool:
+        if self.frames_dir is None:
+            alert.frame_path = None
+            return True
+        alert.frame_path = os.path.join(
+            self.frames_dir, f"{self.prefix}_{self.frame_index:07d}_{alert.alert_type}.jpg")
+        save_alert_frame(frame, frame_path=alert.frame_path)
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        return True
+
+
+def offline_config(config: Optional[DetectionConfig] = None, known_time: bool = False,
+                   night: bool = False, every_frame: bool = False) -> DetectionConfig:
+    """Config for offline runs.
+
+    Without a known recording time (``known_time``) the night-time rules
+    cannot be evaluated, so they are disabled unless ``night`` forces them
+    on for the whole file. ``every_frame`` runs every stage on every frame
+    instead of at the live stage rates. The wall-time share limit is always
+    dropped: against the video clock it would slow analysis to real time.
+    A given config is copied, never modified.
+    """
+    config = copy.copy(config) if config else DetectionConfig()
+    if night:
+        config.night_start_hour, config.night_end_hour = 0, 24
+    elif not known_time:
+        config.night_start_hour, config.night_end_hour = 24, 0
+    if every_frame:
+        config.stage_rates = {'faces': None, 'hands': None}
+        config.idle_stage_rates = {}
+        config.motion_gate_enabled = False
+    config.stage_max_share = None
+    return config
+
+
+def analyze_video(path: str, config: Optional[DetectionConfig] = None,
+                  start_time: Optional[datetime] = None, frames_dir: Optional[str] = None,
+                  prefetch: int = 32, max_frames: Optional[int] = None) -> Tuple[List[dict], dict]:
+    """Run SafetyDetector over one file; returns (alert records, stats).
+
+    ``start_time`` is the wall time of the first frame; when set, alerts get
+    an absolute timestamp and night-time rules use the recording time.
+    """
+    from .detector import SafetyDetector
+
+    config = config if config else offline_config(known_time=start_time is not None)
+    clock = VideoClock()
+    name = os.path.basename(path)
+    sink = FrameSink(frames_dir, prefix=os.path.splitext(name)[0])
+    if frames_dir:
+        os.makedirs(frames_dir, exist_ok=True)
+    detector = SafetyDetector(config, camera_id=name, alert_writer=sink,
+                              clock=clock, time_origin=start_time)
+
+    records = []
+    frames = 0
+    started = time.perf_counter()
+    try:
+        for index, seconds, frame in FramePrefetcher(path, prefetch):
+            if max_frames is not None and index >= max_frames:
+                break
+            clock.now = seconds
+            sink.frame_index = index
+            _, alert = detector.process_frame(frame, annotate=False)
+            frames += 1
+            if alert is None:
+                continue
+            records.append({
+                'file': path,
+                'frame_index': index,
+                'video_time': round(seconds, 3),
+                'timestamp': alert.timestamp.isoformat() if start_time is not None else None,
+                'alert_type': alert.alert_type,
+                'gesture': alert.gesture,
+                'male_count': alert.male_count,
+                'female_count': alert.female_count,
+                'camera_id': alert.camera_id,
+                'frame_path': alert.frame_path
+            })
+    finally:
+        detector.release()
+    elapsed = time.perf_counter() - started
+    stats = {
+        'file': path,
+        'frames': frames,
+        'duration': round(clock.now, 3),
+        'elapsed': round(elapsed, 3),
+        'fps': round(frames / elapsed, 1) if elapsed > 0 else 0.0,
+        'alerts': len(records),
+        'motion': detector.gate_stats()
+    }
+    return records, stats
+
+
+def _analyze_job(job):
+    return analyze_video(*job)
+
+
+def analyze_videos(paths: List[str], config: Optional[DetectionConfig] = None,
+                   start_times: Optional[List[Optional[datetime]]] = None, workers: int = 1,
+                   frames_dir: Optional[str] = None, prefetch: int = 32,
+                   max_frames: Optional[int] = None) -> Iterator[Tuple[List[dict], dict]]:
+    """Analyze several files, one per worker process; yields results in input order"""
+    start_times = start_times or [None] * len(paths)
+    jobs = [(path, config, start, frames_dir, prefetch, max_frames)
+            for path, start in zip(paths, start_times)]
+    if workers <= 1 or len(jobs) <= 1:
+        for job in jobs:
+            yield _analyze_job(job)
+        return
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        yield from pool.map(_analyze_job, jobs)
+
+
+def write_report(records: List[dict], path: str):
+    """Write alert records as JSON Lines, or Parquet for a .parquet path"""
+    if path.endswith('.parquet'):
+        try:
+            import pandas as pd
+            pd.DataFrame(records, columns=list(REPORT_FIELDS)).to_parquet(path, index=False)
+        except ImportError as e:
+            raise RuntimeError(f"Parquet reports need pandas and pyarrow installed ({e})") from e
+        return
+    with open(path, 'w') as f:
+        for record in records:
+            f.write(json.dumps(record) + '\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('videos', nargs='+', help='recorded video files')
+    parser.add_argument('--report', default='alerts.jsonl', help='.jsonl or .parquet output')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='files analyzed in parallel (one process each)')
+    parser.add_argument('--start-time', action='append',
+                        help='ISO time of the first frame; once for all files or once per file')
+    parser.add_argument('--night', action='store_true',
+                        help='apply night-time rules throughout (when no start time is known)')
+    parser.add_argument('--every-frame', action='store_true',
+                        help='run every stage on every frame instead of the live stage rates')
+    parser.add_argument('--frames-dir', help='save alert frames here')
+    parser.add_argument('--prefetch', type=int, default=32, help='decoded frames buffered per file')
+    parser.add_argument('--max-frames', type=int, help='stop each file after this many frames')
+    args = parser.parse_args(argv)
+
+    start_times = [None] * len(args.videos)
+    if args.start_time:
+        if len(args.start_time) not in (1, len(args.videos)):
+            parser.error("give --start-time once, or once per video")
+        parsed = [datetime.fromisoformat(value) for value in args.start_time]
+        start_times = parsed * len(args.videos) if len(parsed) == 1 else parsed
+    config = offline_config(known_time=bool(args.start_time), night=args.night,
+                            every_frame=args.every_frame)
+
+    records = []
+    for file_records, stats in analyze_videos(args.videos, config, start_times, args.workers,
+                                              args.frames_dir, args.prefetch, args.max_frames):
+        records.extend(file_records)
+        print(f"{stats['file']}: {stats['frames']} frames ({stats['duration']:.1f}s of video) "
+              f"in {stats['elapsed']:.1f}s, {stats['fps']} fps, {stats['alerts']} alerts")
+    write_report(records, args.report)
+    print(f"Wrote {len(records)} alerts to {args.report}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
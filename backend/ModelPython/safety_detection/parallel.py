@@ -0,0 +1,346 @@
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from .models import DetectionConfig
+
+# Seconds between worker liveness checks, however busy the result queue is
+WORKER_CHECK_INTERVAL = 1.0
+# Task queue message telling a worker to close its attachment to a destroyed block
+DETACH = 'detach'
+
+
+def _worker_main(config: DetectionConfig, task_queue, result_queue):
+    """Worker process loop.
+
+    Each worker owns its own ``SafetyDetector`` (MediaPipe Hands, Caffe gender
+    net, face cascade), loaded and warmed before the first task; model files
+    the parent already read are inherited when workers are forked. Frames
+    arrive as shared memory block names and are
+    analyzed in place, up to ``config.batch_frames`` at a time; only the
+    small analysis dicts are pickled back. A ``(DETACH, name)`` message
+    closes the attachment to a block the parent has destroyed.
+    """
+    from .detector import SafetyDetector
+    from .model_registry import shared_registry
+
+    shared_registry().warm(config)
+    detector = SafetyDetector(config)
+    detector.ensure_models()
+    attached: Dict[str, shared_memory.SharedMemory] = {}
+    try:
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break
+            # Drain whatever else is already queued (often other cameras pinned
+            # to this worker) so their faces share one gender forward pass
+            tasks, detach = [], []
+            (detach if task[0] == DETACH else tasks).append(task)
+            stop = False
+            while len(tasks) < max(1, config.batch_frames):
+                try:
+                    extra = task_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if extra is None:
+                    stop = True
+                    break
+                (detach if extra[0] == DETACH else tasks).append(extra)
+
+            frames = []
+            for task_id, stream_id, stages, hand_roi, shm_name, shape, dtype in tasks:
+                shm = attached.get(shm_name)
+                if shm is None:
+                    shm = shared_memory.SharedMemory(name=shm_name)
+                    attached[shm_name] = shm
+                frames.append(np.ndarray(shape, dtype=dtype, buffer=shm.buf))
+            try:
+                analyses = detector.analyze_batch(
+                    frames, [task[1] for task in tasks], [task[2] for task in tasks],
+                    [task[3] for task in tasks]
+                ) if tasks else []
+                for (task_id, *_), analysis in zip(tasks, analyses):
+                    result_queue.put((task_id, analysis, None))
+            except Exception as e:
+                for task_id, *_ in tasks:
+                    result_queue.put((task_id, None, f"{type(e).__name__}: {e}"))
+            del frames
+            # Only after the frame views are gone can the blocks be closed
+            for _, shm_name in detach:
+                shm = attached.pop(shm_name, None)
+                if shm is not None:
+                    shm.close()
+            if stop:
+                break
+    finally:
+        detector.release()
+        for shm in attached.values():
+            shm.close()
+
+
+class _SharedFramePool:
+    """Fixed number of reusable shared memory blocks for frames in flight.
+
+    ``on_destroy`` is called with the name of each block the pool unlinks
+    so processes attached to it can close their mappings.
+    """
+
+    def __init__(self, max_slots: int, on_destroy: Optional[Callable[[str], None]] = None):
+        self.max_slots = max_slots
+        self.on_destroy = on_destroy
+        self._cond = threading.Condition()
+        self._free: List[shared_memory.SharedMemory] = []
+        self._allocated = 0
+
+    def acquire(self, nbytes: int) -> shared_memory.SharedMemory:
+        """Return a block of at least nbytes, waiting while all slots are in use"""
+        with self._cond:
+            while True:
+                for i, shm in enumerate(self._free):
+                    if shm.size >= nbytes:
+                        return self._free.pop(i)
+                if self._allocated < self.max_slots:
+                    self._allocated += 1
+                    break
+                if self._free:
+                    # Every free block is too small (resolution changed); replace one
+                    self._destroy(self._free.pop())
+                    self._allocated -= 1
+                    continue
+                self._cond.wait()
+        try:
+            return shared_memory.SharedMemory(create=True, size=nbytes)
+        except Exception:
+            with self._cond:
+                self._allocated -= 1
+                self._cond.notify()
+            raise
+
+    def release(self, shm: shared_memory.SharedMemory):
+        with self._cond:
+            self._free.append(shm)
+            self._cond.notify()
+
+    def _destroy(self, shm: shared_memory.SharedMemory):
+        shm.close()
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+        if self.on_destroy is not None:
+            self.on_destroy(shm.name)
+
+    def close(self):
+        with self._cond:
+            for shm in self._free:
+                self._destroy(shm)
+            self._free = []
+
+
+class _StreamState:
+    def __init__(self):
+        self.next_seq = 0
+        self.next_to_resolve = 0
+        self.futures: Dict[int, Future] = {}
+        self.done: Dict[int, tuple] = {}
+
+
+class ProcessInferenceBackend:
+    """Runs ``SafetyDetector.analyze`` in a pool of worker processes.
+
+    Frames are copied once into shared memory slots instead of being pickled.
+    Futures returned by ``submit`` for the same stream resolve in submission
+    order. With ``sticky=True`` (default) each stream is pinned to one worker
+    so MediaPipe's hand tracking sees consecutive frames; parallelism then
+    comes from running several streams at once. ``sticky=False`` spreads the
+    frames of a single stream over every worker.
+
+    Workers start lazily on the first ``submit`` so importing a module that
+    builds a backend never forks or spawns processes.
+    """
+
+    def __init__(self, config: Optional[DetectionConfig] = None, workers: Optional[int] = None,
+                 sticky: bool = True, max_in_flight: Optional[int] = None,
+                 start_method: Optional[str] = None):
+        self.config = config if config else DetectionConfig()
+        self.workers = workers or self.config.process_workers or os.cpu_count() or 1
+        self.sticky = sticky
+        self.max_in_flight = max_in_flight or self.workers * 2
+        self._ctx = multiprocessing.get_context(start_method)
+
+        self._lock = threading.Lock()
+        self._slots = _SharedFramePool(self.max_in_flight, on_destroy=self._detach_workers)
+        self._task_ids = itertools.count()
+        self._processes: List = []
+        self._task_queues: List = []
+        self._result_queue = None
+        self._collector: Optional[threading.Thread] = None
+        self._started = False
+        self._closed = False
+
+        self._pending: Dict[int, tuple] = {}  # task_id -> (stream_id, seq, shm, worker)
+        self._streams: Dict[Hashable, _StreamState] = {}
+        self._affinity: Dict[Hashable, int] = {}
+        self._load: List[int] = [0] * self.workers
+
+    def start(self):
+        """Spawn the worker processes and the result collector thread"""
+        with self._lock:
+            if self._started:
+                return
+            if self._closed:
+                raise RuntimeError("ProcessInferenceBackend is closed")
+            if os.name == 'posix':
+                # Share one tracker with the workers so they never unlink our blocks
+                from multiprocessing import resource_tracker
+                resource_tracker.ensure_running()
+            self._result_queue = self._ctx.Queue()
+            for index in range(self.workers):
+                self._task_queues.append(self._ctx.Queue())
+                self._processes.append(self._spawn(index))
+            self._collector = threading.Thread(
+                target=self._collect, name="ProcessInferenceBackend-collector", daemon=True
+            )
+            self._started = True
+            self._collector.start()
+
+    def _spawn(self, index: int):
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(self.config, self._task_queues[index], self._result_queue),
+            name=f"inference-worker-{index}",
+            daemon=True
+        )
+        process.start()
+        return process
+
+    def _detach_workers(self, shm_name: str):
+        # Any worker may have attached the block (sticky=False spreads
+        # streams); runs under the pool lock, so no backend lock here
+        if self._closed:
+            return
+        for task_queue in list(self._task_queues):
+            task_queue.put((DETACH, shm_name))
+
+    def _pick_worker(self, stream_id: Hashable) -> int:
+        if self.sticky:
+            worker = self._affinity.get(stream_id)
+            if worker is None:
+                assigned = [0] * self.workers
+                for w in self._affinity.values():
+                    assigned[w] += 1
+                worker = min(range(self.workers), key=lambda w: (assigned[w], self._load[w]))
+                self._affinity[stream_id] = worker
+            return worker
+        return min(range(self.workers), key=lambda w: self._load[w])
+
+    def submit(self, stream_id: Hashable, frame: np.ndarray,
+               stages: Optional[Tuple[str, ...]] = None, hand_roi=None) -> Future:
+        """Queue a frame for analysis; the future resolves to the analysis dict"""
+        self.start()
+        frame = np.ascontiguousarray(frame)
+        shm = self._slots.acquire(frame.nbytes)
+        np.ndarray(frame.shape, dtype=frame.dtype, buffer=shm.buf)[...] = frame
+
+        future = Future()
+        with self._lock:
+            if self._closed:
+                self._slots.release(shm)
+                raise RuntimeError("ProcessInferenceBackend is closed")
+            stream = self._streams.setdefault(stream_id, _StreamState())
+            seq = stream.next_seq
+            stream.next_seq += 1
+            stream.futures[seq] = future
+            worker = self._pick_worker(stream_id)
+            task_id = next(self._task_ids)
+            self._pending[task_id] = (stream_id, seq, shm, worker)
+            self._load[worker] += 1
+            task_queue = self._task_queues[worker]
+        task_queue.put((task_id, stream_id, stages, hand_roi, shm.name, frame.shape, frame.dtype.str))
+        return future
+
+    def analyze(self, stream_id: Hashable, frame: np.ndarray,
+                stages: Optional[Tuple[str, ...]] = None, timeout: Optional[float] = None,
+                hand_roi=None) -> dict:
+        """Blocking helper: submit a frame and wait for its analysis"""
+        return self.submit(stream_id, frame, stages, hand_roi).result(timeout)
+
+    def _complete(self, task_id: int, analysis, error: Optional[str]):
+        with self._lock:
+            pending = self._pending.pop(task_id, None)
+            if pending is None:
+                return
+            stream_id, seq, shm, worker = pending
+            self._load[worker] -= 1
+            stream = self._streams[stream_id]
+            stream.done[seq] = (analysis, error)
+            # Resolve futures strictly in frame order
+            ready = []
+            while stream.next_to_resolve in stream.done:
+                n = stream.next_to_resolve
+                ready.append((stream.futures.pop(n), stream.done.pop(n)))
+                stream.next_to_resolve += 1
+        self._slots.release(shm)
+        for future, (result, err) in ready:
+            if err is None:
+                future.set_result(result)
+            else:
+                future.set_exception(RuntimeError(f"Inference worker failed: {err}"))
+
+    def _check_workers(self):
+        """Fail tasks owned by crashed workers and respawn them"""
+        for index, process in enumerate(list(self._processes)):
+            if process.is_alive() or self._closed:
+                continue
+            print(f"Inference worker {index} exited with code {process.exitcode}; restarting")
+            with self._lock:
+                lost = [t for t, p in self._pending.items() if p[3] == index]
+                self._task_queues[index] = self._ctx.Queue()
+            for task_id in lost:
+                self._complete(task_id, None, f"worker {index} exited")
+            self._processes[index] = self._spawn(index)
+
+    def _collect(self):
+        # Liveness is checked on a deadline, not only when the queue goes
+        # quiet: other workers' results must not hide a crashed one
+        next_check = time.monotonic() + WORKER_CHECK_INTERVAL
+        while not self._closed:
+            try:
+                result = self._result_queue.get(timeout=max(0.0, next_check - time.monotonic()))
+            except queue.Empty:
+                result = None
+            except (EOFError, OSError):
+                break
+            if result is not None:
+                self._complete(*result)
+            if time.monotonic() >= next_check:
+                self._check_workers()
+                next_check = time.monotonic() + WORKER_CHECK_INTERVAL
+
+    def close(self, timeout: float = 5.0):
+        """Stop the workers, fail outstanding futures and free shared memory"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            started = self._started
+        if started:
+            for task_queue in self._task_queues:
+                task_queue.put(None)
+            for process in self._processes:
+                process.join(timeout)
+                if process.is_alive():
+                    process.terminate()
+            self._collector.join(timeout)
+        for task_id in list(self._pending):
+            self._complete(task_id, None, "backend closed")
+        self._slots.close()
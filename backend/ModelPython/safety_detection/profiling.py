@@ -0,0 +1,134 @@
+import cProfile
+import io
+import pstats
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+try:
+    import pyinstrument
+except ImportError:
+    pyinstrument = None
+
+PROFILE_MODES = ('cprofile', 'pyinstrument')
+
+
+class ProfileCapture:
+    """Profile frame processing for a bounded time window, on demand.
+
+    While a capture is running, every call made through ``run`` is
+    profiled by a profiler owned by the calling thread (profilers are per
+    thread); when the window ends the per-thread results are merged into
+    one text report. Outside a window ``run`` is a plain call, so leaving
+    the hook in place costs one attribute check per frame.
+
+    ``mode`` is 'cprofile' (standard library) or 'pyinstrument' (if
+    installed; its per-thread reports are concatenated).
+    """
+
+    def __init__(self, max_seconds: float = 120.0, clock: Callable[[], float] = time.monotonic):
+        self.max_seconds = max_seconds
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._deadline: Optional[float] = None
+        self._mode: Optional[str] = None
+        self._profilers: Dict[int, object] = {}
+        self._started_at: Optional[float] = None
+        self.report: Optional[str] = None
+        self.last_capture: Optional[dict] = None
+
+    @property
+    def active(self) -> bool:
+        return self._deadline is not None
+
+    def start(self, seconds: float, mode: str = 'cprofile') -> dict:
+        """Begin a capture window; raises ValueError for bad arguments or one already running"""
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"mode must be one of {', '.join(PROFILE_MODES)}")
+        if mode == 'pyinstrument' and pyinstrument is None:
+            raise ValueError("pyinstrument is not installed")
+        if not 0 < seconds <= self.max_seconds:
+            raise ValueError(f"seconds must be in (0, {self.max_seconds}]")
+        with self._lock:
+            if self._deadline is not None:
+                raise ValueError("A profile capture is already running")
+            self._mode = mode
+            self._profilers = {}
+            self._started_at = self.clock()
+            self._deadline = self._started_at + seconds
+            self.report = None
+        return self.status()
+
+    def run(self, func: Callable, *args, **kwargs):
+        """Call func, profiling it if a capture window is open"""
+        if self._deadline is None:
+            return func(*args, **kwargs)
+        if self.clock() >= self._deadline:
+            self.finish()
+            return func(*args, **kwargs)
+        profiler = self._profiler()
+        if profiler is None:
+            return func(*args, **kwargs)
+        if self._mode == 'cprofile':
+            return profiler.runcall(func, *args, **kwargs)
+        profiler.start()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.stop()
+
+    def _profiler(self):
+        ident = threading.get_ident()
+        with self._lock:
+            if self._deadline is None:
+                return None
+            profiler = self._profilers.get(ident)
+            if profiler is None:
+                if self._mode == 'cprofile':
+                    profiler = cProfile.Profile()
+                else:
+                    profiler = pyinstrument.Profiler()
+                self._profilers[ident] = profiler
+            return profiler
+
+    def finish(self) -> Optional[str]:
+        """Close the current window (if any) and build its report"""
+        with self._lock:
+            if self._deadline is None:
+                return self.report
+            profilers, mode, started = list(self._profilers.values()), self._mode, self._started_at
+            self._deadline = None
+            self._profilers = {}
+        if not profilers:
+            report = "No frames were processed during the capture window\n"
+        elif mode == 'cprofile':
+            out = io.StringIO()
+            stats = pstats.Stats(profilers[0], stream=out)
+            for profiler in profilers[1:]:
+                stats.add(profiler)
+            stats.sort_stats('cumulative').print_stats(60)
+            report = out.getvalue()
+        else:
+            report = '\n'.join(p.output_text(unicode=False, color=False) for p in profilers)
+        with self._lock:
+            self.report = report
+            self.last_capture = {
+                'mode': mode,
+                'seconds': round(self.clock() - started, 2),
+                'threads': len(profilers)
+            }
+        return report
+
+    def status(self) -> dict:
+        if self._deadline is not None and self.clock() >= self._deadline:
+            self.finish()
+        with self._lock:
+            return {
+                'active': self._deadline is not None,
+                'mode': self._mode,
+                'remaining_seconds': round(max(0.0, self._deadline - self.clock()), 2)
+                if self._deadline is not None else 0.0,
+                'last_capture': self.last_capture,
+                'report_ready': self.report is not None,
+                'pyinstrument_available': pyinstrument is not None
+            }
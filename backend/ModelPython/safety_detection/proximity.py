@@ -0,0 +1,139 @@
+import math
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+Box = Tuple[int, int, int, int]
+
+# Female x male pairs from which the grid index is used instead of the
+# dense matrices (dense is faster up to ~1000 faces, see bench_proximity)
+GRID_MIN_PAIRS = 500_000
+
+
+class SurroundRule:
+    """When a woman counts as surrounded.
+
+    Distances are between face centres in units of face size (the mean
+    of the two faces' sqrt(w*h)), so the same rule holds at any
+    resolution and distance from the camera. A man is near when he is
+    within ``radius`` face sizes and his face is at most
+    ``max_size_ratio`` times larger or smaller (a much smaller face is
+    further away, not next to her). She is surrounded when at least
+    ``min_males`` men are near and they occupy at least ``min_sides`` of
+    ``sectors`` equal angular sectors around her (4 sectors: left, right,
+    above, below).
+    """
+
+    def __init__(self, radius: float = 2.5, min_males: int = 1, min_sides: int = 1,
+                 sectors: int = 4, max_size_ratio: float = 2.0):
+        self.radius = radius
+        self.min_males = min_males
+        self.min_sides = min_sides
+        self.sectors = sectors
+        self.max_size_ratio = max_size_ratio
+
+
+def face_geometry(boxes: Sequence[Box]) -> Tuple[np.ndarray, np.ndarray]:
+    """(N x 2) box centres and (N,) face sizes sqrt(w*h) for (x, y, w, h) boxes"""
+    boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+    centres = boxes[:, :2] + boxes[:, 2:] / 2
+    sizes = np.sqrt(np.maximum(boxes[:, 2] * boxes[:, 3], 1.0))
+    return centres, sizes
+
+
+def _near(f_centres, f_sizes, m_centres, m_sizes, rule: SurroundRule):
+    """Near mask and offsets (female rows x male columns)"""
+    offsets = m_centres[None, :, :] - f_centres[:, None, :]
+    scale = (f_sizes[:, None] + m_sizes[None, :]) / 2
+    distance = np.hypot(offsets[..., 0], offsets[..., 1]) / scale
+    ratio = np.maximum(f_sizes[:, None], m_sizes[None, :]) / np.minimum(f_sizes[:, None], m_sizes[None, :])
+    return (distance <= rule.radius) & (ratio <= rule.max_size_ratio), offsets
+
+
+def _sides(offsets: np.ndarray, sectors: int) -> np.ndarray:
+    """Sector index of each (dx, dy) offset; sector 0 is centred on the right"""
+    angle = np.arctan2(offsets[..., 1], offsets[..., 0]) + math.pi / sectors
+    return np.floor(angle / (2 * math.pi / sectors)).astype(np.int64) % sectors
+
+
+def _judge(near: np.ndarray, offsets: np.ndarray, rule: SurroundRule) -> np.ndarray:
+    """Surrounded flag per female row of a near mask and its offsets"""
+    surrounded = near.sum(axis=1) >= rule.min_males
+    if rule.min_sides > 1:
+        sides = _sides(offsets, rule.sectors)
+        occupied = sum((near & (sides == side)).any(axis=1) for side in range(rule.sectors))
+        surrounded &= occupied >= rule.min_sides
+    return surrounded
+
+
+def _grid_candidates(f_centres, f_sizes, m_centres, m_sizes, rule: SurroundRule) -> List[np.ndarray]:
+    """Male indices in the grid cells each female's search radius overlaps"""
+    # The widest pixel radius a near man can be at: his face is at most
+    # max_size_ratio times hers, so the pair scale is bounded by hers
+    reach = rule.radius * f_sizes * (1 + rule.max_size_ratio) / 2
+    cell = max(float(np.median(reach)), 1.0)
+    cells = np.floor(m_centres / cell).astype(np.int64)
+    order = np.lexsort((cells[:, 1], cells[:, 0]))
+    keys, starts, counts = np.unique(cells[order], axis=0, return_index=True, return_counts=True)
+    index = {(int(cx), int(cy)): order[s:s + n] for (cx, cy), s, n in zip(keys, starts, counts)}
+
+    candidates = []
+    lo = np.floor((f_centres - reach[:, None]) / cell).astype(np.int64)
+    hi = np.floor((f_centres + reach[:, None]) / cell).astype(np.int64)
+    for (x0, y0), (x1, y1) in zip(lo, hi):
+        found = [index[(cx, cy)] for cx in range(x0, x1 + 1) for cy in range(y0, y1 + 1)
+                 if (cx, cy) in index]
+        candidates.append(np.concatenate(found) if found else np.zeros(0, dtype=np.int64))
+    return candidates
+
+
+def near_males(female_boxes: Sequence[Box], male_boxes: Sequence[Box], rule: SurroundRule,
+               grid_min_pairs: int = GRID_MIN_PAIRS) -> List[np.ndarray]:
+    """Indices of the men near each woman under rule.
+
+    Small frames are checked as one dense (women x men) NumPy computation;
+    from ``grid_min_pairs`` pairs on, men are bucketed into a uniform grid
+    and each woman is only compared with the men in the cells her search
+    radius overlaps. Both give the same result.
+    """
+    if not len(female_boxes):
+        return []
+    if not len(male_boxes):
+        return [np.zeros(0, dtype=np.int64) for _ in female_boxes]
+    f_centres, f_sizes = face_geometry(female_boxes)
+    m_centres, m_sizes = face_geometry(male_boxes)
+
+    if len(f_centres) * len(m_centres) < grid_min_pairs:
+        near, _ = _near(f_centres, f_sizes, m_centres, m_sizes, rule)
+        return [np.flatnonzero(row) for row in near]
+
+    result = []
+    for i, candidates in enumerate(_grid_candidates(f_centres, f_sizes, m_centres, m_sizes, rule)):
+        if not len(candidates):
+            result.append(candidates)
+            continue
+        near, _ = _near(f_centres[i:i + 1], f_sizes[i:i + 1], m_centres[candidates], m_sizes[candidates], rule)
+        result.append(np.sort(candidates[near[0]]))
+    return result
+
+
+def surrounded_females(female_boxes: Sequence[Box], male_boxes: Sequence[Box], rule: SurroundRule,
+                       grid_min_pairs: int = GRID_MIN_PAIRS) -> List[int]:
+    """Indices of the women who are surrounded under rule (see near_males for the two paths)"""
+    if len(female_boxes) == 0 or len(male_boxes) < rule.min_males:
+        return []
+    f_centres, f_sizes = face_geometry(female_boxes)
+    m_centres, m_sizes = face_geometry(male_boxes)
+    if len(f_centres) * len(m_centres) < grid_min_pairs:
+        near, offsets = _near(f_centres, f_sizes, m_centres, m_sizes, rule)
+        return np.flatnonzero(_judge(near, offsets, rule)).tolist()
+
+    surrounded = []
+    for i, candidates in enumerate(_grid_candidates(f_centres, f_sizes, m_centres, m_sizes, rule)):
+        if len(candidates) < rule.min_males:
+            continue
+        near, offsets = _near(f_centres[i:i + 1], f_sizes[i:i + 1], m_centres[candidates],
+                              m_sizes[candidates], rule)
+        if _judge(near, offsets, rule)[0]:
+            surrounded.append(i)
+    return surrounded
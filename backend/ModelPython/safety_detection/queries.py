@@ -0,0 +1,164 @@
+import base64
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+import pytz
+from sqlalchemy import and_, or_
+
+from .db import db
+from .models import Alert
+
+ALERT_FIELDS = (
+    'id', 'alert_type', 'timestamp', 'latitude', 'longitude', 'frame_path',
+    'male_count', 'female_count', 'gesture', 'confidence', 'camera_id'
+)
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+ORDERS = ('newest', 'oldest')
+
+IST = pytz.timezone('Asia/Kolkata')
+
+
+def parse_time(value: str) -> datetime:
+    """Parse an ISO 8601 time; aware times are converted to IST, naive ones are IST.
+
+    Alert timestamps are stored as naive IST wall time, so comparisons must
+    use the same representation.
+    """
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(IST).replace(tzinfo=None)
+    return parsed
+
+
+def encode_cursor(timestamp: datetime, alert_id: int) -> str:
+    raw = f"{timestamp.isoformat()}|{alert_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of encode_cursor; raises ValueError on malformed input"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        timestamp, alert_id = base64.urlsafe_b64decode(padded).decode().split('|')
+        return datetime.fromisoformat(timestamp), int(alert_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def parse_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """Validate a comma-separated projection; id and timestamp are always included"""
+    if not fields:
+        return ALERT_FIELDS
+    requested = [f.strip() for f in fields.split(',') if f.strip()]
+    unknown = [f for f in requested if f not in ALERT_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return tuple(f for f in ALERT_FIELDS if f in requested or f in ('id', 'timestamp'))
+
+
+def _split(value: Optional[str]) -> List[str]:
+    return [v.strip() for v in value.split(',') if v.strip()] if value else []
+
+
+def query_alerts(limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+                 alert_types: Iterable[str] = (), gestures: Iterable[str] = (),
+                 camera_ids: Iterable[str] = (), since: Optional[datetime] = None,
+                 until: Optional[datetime] = None, search: Optional[str] = None,
+                 order: str = 'newest', fields: Tuple[str, ...] = ALERT_FIELDS,
+                 session=None) -> Tuple[List[dict], Optional[str]]:
+    """One page of alerts, newest (or ``order='oldest'``) first, using keyset pagination.
+
+    Pages are anchored on (timestamp, id) so each page is an index range
+    scan regardless of how deep it is. Only the requested columns are
+    selected and rows are serialized without building ORM objects.
+    ``search`` matches a case-insensitive substring of the alert type or
+    gesture, or the exact id when it is a number.
+    Returns (items, next_cursor); next_cursor is None on the last page.
+    Runs on ``session`` (e.g. a db.read_session) or ``db.session``.
+    """
+    if order not in ORDERS:
+        raise ValueError(f"order must be one of: {', '.join(ORDERS)}")
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+    columns = [getattr(Alert, f) for f in fields]
+    query = (session or db.session).query(*columns)
+
+    alert_types, gestures, camera_ids = list(alert_types), list(gestures), list(camera_ids)
+    if alert_types:
+        query = query.filter(Alert.alert_type.in_(alert_types))
+    if gestures:
+        query = query.filter(Alert.gesture.in_(gestures))
+    if camera_ids:
+        query = query.filter(Alert.camera_id.in_(camera_ids))
+    if since is not None:
+        query = query.filter(Alert.timestamp >= since)
+    if until is not None:
+        query = query.filter(Alert.timestamp < until)
+    search = search.strip() if search else ''
+    if search:
+        pattern = f"%{search}%"
+        matches = [Alert.alert_type.ilike(pattern), Alert.gesture.ilike(pattern)]
+        if search.isdigit():
+            matches.append(Alert.id == int(search))
+        query = query.filter(or_(*matches))
+    if cursor:
+        cursor_time, cursor_id = decode_cursor(cursor)
+        if order == 'newest':
+            query = query.filter(or_(
+                Alert.timestamp < cursor_time,
+                and_(Alert.timestamp == cursor_time, Alert.id < cursor_id)
+            ))
+        else:
+            query = query.filter(or_(
+                Alert.timestamp > cursor_time,
+                and_(Alert.timestamp == cursor_time, Alert.id > cursor_id)
+            ))
+
+    if order == 'newest':
+        query = query.order_by(Alert.timestamp.desc(), Alert.id.desc())
+    else:
+        query = query.order_by(Alert.timestamp.asc(), Alert.id.asc())
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    items = []
+    for row in rows:
+        item = dict(zip(fields, row))
+        if item.get('timestamp') is not None:
+            item['timestamp'] = item['timestamp'].isoformat()
+        items.append(item)
+
+    next_cursor = None
+    if has_more and rows:
+        last = dict(zip(fields, rows[-1]))
+        next_cursor = encode_cursor(last['timestamp'], last['id'])
+    return items, next_cursor
+
+
+def query_alerts_from_args(args, session=None) -> Tuple[List[dict], Optional[str]]:
+    """query_alerts driven by request query-string arguments.
+
+    Supported: limit, cursor, alert_type, gesture, camera_id (comma-separated
+    lists), since, until (ISO 8601), q (search), order (newest/oldest) and
+    fields (projection). Raises ValueError for malformed values.
+    """
+    try:
+        limit = int(args.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    since = args.get('since')
+    until = args.get('until')
+    return query_alerts(
+        limit=limit,
+        cursor=args.get('cursor'),
+        alert_types=_split(args.get('alert_type')),
+        gestures=_split(args.get('gesture')),
+        camera_ids=_split(args.get('camera_id')),
+        since=parse_time(since) if since else None,
+        until=parse_time(until) if until else None,
+        search=args.get('q'),
+        order=args.get('order', 'newest'),
+        fields=parse_fields(args.get('fields')),
+        session=session
+    )
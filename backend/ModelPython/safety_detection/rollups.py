@@ -0,0 +1,287 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import bindparam, case, func
+
+from .db import db
+from .models import Alert, AlertRollup, ist_now
+from .queries import IST, _split, parse_time
+
+ROLLUP_RESOLUTIONS = {'minute': timedelta(minutes=1), 'hour': timedelta(hours=1)}
+ROLLUP_GROUPS = ('alert_type', 'gesture', 'camera_id')
+# Largest number of buckets one time-series request may span
+MAX_BUCKETS = 10000
+# Range covered when a request gives no 'since'
+DEFAULT_SPAN = {'minute': timedelta(hours=1), 'hour': timedelta(days=1)}
+
+RollupKey = Tuple[str, datetime, str, str, str]
+ROLLUP_KEY = ('resolution', 'bucket', 'camera_id', 'alert_type', 'gesture')
+
+# Upsert statement per dialect name
+_upserts: Dict[str, object] = {}
+
+
+def _naive_ist(timestamp: datetime) -> datetime:
+    """Alert timestamps are compared as naive IST wall time (see queries.parse_time)"""
+    if timestamp.tzinfo is not None:
+        return timestamp.astimezone(IST).replace(tzinfo=None)
+    return timestamp
+
+
+def bucket_start(timestamp: datetime, resolution: str) -> datetime:
+    timestamp = _naive_ist(timestamp)
+    if resolution == 'hour':
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    return timestamp.replace(second=0, microsecond=0)
+
+
+def _deltas(alerts: Iterable) -> Dict[RollupKey, List[int]]:
+    """[count, peak male, peak female] per rollup key for a batch of alerts"""
+    deltas: Dict[RollupKey, List[int]] = defaultdict(lambda: [0, 0, 0])
+    for alert in alerts:
+        if alert.timestamp is None:
+            continue
+        for resolution in ROLLUP_RESOLUTIONS:
+            key = (resolution, bucket_start(alert.timestamp, resolution), alert.camera_id or '',
+                   alert.alert_type or '', alert.gesture or '')
+            delta = deltas[key]
+            delta[0] += 1
+            delta[1] = max(delta[1], alert.male_count or 0)
+            delta[2] = max(delta[2], alert.female_count or 0)
+    return deltas
+
+
+def _key_filter(key: RollupKey):
+    resolution, bucket, camera_id, alert_type, gesture = key
+    return (AlertRollup.resolution == resolution, AlertRollup.bucket == bucket,
+            AlertRollup.camera_id == camera_id, AlertRollup.alert_type == alert_type,
+            AlertRollup.gesture == gesture)
+
+
+def _bound_key_filter():
+    # Key columns matched against per-row parameters, for executemany
+    table = AlertRollup.__table__
+    return tuple(table.c[column] == bindparam(f'k_{column}') for column in ROLLUP_KEY)
+
+
+def _bound_key(key: RollupKey) -> dict:
+    return {f'k_{column}': value for column, value in zip(ROLLUP_KEY, key)}
+
+
+def _upsert_statement(dialect: str):
+    """INSERT ... ON CONFLICT DO UPDATE for a dialect, built once and run for many rows"""
+    statement = _upserts.get(dialect)
+    if statement is None:
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        table = AlertRollup.__table__
+        statement = insert(table)
+        new = statement.excluded
+        statement = _upserts[dialect] = statement.on_conflict_do_update(
+            index_elements=list(ROLLUP_KEY),
+            set_={
+                'count': table.c.count + new.count,
+                'peak_male': case((new.peak_male > table.c.peak_male, new.peak_male),
+                                  else_=table.c.peak_male),
+                'peak_female': case((new.peak_female > table.c.peak_female, new.peak_female),
+                                    else_=table.c.peak_female)
+            }
+        )
+    return statement
+
+
+def _merge(values: dict):
+    """Portable read-modify-write upsert for dialects without ON CONFLICT"""
+    row = AlertRollup.query.filter(*_key_filter(tuple(values[c] for c in ROLLUP_KEY))).first()
+    if row is None:
+        db.session.add(AlertRollup(**values))
+    else:
+        row.count += values['count']
+        row.peak_male = max(row.peak_male, values['peak_male'])
+        row.peak_female = max(row.peak_female, values['peak_female'])
+
+
+def record_alerts(alerts: Iterable):
+    """Add alerts to the rollups in the current transaction (the caller commits).
+
+    Accepts Alert rows or any objects with the same attributes. A batch is
+    applied as one multi-row upsert on SQLite and Postgres.
+    """
+    rows = [dict(zip(ROLLUP_KEY, key), count=count, peak_male=peak_male, peak_female=peak_female)
+            for key, (count, peak_male, peak_female) in _deltas(alerts).items()]
+    if not rows:
+        return
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        db.session.execute(_upsert_statement(dialect), rows)
+        return
+    for values in rows:
+        _merge(values)
+
+
+def forget_alerts(alerts: Iterable):
+    """Remove deleted alerts from the rollup counts (the caller commits).
+
+    Peaks are left as they were; a bucket whose count reaches zero is dropped.
+    """
+    deltas = _deltas(alerts)
+    if not deltas:
+        return
+    table = AlertRollup.__table__
+    db.session.execute(
+        table.update().where(*_bound_key_filter()).values(count=table.c.count - bindparam('k_delta')),
+        [dict(_bound_key(key), k_delta=count) for key, (count, _, _) in deltas.items()]
+    )
+    db.session.execute(table.delete().where(*_bound_key_filter(), table.c.count <= 0),
+                       [_bound_key(key) for key in deltas])
+
+
+def clear_rollups():
+    AlertRollup.query.delete(synchronize_session=False)
+
+
+def rebuild_rollups(batch_size: int = 5000) -> int:
+    """Recompute every rollup from the alert table; returns the alerts counted"""
+    clear_rollups()
+    counted = 0
+    columns = (Alert.timestamp, Alert.alert_type, Alert.gesture, Alert.camera_id,
+               Alert.male_count, Alert.female_count)
+    batch = []
+    for row in db.session.query(*columns).yield_per(batch_size):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            record_alerts(batch)
+            counted += len(batch)
+            batch = []
+    record_alerts(batch)
+    return counted + len(batch)
+
+
+def ensure_rollups():
+    """Backfill rollups for a database created before they existed. Must run in an app context."""
+    if AlertRollup.query.first() is None and Alert.query.first() is not None:
+        counted = rebuild_rollups()
+        db.session.commit()
+        print(f"Built alert rollups from {counted} existing alerts")
+
+
+def prune_rollups(resolution: str, before: datetime) -> int:
+    """Delete rollup buckets of one resolution that start before a time"""
+    return AlertRollup.query.filter(
+        AlertRollup.resolution == resolution, AlertRollup.bucket < _naive_ist(before)
+    ).delete(synchronize_session=False)
+
+
+def _filtered(query, resolution: str, since: Optional[datetime], until: Optional[datetime],
+              camera_ids: Iterable[str], alert_types: Iterable[str], gestures: Iterable[str]):
+    query = query.filter(AlertRollup.resolution == resolution)
+    if since is not None:
+        query = query.filter(AlertRollup.bucket >= bucket_start(since, resolution))
+    if until is not None:
+        query = query.filter(AlertRollup.bucket < _naive_ist(until))
+    camera_ids, alert_types, gestures = list(camera_ids), list(alert_types), list(gestures)
+    if camera_ids:
+        query = query.filter(AlertRollup.camera_id.in_(camera_ids))
+    if alert_types:
+        query = query.filter(AlertRollup.alert_type.in_(alert_types))
+    if gestures:
+        query = query.filter(AlertRollup.gesture.in_(gestures))
+    return query
+
+
+def alert_totals(since: Optional[datetime] = None, until: Optional[datetime] = None,
+                 camera_ids: Iterable[str] = (), alert_types: Iterable[str] = (),
+                 gestures: Iterable[str] = (), resolution: str = 'hour', session=None) -> dict:
+    """Alert count overall, per type and per gesture, from one resolution's rollups"""
+    camera_ids, alert_types, gestures = list(camera_ids), list(alert_types), list(gestures)
+    totals = {'total': 0, 'by_type': {}, 'by_gesture': {}}
+    for column, target in ((AlertRollup.alert_type, 'by_type'), (AlertRollup.gesture, 'by_gesture')):
+        query = (session or db.session).query(column, func.sum(AlertRollup.count))
+        query = _filtered(query, resolution, since, until, camera_ids, alert_types, gestures)
+        for value, count in query.group_by(column).all():
+            if column is AlertRollup.alert_type:
+                totals['total'] += int(count)
+            if value:
+                totals[target][value] = int(count)
+    return totals
+
+
+def alert_timeseries(resolution: str = 'hour', since: Optional[datetime] = None,
+                     until: Optional[datetime] = None, group_by: Optional[str] = None,
+                     camera_ids: Iterable[str] = (), alert_types: Iterable[str] = (),
+                     gestures: Iterable[str] = (), session=None) -> List[dict]:
+    """Alert counts and peak male/female counts per bucket, oldest first.
+
+    Only buckets with alerts are returned. With ``group_by`` (one of
+    ROLLUP_GROUPS) each bucket also carries per-value counts under
+    ``groups``; alerts without a gesture or camera are grouped under ''.
+    Reads only rollup rows, so the cost depends on the range, not on how
+    many alerts exist. Runs on ``session`` or ``db.session``.
+    """
+    if resolution not in ROLLUP_RESOLUTIONS:
+        raise ValueError(f"resolution must be one of {', '.join(ROLLUP_RESOLUTIONS)}")
+    if group_by is not None and group_by not in ROLLUP_GROUPS:
+        raise ValueError(f"group_by must be one of {', '.join(ROLLUP_GROUPS)}")
+    if since is not None and until is not None and \
+            (until - since) / ROLLUP_RESOLUTIONS[resolution] > MAX_BUCKETS:
+        raise ValueError(f"Range spans more than {MAX_BUCKETS} {resolution} buckets")
+
+    columns = [AlertRollup.bucket]
+    if group_by is not None:
+        columns.append(getattr(AlertRollup, group_by))
+    query = (session or db.session).query(*columns, func.sum(AlertRollup.count),
+                                          func.max(AlertRollup.peak_male), func.max(AlertRollup.peak_female))
+    query = _filtered(query, resolution, since, until, camera_ids, alert_types, gestures)
+    rows = query.group_by(*columns).order_by(AlertRollup.bucket).all()
+
+    buckets: Dict[datetime, dict] = {}
+    for row in rows:
+        bucket, count, peak_male, peak_female = row[0], int(row[-3]), row[-2], row[-1]
+        entry = buckets.get(bucket)
+        if entry is None:
+            entry = buckets[bucket] = {'bucket': bucket.isoformat(), 'count': 0,
+                                       'peak_male': 0, 'peak_female': 0}
+            if group_by is not None:
+                entry['groups'] = {}
+        entry['count'] += count
+        entry['peak_male'] = max(entry['peak_male'], peak_male or 0)
+        entry['peak_female'] = max(entry['peak_female'], peak_female or 0)
+        if group_by is not None:
+            entry['groups'][row[1]] = count
+    return list(buckets.values())
+
+
+def alert_stats_from_args(args, session=None) -> dict:
+    """Time series plus totals for request query-string arguments.
+
+    Supported: resolution (default 'hour'), since and until (ISO 8601;
+    default the last hour of minutes or day of hours up to now), group_by,
+    comma-separated alert_type, gesture and camera_id filters, and
+    buckets=0 for totals only (any range). Raises ValueError for malformed
+    values.
+    """
+    resolution = args.get('resolution', 'hour')
+    if resolution not in ROLLUP_RESOLUTIONS:
+        raise ValueError(f"resolution must be one of {', '.join(ROLLUP_RESOLUTIONS)}")
+    until = parse_time(args['until']) if args.get('until') else _naive_ist(ist_now())
+    since = parse_time(args['since']) if args.get('since') else until - DEFAULT_SPAN[resolution]
+    filters = {
+        'camera_ids': _split(args.get('camera_id')),
+        'alert_types': _split(args.get('alert_type')),
+        'gestures': _split(args.get('gesture'))
+    }
+    buckets = None
+    if args.get('buckets', '1') not in ('0', 'false'):
+        buckets = alert_timeseries(resolution, since, until, args.get('group_by'), session=session, **filters)
+    stats = {
+        'resolution': resolution,
+        'since': since.isoformat(),
+        'until': until.isoformat(),
+        'group_by': args.get('group_by'),
+        'buckets': buckets
+    }
+    stats.update(alert_totals(since, until, resolution=resolution, session=session, **filters))
+    return stats
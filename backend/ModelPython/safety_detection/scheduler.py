@@ -0,0 +1,82 @@
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+
+class StageScheduler:
+    """Decides which detection stages run on a given frame.
+
+    Each stage has a target rate in Hz (``None`` runs it on every frame) and
+    an optional lower rate used while the scene is idle. With ``max_share``
+    set, a stage is also spaced out so its measured run time never takes
+    more than that fraction of wall time, which adapts the rate to the
+    hardware. Achieved rates are measured over a sliding window.
+    """
+
+    def __init__(self, rates: Dict[str, Optional[float]],
+                 idle_rates: Optional[Dict[str, Optional[float]]] = None,
+                 max_share: Optional[float] = None, window: float = 5.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.rates = dict(rates)
+        self.idle_rates = dict(idle_rates or {})
+        self.max_share = max_share
+        self.window = window
+        self.clock = clock
+        self._last_run: Dict[str, float] = {}
+        self._duration: Dict[str, float] = {}
+        self._history: Dict[str, deque] = {stage: deque() for stage in self.rates}
+        self._skipped: Dict[str, int] = {stage: 0 for stage in self.rates}
+
+    def interval(self, stage: str, idle: bool = False) -> float:
+        """Minimum seconds between two runs of a stage"""
+        rate = self.rates.get(stage)
+        if idle and self.idle_rates.get(stage) is not None:
+            rate = self.idle_rates[stage] if rate is None else min(rate, self.idle_rates[stage])
+        interval = 1.0 / rate if rate else 0.0
+        if self.max_share and stage in self._duration:
+            interval = max(interval, self._duration[stage] / self.max_share)
+        return interval
+
+    def due(self, stage: str, idle: bool = False) -> bool:
+        """True if the stage should run now; counts a skip otherwise"""
+        last = self._last_run.get(stage)
+        # 5% slack so frame timing jitter does not push a stage to the next frame
+        if last is None or self.clock() - last >= self.interval(stage, idle) * 0.95:
+            return True
+        self._skipped[stage] = self._skipped.get(stage, 0) + 1
+        return False
+
+    def mark_run(self, stage: str, duration: Optional[float] = None):
+        """Record that a stage ran now, optionally with how long it took"""
+        now = self.clock()
+        self._last_run[stage] = now
+        history = self._history.setdefault(stage, deque())
+        history.append(now)
+        while history and now - history[0] > self.window:
+            history.popleft()
+        if duration is not None:
+            # Exponential moving average of the stage's run time
+            previous = self._duration.get(stage)
+            self._duration[stage] = duration if previous is None else 0.8 * previous + 0.2 * duration
+
+    def achieved_rate(self, stage: str) -> float:
+        history = self._history.get(stage)
+        if not history:
+            return 0.0
+        now = self.clock()
+        recent = [t for t in history if now - t <= self.window]
+        if len(recent) < 2:
+            return 0.0
+        return (len(recent) - 1) / max(recent[-1] - recent[0], 1e-6)
+
+    def stats(self) -> Dict[str, dict]:
+        return {
+            stage: {
+                'target_hz': self.rates.get(stage),
+                'idle_target_hz': self.idle_rates.get(stage),
+                'achieved_hz': round(self.achieved_rate(stage), 2),
+                'avg_duration_ms': round(self._duration[stage] * 1000, 2) if stage in self._duration else None,
+                'skipped': self._skipped.get(stage, 0)
+            }
+            for stage in self.rates
+        }
@@ -0,0 +1,286 @@
+import os
+import queue
+import threading
+import time
+from datetime import timedelta
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .db import db, read_session
+from .models import Alert as DBAlert
+from .models import ist_now
+from .rollups import forget_alerts, prune_rollups
+from .utils import save_alert_frame
+
+
+class FrameStore:
+    """Alert frame files on disk: writes, background removal and retention.
+
+    Frames are saved under ``root`` at the sharded paths built by
+    ``utils.alert_frame_path``. Deleting alerts only queues their files;
+    a single background thread unlinks them in batches (with their
+    thumbnails) and prunes emptied shard directories.
+
+    Every ``interval`` seconds the same thread compacts storage: alerts
+    older than ``retention_days`` and, while frames use more than
+    ``max_bytes``, the oldest alerts are deleted ``batch_size`` rows per
+    statement, and their files removed. Needs ``app`` for a database
+    context. Deletions made by the compactor are published as
+    ``alert_deleted`` events when an ``event_bus`` is given. Expired
+    alerts leave the rollup counts, and minute rollups older than
+    ``minute_rollup_days`` are pruned (hourly ones are kept).
+
+    The size limit applies to frames that alerts point at, since only
+    those can be freed by expiring alerts. Other files under ``root``
+    (orphans, e.g. left by a crash between saving a frame and committing
+    its alert) are counted separately and, with ``orphan_max_age`` set,
+    removed once older than that many seconds.
+    """
+
+    def __init__(self, root: str = "alert_frames", app=None, retention_days: Optional[float] = None,
+                 max_bytes: Optional[int] = None, interval: float = 300.0, batch_size: int = 500,
+                 thumbnails=None, event_bus=None, minute_rollup_days: float = 7.0,
+                 orphan_max_age: Optional[float] = None):
+        self.root = root
+        self.orphan_max_age = orphan_max_age
+        self.minute_rollup_days = minute_rollup_days
+        self.app = app
+        self.retention_days = retention_days
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self.batch_size = batch_size
+        self.thumbnails = thumbnails
+        self.event_bus = event_bus
+        self._queue: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+        # Footprint, rescanned by each compaction and kept current in between
+        self.files = 0
+        self.bytes = 0
+        self.orphan_files = 0
+        self.orphan_bytes = 0
+        self.scanned = False
+        # Counters
+        self.removed_files = 0
+        self.removed_bytes = 0
+        self.expired_alerts = 0
+        self.compactions = 0
+        self.last_compaction_ms = 0.0
+
+    def init_app(self, app):
+        self.app = app
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="FrameStore", daemon=True)
+            self._thread.start()
+
+    def save(self, frame: np.ndarray, frame_path: str) -> str:
+        save_alert_frame(frame, frame_path=frame_path)
+        size = os.path.getsize(frame_path)
+        with self._lock:
+            self.files += 1
+            self.bytes += size
+        return frame_path
+
+    def remove_async(self, frame_paths: Iterable[Optional[str]]):
+        """Queue frame files (and their thumbnails) for removal"""
+        paths = [p for p in frame_paths if p]
+        if not paths:
+            return
+        self.start()
+        self._queue.put(paths)
+
+    def _remove(self, frame_paths: List[str], orphans: bool = False):
+        """Delete frame files in batches; orphans come off the orphan counts instead"""
+        directories = set()
+        for i in range(0, len(frame_paths), self.batch_size):
+            removed = freed = 0
+            for path in frame_paths[i:i + self.batch_size]:
+                if self.thumbnails is not None:
+                    self.thumbnails.discard(path)
+                try:
+                    size = os.path.getsize(path)
+                    os.remove(path)
+                except FileNotFoundError:
+                    continue
+                except OSError as e:
+                    print(f"Error deleting image {path}: {e}")
+                    continue
+                removed += 1
+                freed += size
+                directories.add(os.path.dirname(path))
+            with self._lock:
+                if orphans:
+                    self.orphan_files = max(0, self.orphan_files - removed)
+                    self.orphan_bytes = max(0, self.orphan_bytes - freed)
+                else:
+                    self.files = max(0, self.files - removed)
+                    self.bytes = max(0, self.bytes - freed)
+                self.removed_files += removed
+                self.removed_bytes += freed
+        self._prune(directories)
+
+    def _prune(self, directories):
+        """Remove shard directories left empty, up to (not including) root"""
+        root = os.path.abspath(self.root)
+        for directory in sorted(directories, key=len, reverse=True):
+            directory = os.path.abspath(directory)
+            while directory.startswith(root + os.sep):
+                try:
+                    os.rmdir(directory)
+                except OSError:
+                    break  # not empty
+                directory = os.path.dirname(directory)
+
+    def _referenced(self) -> Optional[set]:
+        """Absolute paths of every frame an alert points at; None without an app"""
+        if self.app is None:
+            return None
+        with self.app.app_context(), read_session() as session:
+            rows = session.query(DBAlert.frame_path).filter(DBAlert.frame_path.isnot(None))
+            return {os.path.abspath(path) for (path,) in rows}
+
+    def scan(self) -> dict:
+        """Recount frame files and bytes under root (thumbnails excluded).
+
+        Files no alert points at are counted as orphans, not in ``bytes``,
+        and removed when older than ``orphan_max_age``.
+        """
+        try:
+            referenced = self._referenced()
+        except Exception as e:
+            print(f"Frame storage scan could not read alert frames: {e}")
+            referenced = None
+        files = total = orphan_files = orphan_bytes = 0
+        stale = []
+        now = time.time()
+        skip = os.path.abspath(self.thumbnails.directory) if self.thumbnails is not None else None
+        for directory, subdirs, names in os.walk(self.root):
+            if skip is not None:
+                subdirs[:] = [d for d in subdirs if os.path.abspath(os.path.join(directory, d)) != skip]
+            for name in names:
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if referenced is not None and os.path.abspath(path) not in referenced:
+                    orphan_files += 1
+                    orphan_bytes += stat.st_size
+                    if self.orphan_max_age is not None and now - stat.st_mtime > self.orphan_max_age:
+                        stale.append(path)
+                    continue
+                files += 1
+                total += stat.st_size
+        with self._lock:
+            self.files, self.bytes, self.scanned = files, total, True
+            self.orphan_files, self.orphan_bytes = orphan_files, orphan_bytes
+        if stale:
+            self._remove(stale, orphans=True)
+        return self.footprint()
+
+    def _expire(self, query) -> Tuple[int, List[str]]:
+        """Delete the oldest batch of the alerts selected by query; returns (count, frame paths)"""
+        rows = query.with_entities(
+            DBAlert.id, DBAlert.frame_path, DBAlert.timestamp, DBAlert.alert_type, DBAlert.gesture,
+            DBAlert.camera_id, DBAlert.male_count, DBAlert.female_count
+        ).order_by(DBAlert.timestamp, DBAlert.id).limit(self.batch_size).all()
+        if not rows:
+            return 0, []
+        DBAlert.query.filter(DBAlert.id.in_([r.id for r in rows])).delete(synchronize_session=False)
+        forget_alerts(rows)
+        db.session.commit()
+        with self._lock:
+            self.expired_alerts += len(rows)
+        if self.event_bus is not None:
+            self.event_bus.publish('alert_deleted', {'ids': [r.id for r in rows], 'expired': True})
+        return len(rows), [r.frame_path for r in rows if r.frame_path]
+
+    def compact(self) -> dict:
+        """Apply the retention policy now; returns the resulting footprint"""
+        started = time.perf_counter()
+        self.scan()
+        if self.app is not None:
+            with self.app.app_context():
+                try:
+                    prune_rollups('minute', ist_now() - timedelta(days=self.minute_rollup_days))
+                    db.session.commit()
+                    if self.retention_days is not None:
+                        cutoff = ist_now().replace(tzinfo=None) - timedelta(days=self.retention_days)
+                        count = self.batch_size
+                        while count == self.batch_size:
+                            count, paths = self._expire(DBAlert.query.filter(DBAlert.timestamp < cutoff))
+                            self._remove(paths)
+                    while self.max_bytes is not None and self.bytes > self.max_bytes:
+                        before = self.bytes
+                        count, paths = self._expire(DBAlert.query.filter(DBAlert.frame_path.isnot(None)))
+                        self._remove(paths)
+                        # Nothing freed: the remaining bytes are not these alerts' frames
+                        if not count or self.bytes >= before:
+                            break
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"Frame storage compaction failed: {e}")
+        with self._lock:
+            self.compactions += 1
+            self.last_compaction_ms = (time.perf_counter() - started) * 1000
+        return self.footprint()
+
+    def _run(self):
+        next_compaction = time.monotonic()
+        while not self._closed:
+            timeout = max(0.0, next_compaction - time.monotonic())
+            try:
+                paths = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                paths = None
+            if paths is not None:
+                try:
+                    self._remove(paths)
+                finally:
+                    self._queue.task_done()
+            if time.monotonic() >= next_compaction:
+                self.compact()
+                next_compaction = time.monotonic() + self.interval
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wait for queued removals to finish; False on timeout"""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def close(self, timeout: float = 10.0):
+        """Finish queued removals and stop the background thread"""
+        self.flush(timeout)
+        self._closed = True
+        if self._thread is not None:
+            self._queue.put([])
+            self._thread.join(timeout)
+
+    def footprint(self) -> dict:
+        with self._lock:
+            return {
+                'root': self.root,
+                'files': self.files,
+                'bytes': self.bytes,
+                'orphan_files': self.orphan_files,
+                'orphan_bytes': self.orphan_bytes,
+                'scanned': self.scanned,
+                'retention_days': self.retention_days,
+                'max_bytes': self.max_bytes,
+                'queued_removals': self._queue.qsize(),
+                'removed_files': self.removed_files,
+                'removed_bytes': self.removed_bytes,
+                'expired_alerts': self.expired_alerts,
+                'compactions': self.compactions,
+                'last_compaction_ms': round(self.last_compaction_ms, 2)
+            }
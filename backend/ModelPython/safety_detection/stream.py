@@ -0,0 +1,325 @@
+import os
+import threading
+import time
+from concurrent.futures import Executor
+from typing import Callable, Iterator, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+from .detector import SafetyDetector
+from .encoding import JpegEncoder, mjpeg_chunk
+from .profiling import ProfileCapture
+
+
+class FrameHub:
+    """Single capture + inference worker for one camera source.
+
+    The capture thread owns the ``cv2.VideoCapture``. Inference runs either
+    inline on that thread or, when an ``executor`` is given, as one task at a
+    time on a shared worker pool; either way ``detector.process_frame`` is
+    never called concurrently for the same detector. Each annotated frame is
+    JPEG-encoded once by ``encoder`` and the same buffer (and multipart
+    chunk) goes to every viewer via ``frames()``/``mjpeg()``. With
+    ``skip_unchanged``, frames where the detector saw no motion and ran no
+    stage are not re-encoded; viewers keep the previous image, refreshed at
+    least every ``refresh_interval`` seconds.
+
+    Capture, processing and encode times and dropped frames are recorded in
+    ``detector.metrics``; an optional shared ``profiler`` can profile
+    ``process_frame`` for a time window.
+    """
+
+    def __init__(self, source: Union[int, str], detector: SafetyDetector,
+                 context_factory: Optional[Callable] = None, idle_timeout: float = 5.0,
+                 always_on: bool = False, executor: Optional[Executor] = None,
+                 name: Optional[str] = None, encoder: Optional[JpegEncoder] = None,
+                 skip_unchanged: bool = False, refresh_interval: float = 1.0,
+                 max_fps: Optional[float] = None, profiler: Optional[ProfileCapture] = None):
+        self.source = source
+        self.detector = detector
+        self.name = name if name is not None else str(source)
+        # Shared pool that runs inference; None processes frames on the capture thread
+        self.executor = executor
+        # Returns a context manager to wrap each inference step (e.g. app.app_context)
+        self.context_factory = context_factory
+        # Seconds to keep the camera open after the last viewer disconnects
+        self.idle_timeout = idle_timeout
+        # Keep capturing (and alerting) even with no viewers attached
+        self.always_on = always_on
+        self.encoder = encoder if encoder is not None else JpegEncoder()
+        self.skip_unchanged = skip_unchanged
+        self.refresh_interval = refresh_interval
+        # Default cap on frames sent per second to each viewer (None = every frame)
+        self.max_fps = max_fps
+        self.profiler = profiler
+        self.metrics = detector.metrics
+
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._viewers = 0
+        self._last_viewer_left = 0.0
+        # Newest captured frame waiting for the pool, and whether a task is queued
+        self._pending: Optional[np.ndarray] = None
+        self._in_flight = False
+
+        # Latest published state
+        self.seq = 0
+        self.latest_jpeg: Optional[bytes] = None
+        self.latest_chunk: Optional[bytes] = None
+        self.latest_alert = None
+        self.latest_counts = {'male': 0, 'female': 0}
+        self.latest_gesture = dict(detector.current_gesture)
+        self.error: Optional[str] = None
+
+        # Counters
+        self._last_encoded = 0.0
+        self.skipped_unchanged = 0
+        self.bytes_sent = 0
+        self.frames_sent = 0
+
+    def start(self):
+        """Start the worker thread if it is not already running.
+
+        A thread that has decided to stop (idle timeout or ``stop``) but is
+        still releasing the capture is joined first and then replaced, so a
+        viewer arriving at that moment gets a live hub.
+        """
+        while True:
+            with self._cond:
+                thread = self._thread
+                if thread is None or not thread.is_alive():
+                    self._running = True
+                    self._last_viewer_left = time.monotonic()
+                    self.error = None
+                    self._thread = threading.Thread(
+                        target=self._run, name=f"FrameHub-{self.name}", daemon=True
+                    )
+                    self._thread.start()
+                    return
+                if self._running or thread is threading.current_thread():
+                    return
+            thread.join()
+
+    def stop(self, timeout: float = 2.0) -> bool:
+        """Stop the worker thread and release the capture.
+
+        Also waits for a frame already handed to the pool, so the detector
+        can be released afterwards; returns False if one is still being
+        processed after ``timeout``.
+        """
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._in_flight, timeout)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def viewers(self) -> int:
+        return self._viewers
+
+    @property
+    def is_file(self) -> bool:
+        return isinstance(self.source, str) and os.path.isfile(self.source)
+
+    def _open_capture(self) -> cv2.VideoCapture:
+        return cv2.VideoCapture(self.source)
+
+    def _detect(self, frame: np.ndarray):
+        if self.profiler is None:
+            return self.detector.process_frame(frame)
+        return self.profiler.run(self.detector.process_frame, frame)
+
+    def _process(self, frame: np.ndarray):
+        with self.metrics.time('process'):
+            if self.context_factory is None:
+                return self._detect(frame)
+            with self.context_factory():
+                return self._detect(frame)
+
+    def _publish(self, jpeg: Optional[bytes], alert):
+        """Publish state; a None jpeg keeps the current image for viewers"""
+        chunk = mjpeg_chunk(jpeg) if jpeg is not None else None
+        with self._cond:
+            if jpeg is not None:
+                self.seq += 1
+                self.latest_jpeg = jpeg
+                self.latest_chunk = chunk
+            if alert is not None:
+                self.latest_alert = alert
+            self.latest_counts = dict(self.detector.current_counts)
+            self.latest_gesture = dict(self.detector.current_gesture)
+            self._cond.notify_all()
+
+    def _should_idle_stop(self) -> bool:
+        return (not self.always_on and self._viewers == 0 and
+                time.monotonic() - self._last_viewer_left > self.idle_timeout)
+
+    def _process_and_publish(self, frame: np.ndarray):
+        processed_frame, alert = self._process(frame)
+        now = time.monotonic()
+        if (self.skip_unchanged and alert is None and self.latest_jpeg is not None
+                and not self.detector.frame_changed
+                and now - self._last_encoded < self.refresh_interval):
+            self.skipped_unchanged += 1
+            self._publish(None, alert)
+            return
+        try:
+            with self.metrics.time('encode'):
+                jpeg = self.encoder.encode(processed_frame)
+        except ValueError as e:
+            print(f"FrameHub {self.name!r} could not encode frame: {e}")
+            self._publish(None, alert)
+            return
+        self._last_encoded = now
+        self._publish(jpeg, alert)
+
+    def _submit(self, frame: np.ndarray):
+        """Hand a frame to the pool, keeping at most one task per hub queued.
+
+        Live sources replace a frame the pool has not picked up yet, so a slow
+        pool drops frames instead of falling behind. Recorded files wait for
+        the slot instead so no footage is skipped.
+        """
+        with self._cond:
+            if self.is_file:
+                self._cond.wait_for(lambda: self._pending is None or not self._running)
+            if not self._running:
+                return
+            if self._pending is not None:
+                self.metrics.inc('dropped_frames')
+            self._pending = frame
+            if self._in_flight:
+                return
+            self._in_flight = True
+        self.executor.submit(self._drain)
+
+    def _drain(self):
+        with self._cond:
+            frame = self._pending
+            self._pending = None
+            self._cond.notify_all()
+        try:
+            if frame is not None and self._running:
+                self._process_and_publish(frame)
+        except Exception as e:
+            self.error = str(e)
+            print(f"FrameHub {self.name!r} inference failed: {e}")
+        with self._cond:
+            if self._pending is None or not self._running:
+                self._pending = None
+                self._in_flight = False
+                self._cond.notify_all()
+                return
+        # Requeue behind other cameras' tasks rather than looping here
+        self.executor.submit(self._drain)
+
+    def _run(self):
+        cap = self._open_capture()
+        try:
+            if not cap.isOpened():
+                self.error = f"Could not open camera source {self.source!r}"
+                print(self.error)
+                return
+            frame_interval = 0.0
+            if self.is_file:
+                fps = cap.get(cv2.CAP_PROP_FPS)
+                frame_interval = 1.0 / fps if fps and fps > 0 else 0.0
+            while self._running:
+                with self._cond:
+                    # Decided under the same lock viewers register under, so
+                    # a viewer either keeps the hub running or sees it stopping
+                    if not self._running or self._should_idle_stop():
+                        self._running = False
+                        break
+                started = time.monotonic()
+                with self.metrics.time('capture'):
+                    ret, frame = cap.read()
+                if not ret:
+                    self.error = f"Camera source {self.source!r} returned no frame"
+                    break
+                if self.executor is None:
+                    self._process_and_publish(frame)
+                else:
+                    self._submit(frame)
+                # Play recorded files back at their native rate
+                remaining = frame_interval - (time.monotonic() - started)
+                if remaining > 0:
+                    time.sleep(remaining)
+        except Exception as e:
+            self.error = str(e)
+            print(f"FrameHub {self.name!r} stopped: {e}")
+        finally:
+            cap.release()
+            with self._cond:
+                self._running = False
+                self._cond.notify_all()
+
+    def _follow(self, timeout: float, max_fps: Optional[float]) -> Iterator[Tuple[bytes, bytes]]:
+        """Yield (jpeg, chunk) for each newly published frame, at most max_fps per second.
+
+        A viewer that is slower than the camera, or throttled, simply gets
+        the newest frame when it is ready for the next one.
+        """
+        max_fps = max_fps or self.max_fps
+        interval = 1.0 / max_fps if max_fps else 0.0
+        with self._cond:
+            self._viewers += 1
+        self.start()
+        last_seq = 0
+        last_sent = 0.0
+        try:
+            while True:
+                remaining = interval - (time.monotonic() - last_sent)
+                if remaining > 0:
+                    time.sleep(remaining)
+                with self._cond:
+                    self._cond.wait_for(
+                        lambda: self.seq != last_seq or not self._running, timeout
+                    )
+                    if self.seq == last_seq:
+                        if not self._running:
+                            return
+                        continue
+                    last_seq = self.seq
+                    jpeg, chunk = self.latest_jpeg, self.latest_chunk
+                    self.frames_sent += 1
+                    self.bytes_sent += len(chunk)
+                last_sent = time.monotonic()
+                yield jpeg, chunk
+        finally:
+            with self._cond:
+                self._viewers -= 1
+                if self._viewers == 0:
+                    self._last_viewer_left = time.monotonic()
+
+    def frames(self, timeout: float = 5.0, max_fps: Optional[float] = None) -> Iterator[bytes]:
+        """Yield each newly published JPEG; starts the worker on first use"""
+        for jpeg, _ in self._follow(timeout, max_fps):
+            yield jpeg
+
+    def mjpeg(self, max_fps: Optional[float] = None) -> Iterator[bytes]:
+        """Multipart MJPEG chunks for a ``multipart/x-mixed-replace`` response.
+
+        The chunk is built once per frame and shared by all viewers.
+        """
+        for _, chunk in self._follow(5.0, max_fps):
+            yield chunk
+
+    def stream_stats(self) -> dict:
+        stats = self.encoder.stats()
+        stats.update({
+            'published': self.seq,
+            'skipped_unchanged': self.skipped_unchanged,
+            'frames_sent': self.frames_sent,
+            'bytes_sent': self.bytes_sent
+        })
+        return stats
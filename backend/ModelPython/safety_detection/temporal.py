@@ -0,0 +1,136 @@
+import time
+from collections import Counter, deque
+from typing import Callable, List, Optional
+
+# Largest wrist jump (normalized units) between samples still treated as the same hand
+MAX_HAND_JUMP = 0.2
+
+
+class HandHistory:
+    """Fixed-size ring buffer of one hand's recent gesture samples.
+
+    Each sample is (time, gesture label or None, confidence, wrist x); a
+    frame where the hand is missing is recorded as a None label so K-of-N
+    counts stay aligned with the hands stage.
+    """
+
+    def __init__(self, hand: str, size: int):
+        self.hand = hand
+        self.samples: deque = deque(maxlen=size)
+        self.position = None  # last seen wrist (x, y)
+
+    def add(self, now: float, label: Optional[str], confidence: float, x: Optional[float]):
+        self.samples.append((now, label, confidence, x))
+
+    def empty(self) -> bool:
+        return all(label is None for _, label, _, _ in self.samples)
+
+    def held_since(self, label: str) -> Optional[float]:
+        """Start time of the current unbroken run of label, None if not active"""
+        start = None
+        for t, sample_label, _, _ in reversed(self.samples):
+            if sample_label != label:
+                break
+            start = t
+        return start
+
+
+def count_reversals(xs: List[float], amplitude: float) -> int:
+    """Direction changes of a 1-D trajectory, ignoring moves smaller than amplitude"""
+    if not xs:
+        return 0
+    reversals = 0
+    direction = 0
+    extreme = xs[0]  # furthest point reached in the current direction
+    for x in xs[1:]:
+        if direction == 0:
+            if abs(x - extreme) >= amplitude:
+                direction = 1 if x > extreme else -1
+                extreme = x
+        elif (x - extreme) * direction > 0:
+            extreme = x
+        elif abs(x - extreme) >= amplitude:
+            reversals += 1
+            direction = -direction
+            extreme = x
+    return reversals
+
+
+class GestureConfirmer:
+    """Turns per-frame gesture labels into confirmed gestures.
+
+    A static gesture (thumb_palm, ok_sign) is confirmed when it is seen in
+    at least ``min_frames`` of a hand's last ``window`` samples, or, with
+    ``min_duration`` set, once it has been held without a break for that
+    many seconds. A wave additionally needs the open hand to move side to
+    side: at least ``wave_reversals`` direction changes of the wrist larger
+    than ``wave_amplitude`` within the window (0 accepts a still open hand).
+    """
+
+    def __init__(self, window: int = 10, min_frames: int = 6, min_duration: Optional[float] = None,
+                 min_confidence: float = 0.0, wave_reversals: int = 2, wave_amplitude: float = 0.04,
+                 clock: Callable[[], float] = time.monotonic):
+        self.window = max(1, window)
+        self.min_frames = max(1, min(min_frames, self.window))
+        self.min_duration = min_duration
+        self.min_confidence = min_confidence
+        self.wave_reversals = wave_reversals
+        self.wave_amplitude = wave_amplitude
+        self.clock = clock
+        self.histories: List[HandHistory] = []
+
+    def _match(self, hand: dict, unmatched: List[HandHistory]) -> HandHistory:
+        """History of the same hand (same side, nearest wrist), or a new one"""
+        wrist = hand['landmarks'][0]
+        best, best_distance = None, MAX_HAND_JUMP
+        for history in unmatched:
+            if history.hand != hand['hand'] or history.position is None:
+                continue
+            distance = ((history.position[0] - wrist[0]) ** 2 + (history.position[1] - wrist[1]) ** 2) ** 0.5
+            if distance <= best_distance:
+                best, best_distance = history, distance
+        if best is None:
+            best = HandHistory(hand['hand'], self.window)
+            self.histories.append(best)
+        else:
+            unmatched.remove(best)
+        best.position = (float(wrist[0]), float(wrist[1]))
+        return best
+
+    def _confirmed(self, history: HandHistory, now: float) -> Optional[str]:
+        votes = Counter(label for _, label, _, _ in history.samples if label is not None)
+        for label, count in votes.most_common():
+            confidences = [c for _, l, c, _ in history.samples if l == label]
+            if sum(confidences) / len(confidences) < self.min_confidence:
+                continue
+            held = count >= self.min_frames
+            if not held and self.min_duration is not None:
+                since = history.held_since(label)
+                held = since is not None and now - since >= self.min_duration
+            if not held:
+                continue
+            if label == 'wave' and self.wave_reversals > 0:
+                xs = [x for _, l, _, x in history.samples if l == 'wave']
+                if count_reversals(xs, self.wave_amplitude) < self.wave_reversals:
+                    continue
+            return label
+        return None
+
+    def update(self, hands: List[dict], now: Optional[float] = None) -> Optional[str]:
+        """Record one hands-stage result; returns a confirmed gesture, if any"""
+        now = self.clock() if now is None else now
+        unmatched = list(self.histories)
+        for hand in hands:
+            history = self._match(hand, unmatched)
+            history.add(now, hand['gesture'], hand['score'], float(hand['landmarks'][0][0]))
+        for history in unmatched:
+            history.add(now, None, 0.0, None)
+        self.histories = [h for h in self.histories if not h.empty()]
+
+        confirmed = None
+        for history in self.histories:
+            confirmed = self._confirmed(history, now) or confirmed
+        return confirmed
+
+    def reset(self):
+        self.histories = []
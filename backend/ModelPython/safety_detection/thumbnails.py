@@ -0,0 +1,149 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .utils import downscale, encode_frame_to_jpg
+
+
+class ThumbnailCache:
+    """Alert frame thumbnails: an on-disk cache with an in-memory LRU in front.
+
+    Thumbnails live under ``directory``, named after their alert frame, and
+    are created when an alert is written (see ``AlertWriter``) or lazily on
+    first request. The directory is kept under
+    ``max_disk_bytes`` by evicting the least recently written files; the
+    ``memory_items`` hottest thumbnails are also kept in memory with their
+    ETag so repeat requests touch neither the disk nor the encoder.
+    """
+
+    def __init__(self, directory: str = os.path.join("alert_frames", "thumbs"), width: int = 320,
+                 quality: int = 75, max_disk_bytes: int = 200 * 1024 * 1024, memory_items: int = 256):
+        self.directory = directory
+        self.width = width
+        self.quality = quality
+        self.max_disk_bytes = max_disk_bytes
+        self.memory_items = memory_items
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, Tuple[bytes, str]]" = OrderedDict()
+        self._disk_bytes: Optional[int] = None  # measured on first write
+
+        # Counters
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.generated = 0
+        self.evicted = 0
+
+    def path_for(self, frame_path: str) -> str:
+        # Frames are sharded per camera, so keep the camera directory in the name
+        camera = os.path.basename(os.path.dirname(frame_path))
+        return os.path.join(self.directory, f"{camera}_{os.path.basename(frame_path)}")
+
+    @staticmethod
+    def etag_for(data: bytes) -> str:
+        return hashlib.sha1(data).hexdigest()
+
+    def _remember(self, frame_path: str, data: bytes) -> Tuple[bytes, str]:
+        entry = (data, self.etag_for(data))
+        with self._lock:
+            self._memory[frame_path] = entry
+            self._memory.move_to_end(frame_path)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+        return entry
+
+    def _disk_usage(self) -> int:
+        total = 0
+        for entry in os.scandir(self.directory):
+            if entry.is_file():
+                total += entry.stat().st_size
+        return total
+
+    def _evict(self):
+        """Delete the oldest thumbnails until the directory fits max_disk_bytes"""
+        entries = sorted((e for e in os.scandir(self.directory) if e.is_file()),
+                         key=lambda e: e.stat().st_mtime)
+        for entry in entries:
+            if self._disk_bytes <= self.max_disk_bytes:
+                break
+            size = entry.stat().st_size
+            try:
+                os.remove(entry.path)
+            except OSError:
+                continue
+            self._disk_bytes -= size
+            self.evicted += 1
+
+    def write(self, frame: np.ndarray, frame_path: str) -> bytes:
+        """Encode and store the thumbnail of an alert frame; returns its JPEG bytes"""
+        return self._store(frame, frame_path)[0]
+
+    def _store(self, frame: np.ndarray, frame_path: str) -> Tuple[bytes, str]:
+        small, _ = downscale(frame, self.width)
+        data = encode_frame_to_jpg(small, self.quality)
+        path = self.path_for(frame_path)
+        os.makedirs(self.directory, exist_ok=True)
+        # A thumbnail written again replaces its old bytes rather than adding to them
+        replaced = os.path.getsize(path) if os.path.exists(path) else 0
+        with open(path, 'wb') as f:
+            f.write(data)
+        with self._lock:
+            self.generated += 1
+            if self._disk_bytes is None:
+                self._disk_bytes = self._disk_usage()
+            else:
+                self._disk_bytes += len(data) - replaced
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict()
+        return self._remember(frame_path, data)
+
+    def get(self, frame_path: str) -> Optional[Tuple[bytes, str]]:
+        """(JPEG bytes, ETag) of an alert frame's thumbnail, None if the frame is gone"""
+        with self._lock:
+            entry = self._memory.get(frame_path)
+            if entry is not None:
+                self._memory.move_to_end(frame_path)
+                self.memory_hits += 1
+                return entry
+        path = self.path_for(frame_path)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                data = f.read()
+            with self._lock:
+                self.disk_hits += 1
+            return self._remember(frame_path, data)
+        frame = cv2.imread(frame_path) if os.path.exists(frame_path) else None
+        if frame is None:
+            return None
+        return self._store(frame, frame_path)
+
+    def discard(self, frame_path: str):
+        """Forget an alert frame's thumbnail, in memory and on disk"""
+        with self._lock:
+            self._memory.pop(frame_path, None)
+        path = self.path_for(frame_path)
+        if os.path.exists(path):
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+            except OSError as e:
+                print(f"Error deleting thumbnail {path}: {e}")
+                return
+            with self._lock:
+                if self._disk_bytes is not None:
+                    self._disk_bytes -= size
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'memory_items': len(self._memory),
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'generated': self.generated,
+                'evicted': self.evicted,
+                'disk_bytes': self._disk_bytes
+            }
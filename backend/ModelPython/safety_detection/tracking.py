@@ -0,0 +1,153 @@
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+Box = Tuple[int, int, int, int]
+
+
+def iou_matrix(a: Sequence[Box], b: Sequence[Box]) -> np.ndarray:
+    """Pairwise IoU between two lists of (x, y, w, h) boxes"""
+    if not len(a) or not len(b):
+        return np.zeros((len(a), len(b)), dtype=np.float32)
+    a = np.asarray(a, dtype=np.float32)
+    b = np.asarray(b, dtype=np.float32)
+    ax1, ay1, ax2, ay2 = a[:, 0:1], a[:, 1:2], a[:, 0:1] + a[:, 2:3], a[:, 1:2] + a[:, 3:4]
+    bx1, by1, bx2, by2 = b[:, 0], b[:, 1], b[:, 0] + b[:, 2], b[:, 1] + b[:, 3]
+    inter_w = np.clip(np.minimum(ax2, bx2) - np.maximum(ax1, bx1), 0, None)
+    inter_h = np.clip(np.minimum(ay2, by2) - np.maximum(ay1, by1), 0, None)
+    inter = inter_w * inter_h
+    union = (a[:, 2:3] * a[:, 3:4]) + (b[:, 2] * b[:, 3]) - inter
+    return inter / np.maximum(union, 1e-6)
+
+
+class FaceTrack:
+    """A face followed across frames with a confidence-weighted gender vote"""
+
+    def __init__(self, track_id: int, box: Box, frame_index: int):
+        self.track_id = track_id
+        self.box = box
+        self.first_seen = frame_index
+        self.last_seen = frame_index
+        self.hits = 1
+        self.misses = 0
+        self.last_classified = None
+        self.votes = {'male': 0.0, 'female': 0.0}
+        self.vote_weight = 0.0  # decayed number of votes cast
+        self.vote_count = 0
+
+    @property
+    def gender(self) -> str:
+        return 'female' if self.votes['female'] > self.votes['male'] else 'male'
+
+    @property
+    def confidence(self) -> float:
+        """Mean net confidence behind the winning label, discounted by
+        disagreeing votes (0 before any vote)"""
+        if self.vote_weight <= 0:
+            return 0.0
+        return self.votes[self.gender] / self.vote_weight
+
+    def vote(self, gender: str, confidence: float, frame_index: int, decay: float):
+        for label in self.votes:
+            self.votes[label] *= decay
+        self.vote_weight = self.vote_weight * decay + 1.0
+        self.votes[gender] += confidence
+        self.vote_count += 1
+        self.last_classified = frame_index
+
+    def to_face(self, box: Box = None) -> dict:
+        return {
+            'box': box if box is not None else self.box,
+            'gender': self.gender,
+            'confidence': self.confidence,
+            'track_id': self.track_id,
+            'hits': self.hits
+        }
+
+
+class FaceTracker:
+    """Greedy IoU tracker with a centroid fallback for fast-moving faces.
+
+    Detections overlapping a track by at least ``iou_threshold`` continue it;
+    otherwise a detection whose centre lies within half a face width of the
+    track's centre is accepted. Tracks unseen for more than ``max_missed``
+    frames are dropped.
+    """
+
+    def __init__(self, iou_threshold: float = 0.3, max_missed: int = 5,
+                 reclassify_interval: int = 30, min_confidence: float = 0.6,
+                 vote_decay: float = 0.95, min_votes: int = 3):
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        # Re-query the gender net for a known track every N frames
+        self.reclassify_interval = reclassify_interval
+        # A track is settled once it has min_votes votes and its confidence
+        # (vote share weighted by net confidence, so a unanimous track sits
+        # at the net's typical 0.7-0.95) reaches min_confidence; unsettled
+        # tracks are re-queried every frame
+        self.min_confidence = min_confidence
+        self.min_votes = min_votes
+        self.vote_decay = vote_decay
+        self.frame_index = 0
+        self.tracks: Dict[int, FaceTrack] = {}
+        self._next_id = 1
+
+    def _match_scores(self, tracks: List[FaceTrack], boxes: Sequence[Box]) -> np.ndarray:
+        scores = iou_matrix([t.box for t in tracks], boxes)
+        if not tracks or not len(boxes):
+            return scores
+        t = np.asarray([t.box for t in tracks], dtype=np.float32)
+        b = np.asarray(boxes, dtype=np.float32)
+        t_centres = t[:, :2] + t[:, 2:] / 2
+        b_centres = b[:, :2] + b[:, 2:] / 2
+        dist = np.linalg.norm(t_centres[:, None, :] - b_centres[None, :, :], axis=2)
+        radius = np.maximum(t[:, 2:3], b[None, :, 2]) / 2
+        close = (scores < self.iou_threshold) & (dist < radius)
+        # Centroid matches rank below any IoU match
+        scores[close] = self.iou_threshold * (1 - dist[close] / radius[close]) * 0.5
+        scores[(scores < self.iou_threshold) & ~close] = 0.0
+        return scores
+
+    def update(self, boxes: Sequence[Box]) -> List[FaceTrack]:
+        """Assign each detection to a track; returns tracks in detection order"""
+        self.frame_index += 1
+        tracks = list(self.tracks.values())
+        scores = self._match_scores(tracks, boxes)
+        assigned: List[FaceTrack] = [None] * len(boxes)
+        if scores.size:
+            for flat in np.argsort(scores, axis=None)[::-1]:
+                ti, bi = np.unravel_index(flat, scores.shape)
+                if scores[ti, bi] <= 0:
+                    break
+                track = tracks[ti]
+                if assigned[bi] is not None or track.last_seen == self.frame_index:
+                    continue
+                track.box = tuple(boxes[bi])
+                track.last_seen = self.frame_index
+                track.hits += 1
+                track.misses = 0
+                assigned[bi] = track
+
+        for bi, box in enumerate(boxes):
+            if assigned[bi] is None:
+                track = FaceTrack(self._next_id, tuple(box), self.frame_index)
+                self._next_id += 1
+                self.tracks[track.track_id] = track
+                assigned[bi] = track
+
+        for track in tracks:
+            if track.last_seen != self.frame_index:
+                track.misses += 1
+                if track.misses > self.max_missed:
+                    del self.tracks[track.track_id]
+        return assigned
+
+    def needs_classification(self, track: FaceTrack) -> bool:
+        """New, uncertain, or stale tracks go back through the gender net"""
+        return (track.last_classified is None or
+                track.vote_count < self.min_votes or
+                track.confidence < self.min_confidence or
+                self.frame_index - track.last_classified >= self.reclassify_interval)
+
+    def record(self, track: FaceTrack, gender: str, confidence: float):
+        track.vote(gender, confidence, self.frame_index, self.vote_decay)
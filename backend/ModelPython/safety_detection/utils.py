@@ -1,4 +1,5 @@
 import os
+import re
 import cv2
 import geocoder
 from datetime import datetime
@@ -15,22 +16,45 @@ def get_location() -> Tuple[float, float]:
     except Exception:
         return (0.0, 0.0)
 
-def is_nighttime(night_start: int = 20, night_end: int = 6) -> bool:
-    """Check if current time is nighttime"""
-    current_hour = datetime.now().hour
+def is_nighttime(night_start: int = 20, night_end: int = 6, at: Optional[datetime] = None) -> bool:
+    """Check if current time (or the given time) is nighttime"""
+    current_hour = (at or datetime.now()).hour
     return current_hour >= night_start or current_hour < night_end
 
-def save_alert_frame(frame: np.ndarray, folder: str = "alert_frames") -> str:
-    """Save alert frame to disk with timestamp"""
-    os.makedirs(folder, exist_ok=True)
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
-    frame_path = os.path.join(folder, f"alert_{timestamp}.jpg")
+def alert_frame_path(folder: str = "alert_frames", camera_id: Optional[str] = None,
+                     timestamp: Optional[datetime] = None) -> str:
+    """Build a path for an alert frame (nothing is written).
+
+    Frames are sharded as folder/YYYY/MM/DD/<camera>/alert_<time>.jpg so no
+    single directory grows without bound.
+    """
+    timestamp = timestamp or datetime.now()
+    camera = re.sub(r'[^A-Za-z0-9_.-]', '_', str(camera_id)) if camera_id is not None else 'default'
+    return os.path.join(folder, timestamp.strftime('%Y'), timestamp.strftime('%m'), timestamp.strftime('%d'),
+                        camera, f"alert_{timestamp.strftime('%Y%m%d_%H%M%S_%f')}.jpg")
+
+def save_alert_frame(frame: np.ndarray, folder: str = "alert_frames",
+                     frame_path: Optional[str] = None) -> str:
+    """Save alert frame to disk with timestamp (or to a precomputed frame_path)"""
+    if frame_path is None:
+        frame_path = alert_frame_path(folder)
+    os.makedirs(os.path.dirname(frame_path) or '.', exist_ok=True)
     cv2.imwrite(frame_path, frame)
     return frame_path
 
-def encode_frame_to_jpg(frame: np.ndarray) -> bytes:
-    """Encode frame as JPEG bytes"""
-    success, buffer = cv2.imencode('.jpg', frame)
+def downscale(frame: np.ndarray, max_width: Optional[int]) -> Tuple[np.ndarray, float]:
+    """Shrink a frame to at most max_width pixels wide; returns (frame, scale)"""
+    h, w = frame.shape[:2]
+    if not max_width or w <= max_width:
+        return frame, 1.0
+    scale = max_width / float(w)
+    small = cv2.resize(frame, (max_width, max(1, int(round(h * scale)))), interpolation=cv2.INTER_AREA)
+    return small, scale
+
+def encode_frame_to_jpg(frame: np.ndarray, quality: Optional[int] = None) -> bytes:
+    """Encode frame as JPEG bytes (OpenCV's default quality unless given)"""
+    params = [cv2.IMWRITE_JPEG_QUALITY, int(quality)] if quality is not None else []
+    success, buffer = cv2.imencode('.jpg', frame, params)
     if not success:
         raise ValueError("Could not encode frame as JPEG")
     return buffer.tobytes()
\ No newline at end of file
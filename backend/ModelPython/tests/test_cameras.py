@@ -0,0 +1,78 @@
+import pytest
+
+from safety_detection import cameras
+from safety_detection.cameras import CameraRegistry
+from safety_detection.metrics import PipelineMetrics
+from safety_detection.models import DetectionConfig
+
+
+class FakeDetector:
+    def __init__(self, config, inference_backend=None, **kwargs):
+        self.config = config
+        self.inference_backend = inference_backend
+        self.metrics = PipelineMetrics()
+        self.current_counts = {'male': 0, 'female': 0}
+        self.current_gesture = {}
+        self.released = False
+
+    def release(self):
+        self.released = True
+
+
+class FakeBackend:
+    def __init__(self, config):
+        self.config = config
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setattr(cameras, 'SafetyDetector', FakeDetector)
+    monkeypatch.setattr(cameras, 'ProcessInferenceBackend', FakeBackend)
+    registry = CameraRegistry(max_workers=1)
+    yield registry
+    registry.shutdown()
+
+
+def process_config(**kwargs):
+    return DetectionConfig(execution_mode='process', **kwargs)
+
+
+def test_cameras_with_equal_configs_share_a_backend(registry):
+    first = registry.add('a', 0, config=process_config())
+    second = registry.add('b', 1, config=process_config())
+    assert first.detector.inference_backend is second.detector.inference_backend
+    assert registry.add('c', 2).detector.inference_backend is None
+
+
+def test_each_config_gets_a_backend_built_from_it(registry):
+    strict = process_config(confidence_threshold=0.9)
+    loose = process_config(confidence_threshold=0.3)
+    backends = [registry.add(name, 0, config=config).detector.inference_backend
+                for name, config in (('strict', strict), ('loose', loose))]
+    assert backends[0] is not backends[1]
+    assert [b.config for b in backends] == [strict, loose]
+
+
+def test_backend_closes_with_its_last_camera(registry):
+    registry.add('a', 0, config=process_config())
+    backend = registry.add('b', 1, config=process_config()).detector.inference_backend
+    registry.remove('a')
+    assert not backend.closed
+    registry.remove('b')
+    assert backend.closed and registry.process_backends == {}
+
+
+def test_duplicate_id_keeps_the_shared_backend(registry):
+    backend = registry.add('a', 0, config=process_config()).detector.inference_backend
+    with pytest.raises(ValueError):
+        registry.add('a', 1, config=process_config())
+    assert not backend.closed
+
+
+def test_remove_releases_the_detector_after_stopping(registry):
+    detector = registry.add('a', 0).detector
+    assert registry.remove('a') and detector.released
@@ -0,0 +1,64 @@
+import json
+
+from safety_detection.events import EventBus, format_sse
+
+
+def parse(message):
+    """(id, type, data) of one SSE message; id is None when absent"""
+    fields = dict(line.split(': ', 1) for line in message.strip().split('\n'))
+    event_id = int(fields['id']) if 'id' in fields else None
+    return event_id, fields['event'], json.loads(fields['data'])
+
+
+def take(stream, count):
+    """The next count event messages, skipping the retry hint and keep-alives"""
+    events = []
+    while len(events) < count:
+        message = next(stream)
+        if message.startswith(('retry:', ':')):
+            continue
+        events.append(parse(message))
+    return events
+
+
+def test_format_sse():
+    assert format_sse({'a': 1}, 'alert', 7) == 'id: 7\nevent: alert\ndata: {"a": 1}\n\n'
+    assert format_sse({}, 'counts') == 'event: counts\ndata: {}\n\n'
+
+
+def test_resume_replays_events_after_last_event_id():
+    bus = EventBus(heartbeat=0.01)
+    for i in range(5):
+        bus.publish('alert', {'n': i})
+    events = take(bus.stream(last_event_id=2), 3)
+    assert [(event_id, data['n']) for event_id, _, data in events] == [(3, 2), (4, 3), (5, 4)]
+
+
+def test_fresh_connection_starts_at_now_after_initial_snapshot():
+    bus = EventBus(heartbeat=0.01)
+    bus.publish('alert', {'n': 0})
+    stream = bus.stream(initial=[('counts', {'male': 1, 'female': 2})])
+    assert take(stream, 1) == [(None, 'counts', {'male': 1, 'female': 2})]
+    bus.publish('alert', {'n': 1})
+    assert take(stream, 1) == [(2, 'alert', {'n': 1})]
+
+
+def test_overrun_sends_reset_before_remaining_events():
+    bus = EventBus(history=3, heartbeat=0.01)
+    for i in range(6):
+        bus.publish('alert', {'n': i})
+    events = take(bus.stream(last_event_id=1), 4)
+    assert events[0][:2] == (3, 'reset')
+    assert [event_id for event_id, _, _ in events[1:]] == [4, 5, 6]
+
+
+def test_filtered_events_still_advance_the_cursor():
+    bus = EventBus(heartbeat=0.01)
+    bus.publish('counts', {'camera_id': 'a'})
+    bus.publish('alert', {'camera_id': 'b'})
+    bus.publish('alert', {'camera_id': 'a'})
+    bus.publish('alert', {})
+    stream = bus.stream(last_event_id=0, types=['alert'], camera_id='a')
+    assert [event_id for event_id, _, _ in take(stream, 2)] == [3, 4]
+    bus.publish('alert', {'camera_id': 'a'})
+    assert [event_id for event_id, _, _ in take(stream, 1)] == [5]
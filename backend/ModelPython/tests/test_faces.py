@@ -0,0 +1,19 @@
+import pytest
+
+from safety_detection.faces import FaceDetector
+
+
+def test_detector_without_detect_fails_on_construction():
+    class Incomplete(FaceDetector):
+        name = 'incomplete'
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_detector_with_detect_constructs():
+    class Empty(FaceDetector):
+        def detect(self, frame):
+            return []
+
+    assert Empty().detect(None) == []
@@ -0,0 +1,56 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from safety_detection import gestures
+from safety_detection.gestures import NUM_LANDMARKS, classify_gestures, gesture_thresholds
+
+FIXTURES = Path(__file__).parent / 'fixtures' / 'hand_landmarks.npz'
+
+
+@pytest.fixture(scope='module')
+def hands():
+    """(N x 21 x 3) float32 landmarks and the label the per-hand checks gave each"""
+    data = np.load(FIXTURES)
+    return data['landmarks'], [label or None for label in data['labels'].tolist()]
+
+
+def vectorized(landmarks, thresholds=None):
+    """classify_gestures forced onto the matrix path whatever the hand count"""
+    previous = gestures.VECTORIZE_MIN_HANDS
+    gestures.VECTORIZE_MIN_HANDS = 1
+    try:
+        return classify_gestures(landmarks, thresholds)
+    finally:
+        gestures.VECTORIZE_MIN_HANDS = previous
+
+
+def scalar(landmarks, thresholds=None):
+    """classify_gestures one hand per call, which takes the scalar path"""
+    return [classify_gestures(hand[None], thresholds)[0] for hand in landmarks]
+
+
+def test_fixture_labels_cover_every_gesture(hands):
+    _, labels = hands
+    assert set(labels) == {'thumb_palm', 'wave', 'ok_sign', None}
+
+
+def test_scalar_and_vectorized_paths_match_recorded_labels(hands):
+    landmarks, labels = hands
+    assert scalar(landmarks) == labels
+    assert vectorized(landmarks) == labels
+
+
+def test_dispatch_by_hand_count(hands):
+    landmarks, labels = hands
+    for count in (1, 2, gestures.VECTORIZE_MIN_HANDS, 8):
+        assert classify_gestures(landmarks[:count]) == labels[:count]
+    assert classify_gestures(np.empty((0, NUM_LANDMARKS, 3))) == []
+
+
+def test_paths_agree_with_custom_thresholds(hands):
+    landmarks, _ = hands
+    for scale in (0.7, 1.3):
+        thresholds = gesture_thresholds({k: v * scale for k, v in gesture_thresholds().items()})
+        assert scalar(landmarks, thresholds) == vectorized(landmarks, thresholds)
@@ -0,0 +1,108 @@
+import threading
+import time
+
+import pytest
+
+from safety_detection.location import (UNKNOWN_LOCATION, CachedLocationProvider, LocationProvider,
+                                       StaticLocationProvider)
+
+
+class StubProvider(LocationProvider):
+    """Returns queued results (None = failed lookup), optionally waiting on a gate"""
+
+    def __init__(self, *results, gate=None):
+        self.results = list(results)
+        self.gate = gate
+        self.lookups = 0
+
+    def lookup(self):
+        if self.gate is not None:
+            self.gate.wait(5.0)
+        self.lookups += 1
+        return self.results.pop(0) if self.results else None
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def settle(cache):
+    """Wait for a background refresh to finish"""
+    deadline = time.monotonic() + 5.0
+    while cache._refreshing and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+def test_unknown_location_until_first_lookup_succeeds():
+    cache = CachedLocationProvider(StubProvider(None), clock=FakeClock())
+    assert cache.current() == UNKNOWN_LOCATION
+    settle(cache)
+    assert cache.current() == UNKNOWN_LOCATION
+    assert cache.provider.lookups == 1
+
+
+def test_ttl_expiry_refreshes_in_background():
+    clock = FakeClock()
+    stub = StubProvider((1.0, 2.0), (3.0, 4.0))
+    cache = CachedLocationProvider(stub, ttl=60.0, clock=clock)
+    cache.current()
+    settle(cache)
+    assert cache.current() == (1.0, 2.0)
+
+    clock.now += 59.0
+    cache.current()
+    settle(cache)
+    assert stub.lookups == 1
+
+    clock.now += 2.0
+    # The stale value is still served while the refresh runs
+    assert cache.current() == (1.0, 2.0)
+    settle(cache)
+    assert stub.lookups == 2
+    assert cache.current() == (3.0, 4.0)
+
+
+def test_failed_lookup_retried_after_backoff():
+    clock = FakeClock()
+    stub = StubProvider(None, (5.0, 6.0))
+    cache = CachedLocationProvider(stub, retry_interval=30.0, clock=clock)
+    cache.current()
+    settle(cache)
+    for _ in range(10):
+        cache.current()
+    settle(cache)
+    assert stub.lookups == 1
+
+    clock.now += 31.0
+    cache.current()
+    settle(cache)
+    assert stub.lookups == 2
+    assert cache.current() == (5.0, 6.0)
+
+
+def test_current_never_blocks_on_slow_lookup():
+    gate = threading.Event()
+    stub = StubProvider((7.0, 8.0), gate=gate)
+    started = time.monotonic()
+    # Not wrapped explicitly: the base class caches too
+    assert stub.current() == UNKNOWN_LOCATION
+    assert time.monotonic() - started < 0.5
+    gate.set()
+    settle(stub._cache)
+    assert stub.current() == (7.0, 8.0)
+
+
+def test_static_provider():
+    assert StaticLocationProvider('12.5', 77).current() == (12.5, 77.0)
+
+
+def test_provider_without_lookup_fails_on_construction():
+    class Incomplete(LocationProvider):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
@@ -0,0 +1,33 @@
+from safety_detection.motion import contains_box, sticky_box
+
+FRAME = (480, 640, 3)
+
+
+def test_first_box_is_the_padded_target():
+    assert sticky_box(None, (100, 100, 40, 40), FRAME, 0.25, 0.25) == (90, 90, 60, 60)
+
+
+def test_box_holds_while_target_drifts_inside_it():
+    box = sticky_box(None, (100, 100, 40, 40), FRAME, 0.25, 0.25)
+    for dx in (-8, -4, 0, 4, 8):
+        assert sticky_box(box, (100 + dx, 100, 40, 40), FRAME, 0.25, 0.25) == box
+
+
+def test_box_grows_to_cover_a_target_that_leaves_it():
+    box = (90, 90, 60, 60)
+    grown = sticky_box(box, (130, 100, 40, 40), FRAME, 0.25, 0.25)
+    assert contains_box(grown, box) and contains_box(grown, (130, 100, 40, 40))
+    # The margin leaves room for the next frames of drift
+    assert sticky_box(grown, (135, 100, 40, 40), FRAME, 0.25, 0.25) == grown
+
+
+def test_box_shrinks_only_below_the_ratio_and_then_holds():
+    box = (0, 0, 400, 400)
+    assert sticky_box(box, (100, 100, 200, 200), FRAME, 0.25, 0.25) == box
+    shrunk = sticky_box(box, (100, 100, 100, 100), FRAME, 0.25, 0.25)
+    assert shrunk == (75, 75, 150, 150)
+    assert sticky_box(shrunk, (100, 100, 100, 100), FRAME, 0.25, 0.25) == shrunk
+
+
+def test_box_is_clipped_to_the_frame():
+    assert sticky_box(None, (620, 460, 20, 20), FRAME, 0.25, 0.25) == (615, 455, 25, 25)
@@ -0,0 +1,17 @@
+from safety_detection.models import DetectionConfig
+from safety_detection.offline import offline_config
+
+
+def test_offline_config_leaves_the_callers_config_alone():
+    config = DetectionConfig(stage_max_share=0.5)
+    before = dict(vars(config))
+    result = offline_config(config, every_frame=True)
+    assert vars(config) == before
+    assert result is not config
+    assert result.stage_max_share is None and result.motion_gate_enabled is False
+    assert (result.night_start_hour, result.night_end_hour) == (24, 0)
+
+
+def test_night_forces_the_night_rules_on():
+    result = offline_config(night=True)
+    assert (result.night_start_hour, result.night_end_hour) == (0, 24)
@@ -0,0 +1,82 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import pytest
+
+from safety_detection import parallel
+from safety_detection.parallel import DETACH, ProcessInferenceBackend, _SharedFramePool
+
+
+class FakeProcess:
+    def __init__(self, alive=True):
+        self.alive = alive
+        self.exitcode = None if alive else -9
+
+    def is_alive(self):
+        return self.alive
+
+
+def test_crashed_worker_detected_while_others_return_results(monkeypatch):
+    monkeypatch.setattr(parallel, 'WORKER_CHECK_INTERVAL', 0.05)
+    backend = ProcessInferenceBackend(workers=2)
+    backend._result_queue = queue.Queue()
+    backend._task_queues = [queue.Queue(), queue.Queue()]
+    backend._processes = [FakeProcess(), FakeProcess(alive=False)]
+    backend._ctx = type('Ctx', (), {'Queue': staticmethod(queue.Queue)})()
+    backend._spawn = lambda index: FakeProcess()
+
+    # A frame in flight on worker 1, which has crashed
+    shm = backend._slots.acquire(16)
+    lost = Future()
+    stream = backend._streams.setdefault('cam', parallel._StreamState())
+    stream.futures[0] = lost
+    stream.next_seq = 1
+    backend._pending[7] = ('cam', 0, shm, 1)
+    backend._load[1] = 1
+
+    # Worker 0 keeps the result queue busy the whole time
+    stop = threading.Event()
+
+    def busy():
+        while not stop.is_set():
+            backend._result_queue.put((-1, {}, None))
+            time.sleep(0.005)
+
+    feeder = threading.Thread(target=busy, daemon=True)
+    feeder.start()
+    collector = threading.Thread(target=backend._collect, daemon=True)
+    collector.start()
+    try:
+        with pytest.raises(RuntimeError, match="worker 1 exited"):
+            lost.result(timeout=2.0)
+        assert backend._processes[1].is_alive()
+    finally:
+        stop.set()
+        backend._closed = True
+        collector.join(2.0)
+        backend._slots.close()
+
+
+def test_pool_reports_destroyed_blocks():
+    destroyed = []
+    pool = _SharedFramePool(1, on_destroy=destroyed.append)
+    small = pool.acquire(16)
+    name = small.name
+    pool.release(small)
+    large = pool.acquire(1024)
+    assert destroyed == [name]
+    pool.release(large)
+    pool.close()
+
+
+def test_workers_told_to_detach_destroyed_blocks():
+    backend = ProcessInferenceBackend(workers=2, max_in_flight=1)
+    backend._task_queues = [queue.Queue(), queue.Queue()]
+    small = backend._slots.acquire(16)
+    backend._slots.release(small)
+    backend._slots.release(backend._slots.acquire(4096))
+    for task_queue in backend._task_queues:
+        assert task_queue.get_nowait() == (DETACH, small.name)
+    backend._slots.close()
@@ -0,0 +1,53 @@
+import numpy as np
+
+from safety_detection.proximity import SurroundRule, near_males, surrounded_females
+
+WOMAN = (200, 200, 50, 50)
+DENSE, GRID = 10 ** 12, 0
+
+
+def box_at(dx, dy, size=50):
+    """A face whose centre is offset by (dx, dy) face sizes from WOMAN's"""
+    cx, cy = WOMAN[0] + 25 + dx * 50, WOMAN[1] + 25 + dy * 50
+    return (int(cx - size / 2), int(cy - size / 2), size, size)
+
+
+def random_faces(rng, count):
+    xy = rng.uniform(0, 4000, (count, 2))
+    sizes = rng.uniform(20, 90, count)
+    return [(int(x), int(y), int(s), int(s)) for (x, y), s in zip(xy, sizes)]
+
+
+def test_near_needs_distance_and_similar_size():
+    rule = SurroundRule(radius=2.5, max_size_ratio=2.0)
+    men = [box_at(2, 0), box_at(3, 0), box_at(1, 0, size=20)]
+    assert near_males([WOMAN], men, rule)[0].tolist() == [0]
+
+
+def test_min_sides_needs_men_around_her():
+    rule = SurroundRule(min_males=2, min_sides=2)
+    assert surrounded_females([WOMAN], [box_at(1.5, 0), box_at(2, 0.5)], rule) == []
+    assert surrounded_females([WOMAN], [box_at(1.5, 0), box_at(-1.5, 0)], rule) == [0]
+    assert surrounded_females([WOMAN], [box_at(1.5, 0)], rule) == []
+
+
+def test_empty_inputs():
+    rule = SurroundRule()
+    assert near_males([], [box_at(1, 0)], rule) == []
+    assert [m.tolist() for m in near_males([WOMAN], [], rule)] == [[]]
+    assert surrounded_females([WOMAN], [], rule) == []
+
+
+def test_grid_and_dense_paths_agree():
+    rng = np.random.default_rng(0)
+    rules = [SurroundRule(), SurroundRule(radius=4.0, min_males=2, min_sides=2),
+             SurroundRule(radius=1.5, min_males=1, sectors=8, max_size_ratio=1.5)]
+    for _ in range(5):
+        women, men = random_faces(rng, 80), random_faces(rng, 300)
+        for rule in rules:
+            dense = near_males(women, men, rule, grid_min_pairs=DENSE)
+            grid = near_males(women, men, rule, grid_min_pairs=GRID)
+            assert [m.tolist() for m in dense] == [m.tolist() for m in grid]
+            assert any(len(m) for m in dense)
+            assert (surrounded_females(women, men, rule, grid_min_pairs=DENSE) ==
+                    surrounded_females(women, men, rule, grid_min_pairs=GRID))
@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta
+
+import pytest
+from flask import Flask
+
+from safety_detection.db import db, init_database
+from safety_detection.models import Alert
+from safety_detection.queries import decode_cursor, encode_cursor, query_alerts, query_alerts_from_args
+
+BASE = datetime(2026, 1, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__)
+    init_database(app, f"sqlite:///{tmp_path / 'alerts.db'}")
+    with app.app_context():
+        db.create_all()
+        # Pairs of alerts share a timestamp so pages must break ties on id
+        for i in range(25):
+            db.session.add(Alert(
+                alert_type='distress' if i % 3 == 0 else 'woman_surrounded',
+                gesture='help_signal' if i % 3 == 0 else None,
+                timestamp=BASE + timedelta(minutes=i // 2), camera_id=str(i % 2),
+                male_count=2, female_count=1
+            ))
+        db.session.commit()
+        yield app
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+def walk(**kwargs):
+    """Follow next cursors from the first page to the last"""
+    ids, cursor, pages = [], None, 0
+    while True:
+        items, cursor = query_alerts(cursor=cursor, **kwargs)
+        ids += [item['id'] for item in items]
+        pages += 1
+        if cursor is None:
+            return ids, pages
+
+
+def test_cursor_round_trip():
+    timestamp = datetime(2026, 3, 4, 5, 6, 7, 890123)
+    assert decode_cursor(encode_cursor(timestamp, 42)) == (timestamp, 42)
+
+
+def test_malformed_cursor_raises_value_error():
+    with pytest.raises(ValueError):
+        decode_cursor('not-a-cursor')
+
+
+def test_pages_cover_every_alert_once_newest_first(app):
+    ids, pages = walk(limit=4)
+    expected = [a.id for a in Alert.query.order_by(Alert.timestamp.desc(), Alert.id.desc())]
+    assert ids == expected
+    assert pages == 7
+
+
+def test_oldest_order_pages_forward(app):
+    ids, _ = walk(limit=4, order='oldest')
+    assert ids == [a.id for a in Alert.query.order_by(Alert.timestamp, Alert.id)]
+
+
+def test_filters_apply_to_every_page(app):
+    ids, _ = walk(limit=2, alert_types=['distress'], since=BASE + timedelta(minutes=3))
+    expected = Alert.query.filter(Alert.alert_type == 'distress',
+                                  Alert.timestamp >= BASE + timedelta(minutes=3))
+    assert sorted(ids) == sorted(a.id for a in expected)
+
+
+def test_search_matches_type_gesture_or_id(app):
+    items, _ = query_alerts(search='HELP')
+    assert items and all(item['gesture'] == 'help_signal' for item in items)
+    items, _ = query_alerts(search='surrounded')
+    assert items and all(item['alert_type'] == 'woman_surrounded' for item in items)
+    items, _ = query_alerts(search='7')
+    assert [item['id'] for item in items] == [7]
+
+
+def test_query_args_validate_order(app):
+    items, cursor = query_alerts_from_args({'limit': '5', 'order': 'oldest', 'q': 'distress'})
+    assert len(items) == 5 and cursor is not None
+    with pytest.raises(ValueError):
+        query_alerts_from_args({'order': 'sideways'})
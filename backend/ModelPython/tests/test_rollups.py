@@ -0,0 +1,91 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+import pytz
+from flask import Flask
+
+from safety_detection.db import db, init_database
+from safety_detection.models import Alert, AlertRollup
+from safety_detection.rollups import alert_totals, forget_alerts, rebuild_rollups, record_alerts
+
+BASE = datetime(2026, 1, 1, 20, 0, 0)
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__)
+    init_database(app, f"sqlite:///{tmp_path / 'alerts.db'}")
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+def counts():
+    """Rollup counts by key; peaks are left out since forgetting keeps them"""
+    return sorted((r.resolution, r.bucket, r.camera_id, r.alert_type, r.gesture, r.count)
+                  for r in AlertRollup.query.all())
+
+
+def random_alerts(rng, count):
+    return [Alert(alert_type=rng.choice(['distress', 'woman_surrounded']),
+                  gesture=rng.choice([None, 'wave', 'thumb_palm']), camera_id=rng.choice([None, '1', '2']),
+                  timestamp=BASE + timedelta(minutes=rng.randint(0, 180)),
+                  male_count=rng.randint(0, 5), female_count=1)
+            for _ in range(count)]
+
+
+def add(alerts):
+    db.session.add_all(alerts)
+    record_alerts(alerts)
+    db.session.commit()
+
+
+def delete(alerts):
+    forget_alerts(alerts)
+    for alert in alerts:
+        db.session.delete(alert)
+    db.session.commit()
+
+
+def test_forgetting_everything_recorded_leaves_no_buckets(app):
+    alerts = random_alerts(random.Random(1), 50)
+    add(alerts)
+    assert alert_totals()['total'] == 50
+    delete(alerts)
+    assert counts() == []
+
+
+def test_incremental_rollups_match_a_rebuild(app):
+    rng = random.Random(2)
+    for step in range(12):
+        add(random_alerts(rng, rng.randint(1, 30)))
+        if step % 3 == 2:
+            delete(Alert.query.order_by(Alert.timestamp).limit(rng.randint(1, 20)).all())
+    incremental = counts()
+    rebuild_rollups()
+    db.session.commit()
+    assert incremental == counts()
+    assert alert_totals()['total'] == Alert.query.count()
+
+
+def test_aware_and_naive_ist_timestamps_share_buckets(app):
+    naive = Alert(alert_type='distress', timestamp=BASE + timedelta(minutes=5), male_count=0, female_count=1)
+    add([naive])
+    aware = Alert(alert_type='distress', male_count=0, female_count=1,
+                  timestamp=pytz.timezone('Asia/Kolkata').localize(BASE + timedelta(minutes=5)).astimezone(pytz.utc))
+    forget_alerts([aware])
+    db.session.commit()
+    assert counts() == []
+
+
+def test_forgetting_part_of_a_bucket_keeps_its_peaks(app):
+    alerts = [Alert(alert_type='distress', timestamp=BASE, male_count=males, female_count=1)
+              for males in (1, 4)]
+    add(alerts)
+    delete([alerts[1]])
+    rows = AlertRollup.query.filter_by(resolution='minute').all()
+    assert [(r.count, r.peak_male) for r in rows] == [(1, 4)]
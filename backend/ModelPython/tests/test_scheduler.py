@@ -0,0 +1,54 @@
+import pytest
+
+from safety_detection.scheduler import StageScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def run_frames(scheduler, clock, stage, seconds, fps=30, idle=False):
+    runs = 0
+    for _ in range(int(seconds * fps)):
+        if scheduler.due(stage, idle):
+            scheduler.mark_run(stage)
+            runs += 1
+        clock.now += 1.0 / fps
+    return runs
+
+
+def test_stage_runs_at_target_rate():
+    clock = FakeClock()
+    scheduler = StageScheduler({'faces': 5.0, 'hands': None}, clock=clock)
+    assert run_frames(scheduler, clock, 'faces', 4) == pytest.approx(20, abs=2)
+    assert scheduler.achieved_rate('faces') == pytest.approx(5.0, rel=0.15)
+    assert scheduler.stats()['faces']['skipped'] > 0
+
+
+def test_none_rate_runs_every_frame():
+    clock = FakeClock()
+    scheduler = StageScheduler({'hands': None}, clock=clock)
+    assert run_frames(scheduler, clock, 'hands', 1) == 30
+
+
+def test_idle_rate_is_lower():
+    clock = FakeClock()
+    scheduler = StageScheduler({'faces': 5.0}, idle_rates={'faces': 1.0}, clock=clock)
+    assert scheduler.interval('faces', idle=True) == 1.0
+    assert run_frames(scheduler, clock, 'faces', 4, idle=True) == pytest.approx(4, abs=1)
+
+
+def test_max_share_spaces_out_slow_stage():
+    clock = FakeClock()
+    scheduler = StageScheduler({'faces': None}, max_share=0.25, clock=clock)
+    scheduler.mark_run('faces', duration=0.1)
+    # 100 ms of work may use at most a quarter of wall time
+    assert scheduler.interval('faces') == pytest.approx(0.4)
+    clock.now += 0.2
+    assert not scheduler.due('faces')
+    clock.now += 0.2
+    assert scheduler.due('faces')
@@ -0,0 +1,82 @@
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from flask import Flask
+
+from safety_detection.db import db, init_database
+from safety_detection.models import Alert
+from safety_detection.storage import FrameStore
+
+FRAME_BYTES = 1000
+
+
+def write_file(path, size=FRAME_BYTES):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(b'\0' * size)
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__)
+    init_database(app, f"sqlite:///{tmp_path / 'alerts.db'}")
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+@pytest.fixture
+def root(app, tmp_path):
+    """Ten alerts with a frame each, oldest first, plus three orphan files"""
+    root = str(tmp_path / 'frames')
+    base = datetime(2026, 1, 1)
+    for i in range(10):
+        path = os.path.join(root, 'cam', f'alert_{i}.jpg')
+        write_file(path)
+        db.session.add(Alert(alert_type='distress', timestamp=base + timedelta(minutes=i),
+                             frame_path=path, male_count=0, female_count=1))
+    db.session.commit()
+    for i in range(3):
+        write_file(os.path.join(root, 'cam', f'orphan_{i}.jpg'), 5 * FRAME_BYTES)
+    return root
+
+
+def test_scan_counts_orphans_separately(app, root):
+    footprint = FrameStore(root, app=app).scan()
+    assert (footprint['files'], footprint['bytes']) == (10, 10 * FRAME_BYTES)
+    assert (footprint['orphan_files'], footprint['orphan_bytes']) == (3, 15 * FRAME_BYTES)
+
+
+def test_size_limit_ignores_orphans(app, root):
+    store = FrameStore(root, app=app, max_bytes=6 * FRAME_BYTES, batch_size=2)
+    footprint = store.compact()
+    # Orphans alone exceed the limit; only as many alerts go as the limit needs
+    assert Alert.query.count() == 6
+    assert footprint['bytes'] == 6 * FRAME_BYTES
+    assert sorted(os.listdir(os.path.join(root, 'cam')))[:3] == ['alert_4.jpg', 'alert_5.jpg', 'alert_6.jpg']
+    assert footprint['orphan_files'] == 3
+
+
+def test_size_limit_stops_when_expiring_frees_nothing(app, root):
+    # Alerts whose frames are already gone free no bytes, so they are not all deleted
+    for alert in Alert.query.all():
+        os.remove(alert.frame_path)
+    store = FrameStore(root, app=app, batch_size=2)
+    store.scan()
+    store.max_bytes, store.bytes = 0, 10 * FRAME_BYTES
+    store.scan = lambda: store.footprint()
+    store.compact()
+    assert Alert.query.count() == 8
+
+
+def test_old_orphans_are_removed_after_max_age(app, root):
+    old = os.path.join(root, 'cam', 'orphan_0.jpg')
+    os.utime(old, (0, 0))
+    footprint = FrameStore(root, app=app, orphan_max_age=3600).scan()
+    assert not os.path.exists(old)
+    assert os.path.exists(os.path.join(root, 'cam', 'orphan_1.jpg'))
+    assert (footprint['orphan_files'], footprint['files']) == (2, 10)
@@ -0,0 +1,125 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from safety_detection.metrics import PipelineMetrics
+from safety_detection.stream import FrameHub
+
+
+class FakeDetector:
+    def __init__(self):
+        self.metrics = PipelineMetrics()
+        self.current_counts = {'male': 0, 'female': 0}
+        self.current_gesture = {}
+        self.frame_changed = True
+
+    def process_frame(self, frame):
+        return frame, None
+
+
+class BlockingDetector(FakeDetector):
+    """Detector whose process_frame holds until the test lets it finish"""
+
+    def __init__(self):
+        super().__init__()
+        self.started = threading.Event()
+        self.finish = threading.Event()
+
+    def process_frame(self, frame):
+        self.started.set()
+        self.finish.wait(2.0)
+        return frame, None
+
+
+class SlowReleaseCapture:
+    """Camera whose release takes a while, like a USB device closing"""
+
+    def __init__(self, released: threading.Event):
+        self.released = released
+
+    def isOpened(self):
+        return True
+
+    def read(self):
+        time.sleep(0.01)
+        return True, np.zeros((48, 64, 3), dtype=np.uint8)
+
+    def release(self):
+        time.sleep(0.3)
+        self.released.set()
+
+
+class SlowReleaseHub(FrameHub):
+    def __init__(self, **kwargs):
+        super().__init__(0, FakeDetector(), **kwargs)
+        self.releasing = threading.Event()
+        self.opened = 0
+
+    def _open_capture(self):
+        self.opened += 1
+        self.releasing = threading.Event()
+        return SlowReleaseCapture(self.releasing)
+
+
+def test_viewer_arriving_during_idle_stop_gets_frames():
+    hub = SlowReleaseHub(idle_timeout=0.05)
+    first = hub.frames(timeout=1.0)
+    assert next(first) is not None
+    first.close()
+
+    # Wait until the worker has decided to stop and is releasing the camera
+    deadline = time.monotonic() + 2.0
+    while hub._running and time.monotonic() < deadline:
+        time.sleep(0.005)
+    assert not hub._running and hub.running
+
+    second = hub.frames(timeout=1.0)
+    assert next(second) is not None
+    assert hub.opened == 2
+    second.close()
+    hub.stop()
+
+
+def test_start_is_idempotent_while_running():
+    hub = SlowReleaseHub(always_on=True)
+    hub.start()
+    thread = hub._thread
+    hub.start()
+    assert hub._thread is thread
+    hub.stop()
+    assert not hub.running
+
+
+def test_stop_waits_for_the_frame_on_the_pool():
+    detector = BlockingDetector()
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        hub = FrameHub(0, detector, executor=pool)
+        hub._running = True
+        hub._submit(np.zeros((48, 64, 3), dtype=np.uint8))
+        assert detector.started.wait(1.0)
+
+        stopped = []
+        stopper = threading.Thread(target=lambda: stopped.append(hub.stop()))
+        stopper.start()
+        time.sleep(0.1)
+        assert stopped == []
+        detector.finish.set()
+        stopper.join(2.0)
+        assert stopped == [True] and not hub._in_flight
+
+        # A frame submitted after stop is not queued
+        hub._submit(np.zeros((48, 64, 3), dtype=np.uint8))
+        assert hub._pending is None and not hub._in_flight
+
+
+def test_stop_reports_a_frame_still_in_flight():
+    detector = BlockingDetector()
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        hub = FrameHub(0, detector, executor=pool)
+        hub._running = True
+        hub._submit(np.zeros((48, 64, 3), dtype=np.uint8))
+        assert detector.started.wait(1.0)
+        assert hub.stop(timeout=0.05) is False
+        detector.finish.set()
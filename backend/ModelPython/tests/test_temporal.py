@@ -0,0 +1,81 @@
+import numpy as np
+
+from safety_detection.temporal import GestureConfirmer, count_reversals
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def hand(gesture, x=0.5, y=0.5, side='Right', score=0.9):
+    landmarks = np.zeros((21, 3))
+    landmarks[0] = (x, y, 0.0)
+    return {'landmarks': landmarks, 'hand': side, 'score': score, 'gesture': gesture}
+
+
+def feed(confirmer, clock, frames, step=0.1):
+    """Update once per frame (a list of hands); returns every result"""
+    results = []
+    for hands in frames:
+        clock.now += step
+        results.append(confirmer.update(hands))
+    return results
+
+
+def test_count_reversals_ignores_small_moves():
+    assert count_reversals([], 0.1) == 0
+    assert count_reversals([0.5, 0.52, 0.49, 0.51], 0.05) == 0
+    assert count_reversals([0.5, 0.6, 0.5, 0.6, 0.5], 0.05) == 3
+
+
+def test_flicker_is_not_confirmed_but_k_of_n_is():
+    clock = FakeClock()
+    confirmer = GestureConfirmer(window=5, min_frames=3, clock=clock)
+    flicker = [[hand('thumb_palm')], [hand(None)], [hand(None)], [hand(None)]]
+    assert feed(confirmer, clock, flicker) == [None] * 4
+
+    confirmer.reset()
+    steady = [[hand('thumb_palm')], [hand(None)], [hand('thumb_palm')], [hand('thumb_palm')]]
+    assert feed(confirmer, clock, steady) == [None, None, None, 'thumb_palm']
+
+
+def test_min_duration_confirms_a_held_gesture_early():
+    clock = FakeClock()
+    confirmer = GestureConfirmer(window=30, min_frames=20, min_duration=0.5, clock=clock)
+    results = feed(confirmer, clock, [[hand('ok_sign')]] * 7, step=0.1)
+    assert results[:5] == [None] * 5
+    assert results[6] == 'ok_sign'
+
+
+def test_min_confidence_filters_low_scores():
+    clock = FakeClock()
+    confirmer = GestureConfirmer(window=3, min_frames=2, min_confidence=0.8, clock=clock)
+    assert feed(confirmer, clock, [[hand('thumb_palm', score=0.5)]] * 3)[-1] is None
+
+
+def test_wave_needs_side_to_side_motion():
+    clock = FakeClock()
+    confirmer = GestureConfirmer(window=8, min_frames=4, wave_reversals=2, wave_amplitude=0.04, clock=clock)
+    still = feed(confirmer, clock, [[hand('wave', x=0.5)]] * 8)
+    assert still[-1] is None
+
+    confirmer.reset()
+    swings = [[hand('wave', x=x)] for x in (0.5, 0.56, 0.5, 0.56, 0.5, 0.56)]
+    assert feed(confirmer, clock, swings)[-1] == 'wave'
+
+
+def test_hands_keep_separate_histories_and_vanished_hands_are_dropped():
+    clock = FakeClock()
+    confirmer = GestureConfirmer(window=4, min_frames=3, clock=clock)
+    # Alternating labels would confirm if both hands shared one history
+    frames = [[hand('thumb_palm', x=0.2, side='Left'), hand(None, x=0.8)],
+              [hand(None, x=0.2, side='Left'), hand('thumb_palm', x=0.8)]] * 2
+    assert feed(confirmer, clock, frames) == [None] * 4
+    assert len(confirmer.histories) == 2
+
+    feed(confirmer, clock, [[]] * 4)
+    assert confirmer.histories == []
@@ -0,0 +1,72 @@
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from safety_detection.thumbnails import ThumbnailCache
+
+
+def frame(seed):
+    """Noisy frames so every thumbnail has a similar, non-trivial size"""
+    return np.random.default_rng(seed).integers(0, 255, (240, 320, 3), dtype=np.uint8)
+
+
+def disk_usage(directory):
+    return sum(entry.stat().st_size for entry in os.scandir(directory))
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ThumbnailCache(str(tmp_path / 'thumbs'), width=160, memory_items=2)
+
+
+def test_eviction_removes_oldest_thumbnails_first(cache):
+    paths = [f"alert_frames/cam/{i}.jpg" for i in range(5)]
+    sizes = []
+    for i, path in enumerate(paths[:4]):
+        sizes.append(len(cache.write(frame(i), path)))
+        # Distinct mtimes so the eviction order does not depend on timer resolution
+        os.utime(cache.path_for(path), (1000 + i, 1000 + i))
+    cache.max_disk_bytes = sum(sizes[2:]) + max(sizes) * 1.5
+    cache.write(frame(4), paths[4])
+
+    remaining = [path for path in paths if os.path.exists(cache.path_for(path))]
+    assert remaining == paths[2:]
+    assert cache.stats()['evicted'] == 2
+    assert cache.stats()['disk_bytes'] == disk_usage(cache.directory) <= cache.max_disk_bytes
+
+
+def test_rewriting_a_thumbnail_does_not_double_count_it(cache):
+    for _ in range(3):
+        cache.write(frame(0), 'alert_frames/cam/a.jpg')
+    cache.write(frame(1), 'alert_frames/cam/b.jpg')
+    assert cache.stats()['disk_bytes'] == disk_usage(cache.directory)
+
+
+def test_memory_keeps_the_most_recently_used(cache):
+    for name in 'abc':
+        cache.write(frame(0), f'alert_frames/cam/{name}.jpg')
+    # a fell out of memory, so it is read back from disk
+    cache.get('alert_frames/cam/a.jpg')
+    assert (cache.memory_hits, cache.disk_hits) == (0, 1)
+    cache.get('alert_frames/cam/c.jpg')
+    assert cache.memory_hits == 1
+
+
+def test_discard_forgets_memory_disk_and_bytes(cache):
+    cache.write(frame(0), 'alert_frames/cam/a.jpg')
+    cache.write(frame(1), 'alert_frames/cam/b.jpg')
+    cache.discard('alert_frames/cam/a.jpg')
+    assert not os.path.exists(cache.path_for('alert_frames/cam/a.jpg'))
+    assert cache.stats()['disk_bytes'] == disk_usage(cache.directory)
+    assert cache.get('alert_frames/cam/a.jpg') is None
+
+
+def test_missing_thumbnail_is_generated_from_the_alert_frame(cache, tmp_path):
+    frame_path = str(tmp_path / 'cam' / 'alert.jpg')
+    os.makedirs(os.path.dirname(frame_path))
+    cv2.imwrite(frame_path, frame(0))
+    data, etag = cache.get(frame_path)
+    assert data[:2] == b'\xff\xd8' and etag == ThumbnailCache.etag_for(data)
+    assert cache.generated == 1 and os.path.exists(cache.path_for(frame_path))
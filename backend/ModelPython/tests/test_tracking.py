@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from safety_detection.tracking import FaceTracker, iou_matrix
+
+
+def test_iou_matrix():
+    scores = iou_matrix([(0, 0, 10, 10)], [(0, 0, 10, 10), (5, 0, 10, 10), (20, 20, 5, 5)])
+    np.testing.assert_allclose(scores, [[1.0, 50 / 150, 0.0]], rtol=1e-6)
+    assert iou_matrix([], [(0, 0, 1, 1)]).shape == (0, 1)
+
+
+def test_tracks_persist_across_frames():
+    tracker = FaceTracker()
+    first = tracker.update([(100, 100, 50, 50), (300, 100, 50, 50)])
+    second = tracker.update([(305, 102, 50, 50), (104, 98, 50, 50)])
+    assert [t.track_id for t in second] == [first[1].track_id, first[0].track_id]
+    assert second[0].hits == 2
+
+
+def test_centroid_fallback_follows_fast_face():
+    tracker = FaceTracker()
+    track = tracker.update([(100, 100, 40, 40)])[0]
+    # Moved more than IoU can follow, but centre is within half a face width
+    moved = tracker.update([(118, 100, 40, 40)])[0]
+    assert moved is track
+
+
+def test_unseen_tracks_are_dropped():
+    tracker = FaceTracker(max_missed=2)
+    track = tracker.update([(0, 0, 20, 20)])[0]
+    for _ in range(3):
+        tracker.update([])
+    assert track.track_id not in tracker.tracks
+
+
+def test_disagreeing_votes_lower_confidence():
+    tracker = FaceTracker()
+    track = tracker.update([(0, 0, 20, 20)])[0]
+    tracker.record(track, 'female', 0.9)
+    assert track.gender == 'female' and track.confidence == pytest.approx(0.9)
+    tracker.record(track, 'male', 0.9)
+    assert track.confidence < 0.6
+
+
+def test_stable_track_stops_reclassifying_after_warmup():
+    tracker = FaceTracker(reclassify_interval=30)
+    classified = []
+    for frame in range(100):
+        track = tracker.update([(200 + frame % 3, 150, 60, 60)])[0]
+        if tracker.needs_classification(track):
+            classified.append(frame)
+            # A typical, consistent gender_net output
+            tracker.record(track, 'female', 0.75)
+    warmup = classified[:tracker.min_votes]
+    assert warmup == list(range(tracker.min_votes))
+    # Afterwards only the periodic re-check runs
+    assert classified[tracker.min_votes:] == list(range(tracker.min_votes - 1 + 30, 100, 30))
@@ -1,6 +1,8 @@
 import { useEffect, useState } from "react";
 import { FontAwesomeIcon } from "@fortawesome/react-fontawesome";
 import { faHandPaper, faInfoCircle } from "@fortawesome/free-solid-svg-icons";
+import { useServerEvents } from "../hooks/useApi";
+import API from "../utils/api";
 
 const GestureDetection = () => {
   const [gestureData, setGestureData] = useState({
@@ -12,36 +14,43 @@ const GestureDetection = () => {
   const [history, setHistory] = useState([]);
   const [showInfo, setShowInfo] = useState(false);
 
-  // Poll gesture detection status from backend
+  const handleGesture = (data) => {
+    setGestureData(data);
+
+    // Add to history if gesture detected
+    if (data.detected && data.type) {
+      setHistory(prev => {
+        const newHistory = [{
+          type: data.type,
+          confidence: data.confidence,
+          timestamp: new Date().toLocaleTimeString()
+        }, ...prev];
+        return newHistory.slice(0, 5); // Keep last 5 gestures
+      });
+    }
+  };
+
+  // Initial status, then changes are pushed by the backend
   useEffect(() => {
     const fetchGestureStatus = async () => {
       try {
-        const response = await fetch("http://localhost:5000/api/gesture_status");
+        const response = await fetch(`${API.BASE_URL}/api/gesture_status`);
         if (response.ok) {
-          const data = await response.json();
-          setGestureData(data);
-          
-          // Add to history if gesture detected
-          if (data.detected && data.type) {
-            setHistory(prev => {
-              const newHistory = [{
-                type: data.type,
-                confidence: data.confidence,
-                timestamp: new Date().toLocaleTimeString()
-              }, ...prev];
-              return newHistory.slice(0, 5); // Keep last 5 gestures
-            });
-          }
+          setGestureData(await response.json());
         }
       } catch (error) {
         console.error("Error fetching gesture status:", error);
       }
     };
-
-    const interval = setInterval(fetchGestureStatus, 500); // Poll every 500ms
-    return () => clearInterval(interval);
+    fetchGestureStatus();
   }, []);
 
+  useServerEvents(["gesture"], (type, data) => {
+    if (type === "gesture") {
+      handleGesture(data);
+    }
+  }, "default");
+
   const getGestureColor = (type) => {
     switch (type) {
       case "thumb_palm":
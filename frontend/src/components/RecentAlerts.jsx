@@ -12,7 +12,7 @@ import AlertCard from "./AlertCard";
 import { useAlerts } from "../hooks/useApi";
 
 const RecentAlerts = ({ limit = 5 }) => {
-  const { alerts, loading, error } = useAlerts(10000); // Poll every 10 seconds for home page
+  const { alerts, loading, error } = useAlerts(); // Live via pushed alert events
   const [recentAlerts, setRecentAlerts] = useState([]);
 
   useEffect(() => {
@@ -86,7 +86,7 @@ const ScreenshotCard = ({ alert, onImageError = () => { } }) => {
         )}
 
         <img
-          src={API.getAlertImageUrl(alert.id)}
+          src={API.getAlertImageUrl(alert.id, "thumb")}
           alt={`Alert screenshot ${alert.id}`}
           className={`w-full h-full object-cover transition-opacity duration-300 ${isLoading ? 'opacity-0' : 'opacity-100'
             }`}
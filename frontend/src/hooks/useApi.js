@@ -1,33 +1,148 @@
 // Custom React Hooks for SheSafe API
 // Provides reusable hooks for data fetching with loading and error states
 
-import { useState, useEffect, useCallback } from 'react';
+import { useState, useEffect, useCallback, useRef } from 'react';
 import API from '../utils/api';
 
+// Events after which alert lists must be reloaded rather than patched
+const ALERT_RELOAD_EVENTS = ['alert_deleted', 'reset'];
+
+// One EventSource per camera filter, shared by every subscribed hook: browsers
+// allow only a few concurrent connections per host and the video feed holds one
+const eventStreams = {};
+
+const subscribeEvents = (cameraId, listener) => {
+    const key = cameraId || '';
+    let stream = eventStreams[key];
+    if (!stream) {
+        const source = new EventSource(API.getEventsUrl({ camera_id: cameraId }));
+        stream = { source, listeners: new Set() };
+        const dispatch = (event) => {
+            let data;
+            try {
+                data = JSON.parse(event.data);
+            } catch (err) {
+                console.error('Error parsing server event:', err);
+                return;
+            }
+            stream.listeners.forEach((handler) => handler(event.type, data));
+        };
+        ['gesture', 'counts', 'alert', 'alert_deleted', 'reset'].forEach((type) => {
+            source.addEventListener(type, dispatch);
+        });
+        eventStreams[key] = stream;
+    }
+    stream.listeners.add(listener);
+
+    return () => {
+        stream.listeners.delete(listener);
+        if (stream.listeners.size === 0) {
+            stream.source.close();
+            delete eventStreams[key];
+        }
+    };
+};
+
 /**
- * Hook to fetch alerts with auto-refresh
- * @param {number} refreshInterval - Refresh interval in milliseconds (default: 5000)
- * @returns {Object} { alerts, loading, error, refetch }
+ * Hook to subscribe to the backend's live event stream (Server-Sent Events)
+ * The browser reconnects automatically and resumes from the last event id
+ * @param {Array<string>} types - Event types to receive (e.g. ['alert', 'counts']); 'reset' is always delivered
+ * @param {Function} onEvent - Called with (type, data) for every event
+ * @param {string} cameraId - Optional camera filter ("default" for the default camera)
  */
-export const useAlerts = (refreshInterval = 5000) => {
+export const useServerEvents = (types, onEvent, cameraId = null) => {
+    const handlerRef = useRef(onEvent);
+    handlerRef.current = onEvent;
+    const typeKey = [].concat(types).join(',');
+
+    useEffect(() => {
+        if (typeof EventSource === 'undefined') {
+            return undefined;
+        }
+        const wanted = new Set(typeKey.split(',').concat('reset'));
+        return subscribeEvents(cameraId, (type, data) => {
+            if (wanted.has(type)) {
+                handlerRef.current(type, data);
+            }
+        });
+    }, [typeKey, cameraId]);
+};
+
+// Whether a pushed alert belongs in a list fetched with these server-side filters
+const matchesAlertFilters = (alert, filters) => {
+    const listed = (value, item) => !value || value.split(',').includes(item);
+    if (!listed(filters.alert_type, alert.alert_type) || !listed(filters.gesture, alert.gesture) ||
+        !listed(filters.camera_id, alert.camera_id) || filters.until) {
+        return false;
+    }
+    const search = (filters.q || '').trim().toLowerCase();
+    if (search) {
+        return alert.alert_type.toLowerCase().includes(search) ||
+            (alert.gesture || '').toLowerCase().includes(search) ||
+            String(alert.id) === search;
+    }
+    return true;
+};
+
+/**
+ * Hook to fetch alerts page by page, kept live by pushed alert events
+ * Filtering, search and ordering happen on the server; loadMore follows the
+ * X-Next-Cursor of the last page fetched
+ * @param {number} refreshInterval - Optional fallback polling interval in milliseconds (default: 0, off)
+ * @param {Object} filters - Optional /alerts query params: alert_type, gesture, camera_id, since, until, q, order, limit
+ * @returns {Object} { alerts, loading, error, refetch, loadMore, hasMore, loadingMore }
+ */
+export const useAlerts = (refreshInterval = 0, filters = {}) => {
     const [alerts, setAlerts] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
     const [loading, setLoading] = useState(true);
+    const [loadingMore, setLoadingMore] = useState(false);
     const [error, setError] = useState(null);
+    const filterKey = JSON.stringify(filters || {});
+    // Bumped on every first-page fetch so responses for stale filters are dropped
+    const requestRef = useRef(0);
 
     const fetchAlerts = useCallback(async () => {
+        const request = ++requestRef.current;
         try {
             setError(null);
-            const data = await API.getAlerts();
-            setAlerts(data);
+            const page = await API.getAlertsPage(JSON.parse(filterKey));
+            if (request !== requestRef.current) return;
+            setAlerts(page.items);
+            setNextCursor(page.nextCursor);
         } catch (err) {
+            if (request !== requestRef.current) return;
             setError(err.message || 'Failed to fetch alerts');
             console.error('Error in useAlerts:', err);
         } finally {
-            setLoading(false);
+            if (request === requestRef.current) {
+                setLoading(false);
+            }
         }
-    }, []);
+    }, [filterKey]);
+
+    const loadMore = useCallback(async () => {
+        if (!nextCursor || loadingMore) return;
+        const request = requestRef.current;
+        setLoadingMore(true);
+        try {
+            const page = await API.getAlertsPage({ ...JSON.parse(filterKey), cursor: nextCursor });
+            if (request !== requestRef.current) return;
+            setAlerts(prev => {
+                const seen = new Set(prev.map(alert => alert.id));
+                return [...prev, ...page.items.filter(alert => !seen.has(alert.id))];
+            });
+            setNextCursor(page.nextCursor);
+        } catch (err) {
+            setError(err.message || 'Failed to fetch alerts');
+            console.error('Error in useAlerts:', err);
+        } finally {
+            setLoadingMore(false);
+        }
+    }, [filterKey, nextCursor, loadingMore]);
 
     useEffect(() => {
+        setLoading(true);
         fetchAlerts();
 
         if (refreshInterval > 0) {
@@ -36,15 +151,32 @@ export const useAlerts = (refreshInterval = 5000) => {
         }
     }, [fetchAlerts, refreshInterval]);
 
-    return { alerts, loading, error, refetch: fetchAlerts };
+    useServerEvents(['alert', ...ALERT_RELOAD_EVENTS], (type, data) => {
+        if (type === 'alert') {
+            const active = JSON.parse(filterKey);
+            if (!matchesAlertFilters(data, active)) return;
+            if (active.order === 'oldest') {
+                // Newest alerts come last; they arrive with the final page
+                if (!nextCursor) {
+                    setAlerts(prev => [...prev.filter(alert => alert.id !== data.id), data]);
+                }
+            } else {
+                setAlerts(prev => [data, ...prev.filter(alert => alert.id !== data.id)]);
+            }
+        } else {
+            fetchAlerts();
+        }
+    });
+
+    return { alerts, loading, error, refetch: fetchAlerts, loadMore, hasMore: Boolean(nextCursor), loadingMore };
 };
 
 /**
- * Hook to fetch gender count with auto-refresh
- * @param {number} refreshInterval - Refresh interval in milliseconds (default: 1000)
+ * Hook to fetch the default camera's gender count, kept live by pushed count events
+ * @param {number} refreshInterval - Optional fallback polling interval in milliseconds (default: 0, off)
  * @returns {Object} { genderCount, loading, error, refetch }
  */
-export const useGenderCount = (refreshInterval = 1000) => {
+export const useGenderCount = (refreshInterval = 0) => {
     const [genderCount, setGenderCount] = useState({ male: 0, female: 0 });
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState(null);
@@ -71,15 +203,24 @@ export const useGenderCount = (refreshInterval = 1000) => {
         }
     }, [fetchGenderCount, refreshInterval]);
 
+    useServerEvents(['counts'], (type, data) => {
+        if (type === 'counts') {
+            setGenderCount({ male: data.male, female: data.female });
+            setLoading(false);
+        } else {
+            fetchGenderCount();
+        }
+    }, 'default');
+
     return { genderCount, loading, error, refetch: fetchGenderCount };
 };
 
 /**
- * Hook to fetch screenshots with auto-refresh
- * @param {number} refreshInterval - Refresh interval in milliseconds (default: 5000)
+ * Hook to fetch screenshots, refetched when alerts are added or removed
+ * @param {number} refreshInterval - Optional fallback polling interval in milliseconds (default: 0, off)
  * @returns {Object} { screenshots, loading, error, refetch }
  */
-export const useScreenshots = (refreshInterval = 5000) => {
+export const useScreenshots = (refreshInterval = 0) => {
     const [screenshots, setScreenshots] = useState([]);
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState(null);
@@ -106,15 +247,17 @@ export const useScreenshots = (refreshInterval = 5000) => {
         }
     }, [fetchScreenshots, refreshInterval]);
 
+    useServerEvents(['alert', ...ALERT_RELOAD_EVENTS], () => fetchScreenshots());
+
     return { screenshots, loading, error, refetch: fetchScreenshots };
 };
 
 /**
- * Hook to get alert statistics
- * @param {number} refreshInterval - Refresh interval in milliseconds (default: 10000)
+ * Hook to get alert statistics, refetched when alerts are added or removed
+ * @param {number} refreshInterval - Optional fallback polling interval in milliseconds (default: 0, off)
  * @returns {Object} { stats, loading, error, refetch }
  */
-export const useAlertStats = (refreshInterval = 10000) => {
+export const useAlertStats = (refreshInterval = 0) => {
     const [stats, setStats] = useState(null);
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState(null);
@@ -141,6 +284,8 @@ export const useAlertStats = (refreshInterval = 10000) => {
         }
     }, [fetchStats, refreshInterval]);
 
+    useServerEvents(['alert', ...ALERT_RELOAD_EVENTS], () => fetchStats());
+
     return { stats, loading, error, refetch: fetchStats };
 };
 
@@ -259,10 +404,10 @@ export const useAlert = (alertId) => {
 
 /**
  * Hook to track total person count from gender count
- * @param {number} refreshInterval - Refresh interval in milliseconds (default: 1000)
+ * @param {number} refreshInterval - Optional fallback polling interval in milliseconds (default: 0, off)
  * @returns {Object} { totalCount, maleCount, femaleCount, loading, error }
  */
-export const usePersonCount = (refreshInterval = 1000) => {
+export const usePersonCount = (refreshInterval = 0) => {
     const { genderCount, loading, error } = useGenderCount(refreshInterval);
 
     const totalCount = genderCount.male + genderCount.female;
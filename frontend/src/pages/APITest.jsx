@@ -17,9 +17,9 @@ const APITest = () => {
     const [testing, setTesting] = useState(false);
 
     // Use hooks
-    const { alerts, loading: alertsLoading, error: alertsError } = useAlerts(5000);
-    const { genderCount, loading: genderLoading, error: genderError } = useGenderCount(5000);
-    const { stats, loading: statsLoading, error: statsError } = useAlertStats(10000);
+    const { alerts, loading: alertsLoading, error: alertsError } = useAlerts();
+    const { genderCount, loading: genderLoading, error: genderError } = useGenderCount();
+    const { stats, loading: statsLoading, error: statsError } = useAlertStats();
     const { isHealthy, checking } = useBackendHealth(30000);
     const videoFeedUrl = useVideoFeed();
     const { downloadImage, downloading } = useDownloadAlertImage();
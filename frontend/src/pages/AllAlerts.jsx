@@ -1,4 +1,4 @@
-import { useState, useEffect } from "react";
+import { useState, useEffect, useMemo, useRef } from "react";
 import PropTypes from "prop-types";
 import { FontAwesomeIcon } from "@fortawesome/react-fontawesome";
 import {
@@ -131,7 +131,7 @@ const AlertCardWithScreenshot = ({ alert, onDownload, onDelete }) => {
               </div>
             )}
             <img
-              src={API.getAlertImageUrl(alert.id)}
+              src={API.getAlertImageUrl(alert.id, "thumb")}
               alt={`Alert ${alert.id}`}
               onLoad={handleImageLoad}
               onError={handleImageError}
@@ -243,54 +243,57 @@ AlertCardWithScreenshot.propTypes = {
   onDelete: PropTypes.func.isRequired,
 };
 
+// Time range filter options, in milliseconds back from now
+const timeRanges = [
+  { value: "all", label: "All Time", ms: null },
+  { value: "24h", label: "Last 24 Hours", ms: 24 * 60 * 60 * 1000 },
+  { value: "7d", label: "Last 7 Days", ms: 7 * 24 * 60 * 60 * 1000 },
+  { value: "30d", label: "Last 30 Days", ms: 30 * 24 * 60 * 60 * 1000 },
+];
+
 const AllAlerts = () => {
-  const { alerts, loading, error, refetch } = useAlerts(5000); // Poll every 5 seconds
-  const [filteredAlerts, setFilteredAlerts] = useState([]);
   const [searchTerm, setSearchTerm] = useState("");
+  const [debouncedSearch, setDebouncedSearch] = useState("");
   const [filterType, setFilterType] = useState("all");
+  const [timeRange, setTimeRange] = useState("all");
   const [sortOrder, setSortOrder] = useState("newest");
   const [showInfoModal, setShowInfoModal] = useState(false);
-  const [localAlerts, setLocalAlerts] = useState([]);
   const [deleting, setDeleting] = useState(false);
+  const loadMoreRef = useRef(null);
 
-  // Update local alerts when API alerts change
+  // Wait for typing to pause before querying the server
   useEffect(() => {
-    if (alerts) {
-      setLocalAlerts(alerts);
-    }
-  }, [alerts]);
-
+    const timeout = setTimeout(() => setDebouncedSearch(searchTerm.trim()), 300);
+    return () => clearTimeout(timeout);
+  }, [searchTerm]);
+
+  // Filtering, search and sorting run on the server over every alert, not just the loaded pages
+  const filters = useMemo(() => {
+    const params = { order: sortOrder };
+    if (filterType !== "all") params.alert_type = filterType;
+    if (debouncedSearch) params.q = debouncedSearch;
+    const range = timeRanges.find((r) => r.value === timeRange);
+    if (range && range.ms) params.since = new Date(Date.now() - range.ms).toISOString();
+    return params;
+  }, [filterType, debouncedSearch, timeRange, sortOrder]);
+
+  const { alerts, loading, error, refetch, loadMore, hasMore, loadingMore } = useAlerts(0, filters); // Live via pushed alert events
+  const isFiltered = Boolean(debouncedSearch) || filterType !== "all" || timeRange !== "all";
+
+  // Fetch the next page when the end of the list scrolls into view
   useEffect(() => {
-    if (localAlerts && localAlerts.length > 0) {
-      let filtered = [...localAlerts];
-
-      // Filter by type
-      if (filterType !== "all") {
-        filtered = filtered.filter((alert) => alert.alert_type === filterType);
-      }
-
-      // Filter by search term
-      if (searchTerm) {
-        filtered = filtered.filter(
-          (alert) =>
-            alert.alert_type.toLowerCase().includes(searchTerm.toLowerCase()) ||
-            (alert.gesture && alert.gesture.toLowerCase().includes(searchTerm.toLowerCase())) ||
-            alert.id.toString().includes(searchTerm)
-        );
-      }
-
-      // Sort
-      if (sortOrder === "newest") {
-        filtered.sort((a, b) => new Date(b.timestamp) - new Date(a.timestamp));
-      } else {
-        filtered.sort((a, b) => new Date(a.timestamp) - new Date(b.timestamp));
-      }
-
-      setFilteredAlerts(filtered);
-    } else {
-      setFilteredAlerts([]);
+    const sentinel = loadMoreRef.current;
+    if (!sentinel || !hasMore || typeof IntersectionObserver === "undefined") {
+      return undefined;
     }
-  }, [localAlerts, searchTerm, filterType, sortOrder]);
+    const observer = new IntersectionObserver((entries) => {
+      if (entries[0].isIntersecting) {
+        loadMore();
+      }
+    }, { rootMargin: "400px" });
+    observer.observe(sentinel);
+    return () => observer.disconnect();
+  }, [hasMore, loadMore]);
 
   const downloadAlertImage = async (alertId) => {
     try {
@@ -315,7 +318,7 @@ const AllAlerts = () => {
   };
 
   const deleteAllAlerts = async () => {
-    if (window.confirm(`Are you sure you want to delete ALL ${localAlerts.length} alerts? This action cannot be undone.`)) {
+    if (window.confirm("Are you sure you want to delete ALL alerts? This action cannot be undone.")) {
       setDeleting(true);
       try {
         await API.deleteAllAlerts();
@@ -377,7 +380,7 @@ const AllAlerts = () => {
     { value: "woman_surrounded_spatial", label: "Spatial Risk" },
   ];
 
-  if (loading && !alerts) {
+  if (loading && alerts.length === 0 && !isFiltered) {
     return (
       <div className="min-h-screen bg-gray-900 flex items-center justify-center">
         <div className="text-white text-xl">Loading alerts...</div>
@@ -416,7 +419,7 @@ const AllAlerts = () => {
               </button>
             </div>
 
-            {localAlerts.length > 0 && (
+            {alerts.length > 0 && (
               <button
                 onClick={deleteAllAlerts}
                 className="bg-red-600 hover:bg-red-700 text-white px-4 py-2 rounded-lg transition-colors flex items-center gap-2"
@@ -429,7 +432,8 @@ const AllAlerts = () => {
           </div>
 
           <p className="text-gray-400">
-            Showing all alerts • Total: {filteredAlerts.length} alert{filteredAlerts.length !== 1 ? 's' : ''}
+            Showing {alerts.length}{hasMore ? '+' : ''} alert{alerts.length !== 1 ? 's' : ''}
+            {hasMore ? ' • scroll for more' : ''}
           </p>
         </div>
 
@@ -469,6 +473,25 @@ const AllAlerts = () => {
             </select>
           </div>
 
+          {/* Time range */}
+          <div className="relative">
+            <FontAwesomeIcon
+              icon={faClock}
+              className="absolute left-3 top-1/2 transform -translate-y-1/2 text-gray-400"
+            />
+            <select
+              value={timeRange}
+              onChange={(e) => setTimeRange(e.target.value)}
+              className="pl-10 pr-8 py-2 bg-gray-700 text-white rounded-lg focus:outline-none focus:ring-2 focus:ring-blue-500 appearance-none cursor-pointer"
+            >
+              {timeRanges.map((range) => (
+                <option key={range.value} value={range.value}>
+                  {range.label}
+                </option>
+              ))}
+            </select>
+          </div>
+
           {/* Sort */}
           <div className="relative">
             <FontAwesomeIcon
@@ -487,21 +510,37 @@ const AllAlerts = () => {
         </div>
 
         {/* Content Grid */}
-        {filteredAlerts.length === 0 ? (
-          <EmptyState
-            type={searchTerm || filterType !== "all" ? "filtered" : (localAlerts && localAlerts.length === 0 ? "safe" : "alerts")}
-          />
+        {alerts.length === 0 ? (
+          loading ? (
+            <div className="text-gray-400 text-center py-12">Loading alerts...</div>
+          ) : (
+            <EmptyState type={isFiltered ? "filtered" : "safe"} />
+          )
         ) : (
-          <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
-            {filteredAlerts.map((alert) => (
-              <AlertCardWithScreenshot
-                key={alert.id}
-                alert={alert}
-                onDownload={downloadAlertImage}
-                onDelete={deleteAlert}
-              />
-            ))}
-          </div>
+          <>
+            <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
+              {alerts.map((alert) => (
+                <AlertCardWithScreenshot
+                  key={alert.id}
+                  alert={alert}
+                  onDownload={downloadAlertImage}
+                  onDelete={deleteAlert}
+                />
+              ))}
+            </div>
+
+            {hasMore && (
+              <div ref={loadMoreRef} className="flex justify-center mt-8">
+                <button
+                  onClick={loadMore}
+                  disabled={loadingMore}
+                  className="bg-gray-700 hover:bg-gray-600 disabled:opacity-50 text-white px-6 py-2 rounded-lg transition-colors"
+                >
+                  {loadingMore ? "Loading..." : "Load more"}
+                </button>
+              </div>
+            )}
+          </>
         )}
 
         {/* Alert Types Info Modal */}
@@ -32,8 +32,8 @@ const CameraDetail = () => {
   const { cameraId } = useParams();
 
   // Use custom hooks for API data
-  const { alerts, error: alertsError } = useAlerts(1000);
-  const { totalCount, maleCount, femaleCount } = usePersonCount(1000);
+  const { alerts, error: alertsError } = useAlerts();
+  const { totalCount, maleCount, femaleCount } = usePersonCount();
   const { downloadImage } = useDownloadAlertImage();
 
   const [cameraInfo, setCameraInfo] = useState(null);
@@ -324,7 +324,7 @@ const CameraDetail = () => {
                 {/* Alert Screenshot */}
                 <div className="relative h-48 bg-[#1A1A1A] overflow-hidden">
                   <img
-                    src={API.getAlertImageUrl(alert.id)}
+                    src={API.getAlertImageUrl(alert.id, "thumb")}
                     alt={`Alert ${alert.id}`}
                     className="w-full h-full object-cover transition-transform duration-300 group-hover:scale-110"
                   />
@@ -13,12 +13,13 @@ const API = {
 
     /**
      * GET /alerts
-     * Retrieves the 10 most recent safety alerts
+     * Retrieves one page of safety alerts, most recent first
+     * @param {Object} params - Optional limit, cursor, alert_type, gesture, camera_id, since, until, q, order, fields
      * @returns {Promise<Array>} Array of alert objects
      */
-    getAlerts: async () => {
+    getAlerts: async (params = {}) => {
         try {
-            const response = await axiosInstance.get('/alerts');
+            const response = await axiosInstance.get('/alerts', { params });
             return response.data;
         } catch (error) {
             console.error('Error fetching alerts:', error);
@@ -26,6 +27,24 @@ const API = {
         }
     },
 
+    /**
+     * GET /alerts, keeping the pagination cursor
+     * @param {Object} params - Same as getAlerts, plus q (search) and order ('newest' or 'oldest')
+     * @returns {Promise<Object>} { items, nextCursor }; nextCursor is null on the last page
+     */
+    getAlertsPage: async (params = {}) => {
+        try {
+            const response = await axiosInstance.get('/alerts', { params });
+            return {
+                items: response.data,
+                nextCursor: response.headers['x-next-cursor'] || null
+            };
+        } catch (error) {
+            console.error('Error fetching alerts:', error);
+            throw error;
+        }
+    },
+
     /**
      * GET /screenshots
      * Retrieves the 10 most recent alerts with screenshots available
@@ -60,10 +79,12 @@ const API = {
      * GET /alert_image/<alert_id>
      * Gets the image URL for a specific alert
      * @param {number} alertId - The ID of the alert
+     * @param {string} [size] - "thumb" for a small cached thumbnail, full frame otherwise
      * @returns {string} URL to the alert image
      */
-    getAlertImageUrl: (alertId) => {
-        return `${API.BASE_URL}/alert_image/${alertId}`;
+    getAlertImageUrl: (alertId, size) => {
+        const query = size === "thumb" ? "?size=thumb" : "";
+        return `${API.BASE_URL}/alert_image/${alertId}${query}`;
     },
 
     /**
@@ -75,6 +96,24 @@ const API = {
         return `${API.BASE_URL}/video_feed`;
     },
 
+    /**
+     * GET /api/events
+     * Gets the URL for the live Server-Sent Events stream
+     * @param {Object} params - Optional types (array or comma-separated) and camera_id ("default" for the default camera)
+     * @returns {string} URL to the event stream
+     */
+    getEventsUrl: (params = {}) => {
+        const query = new URLSearchParams();
+        if (params.types) {
+            query.set('types', [].concat(params.types).join(','));
+        }
+        if (params.camera_id) {
+            query.set('camera_id', params.camera_id);
+        }
+        const qs = query.toString();
+        return `${API.BASE_URL}/api/events${qs ? `?${qs}` : ''}`;
+    },
+
     /**
      * Download alert image
      * @param {number} alertId - The ID of the alert
@@ -110,13 +149,8 @@ const API = {
      */
     getAlertById: async (alertId) => {
         try {
-            // Since backend doesn't have this endpoint, we get all and filter
-            const alerts = await API.getAlerts();
-            const alert = alerts.find(a => a.id === alertId);
-            if (!alert) {
-                throw new Error('Alert not found');
-            }
-            return alert;
+            const response = await axiosInstance.get(`/alert/${alertId}`);
+            return response.data;
         } catch (error) {
             console.error('Error fetching alert by ID:', error);
             throw error;
@@ -129,7 +163,7 @@ const API = {
      */
     healthCheck: async () => {
         try {
-            const response = await axiosInstance.get('/alerts');
+            const response = await axiosInstance.get('/alerts', { params: { limit: 1, fields: 'id' } });
             return response.status === 200;
         } catch (error) {
             console.error('Backend health check failed:', error);
@@ -137,33 +171,41 @@ const API = {
         }
     },
 
+    /**
+     * GET /api/stats/alerts
+     * Alert time series and totals from server-side rollups
+     * @param {Object} params - resolution ("minute" | "hour"), since, until, group_by,
+     *   alert_type, gesture, camera_id
+     * @returns {Promise<Object>} { buckets, total, by_type, by_gesture, ... }
+     */
+    getAlertTimeseries: async (params = {}) => {
+        try {
+            const response = await axiosInstance.get('/api/stats/alerts', { params });
+            return response.data;
+        } catch (error) {
+            console.error('Error fetching alert time series:', error);
+            throw error;
+        }
+    },
+
     /**
      * Helper: Get alert statistics
+     * Totals are pre-aggregated on the server, so this does not download alerts
      * @returns {Promise<Object>} Statistics about alerts
      */
     getAlertStats: async () => {
         try {
-            const alerts = await API.getAlerts();
-
-            const stats = {
-                total: alerts.length,
-                byType: {},
-                byGesture: {},
-                recentAlert: alerts[0] || null,
-                oldestAlert: alerts[alerts.length - 1] || null
+            const [totals, recent] = await Promise.all([
+                API.getAlertTimeseries({ since: '1970-01-01T00:00:00', buckets: 0 }),
+                API.getAlerts({ limit: 1 })
+            ]);
+
+            return {
+                total: totals.total,
+                byType: totals.by_type,
+                byGesture: totals.by_gesture,
+                recentAlert: recent[0] || null
             };
-
-            alerts.forEach(alert => {
-                // Count by type
-                stats.byType[alert.alert_type] = (stats.byType[alert.alert_type] || 0) + 1;
-
-                // Count by gesture
-                if (alert.gesture) {
-                    stats.byGesture[alert.gesture] = (stats.byGesture[alert.gesture] || 0) + 1;
-                }
-            });
-
-            return stats;
         } catch (error) {
             console.error('Error getting alert stats:', error);
             throw error;